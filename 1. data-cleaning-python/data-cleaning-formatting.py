@@ -1,69 +1,137 @@
 import pandas as pd
-import re
+import numpy as np
+import os
+import sys
+from functools import cached_property
 from abc import ABC, abstractmethod
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '2. stats-analysis-python')))
+from validation_engine import SUPERSTORE_SCHEMA, compile_schema, column_checks, violation_rows, validate_csv_stream, validate_parallel, validate_incremental, check_integrity
+from dataset_cache import load_dataset, write_repaired_dataset
+
 class DataCleaner(ABC):
+    """Validates one column against its schema rules; nothing is computed until a result is first needed."""
+    label = 'Values'
+
     def __init__(self, data: pd.Series):
         self.data = data
-        self.cleaned_data = self.clean_extra_spaces()
-    
-    def clean_extra_spaces(self):
-        return self.data.astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
 
+    @property
     @abstractmethod
+    def column(self):
+        """Schema column the cleaner validates; subclasses name it as a class attribute."""
+
+    @cached_property
+    def checks(self):
+        # One factorize pass shared by the cleaning, validation, missing-value and whitespace checks
+        return column_checks(self.data, compile_schema({self.column: SUPERSTORE_SCHEMA[self.column]})[self.column])
+
+    @cached_property
+    def cleaned_data(self):
+        codes, cleaned, _ = self.checks
+        return pd.Series(np.append(cleaned, None)[codes], index=self.data.index, name=self.data.name)
+
+    def clean_extra_spaces(self):
+        return self.cleaned_data
+
+    def report(self, sample_size=5):
+        return pd.DataFrame(violation_rows(self.column, self.data, self.checks[2], sample_size))
+
     def validate(self):
-        pass
-    
+        rule = 'enum' if 'enum' in self.checks[2] else 'pattern'
+        row = self.report().set_index('rule').loc[rule]
+        print(f"Invalid {self.label}: {row['violations']} of {row['rows_checked']}" +
+              (f" (rows {row['sample_rows']}: {row['sample_values']})" if row['violations'] else f" - all {self.label} are valid."))
+        return row
+
     def check_missing_values(self):
-        missing_count = self.cleaned_data.isnull().sum()
-        print(f"Missing Values: {missing_count}")
-    
+        print(f"Missing Values: {int(self.checks[2]['missing'].sum())}")
+
     def check_extra_spaces(self):
-        extra_spaces = self.data[self.data.str.contains(r'^\s+|\s{2,}|\s+$', regex=True)]
-        if not extra_spaces.empty:
-            print("Entries with Extra Spaces:")
-            print(extra_spaces)
-        else:
-            print("No Extra Spaces Detected")
+        row = self.report().set_index('rule').loc['extra_spaces']
+        print(f"Entries with Extra Spaces: {row['violations']} (rows {row['sample_rows']})" if row['violations'] else "No Extra Spaces Detected")
 
 class OrderIDCleaner(DataCleaner):
-    def validate(self):
-        pattern = r"^(CA|US)-\d{4}-1\d{5}$"
-        invalid_ids = self.cleaned_data[~self.cleaned_data.str.match(pattern)]
-        print("Invalid Order IDs:")
-        print(invalid_ids if not invalid_ids.empty else "All Order IDs are valid.")
+    column = 'Order ID'
+    label = 'Order IDs'
 
 class DateCleaner(DataCleaner):
-    def validate(self):
-        pattern = r"^\d{4}-\d{2}-\d{2}$"
-        invalid_dates = self.cleaned_data[~self.cleaned_data.str.match(pattern)]
-        print("Invalid Dates:")
-        print(invalid_dates if not invalid_dates.empty else "All Dates are valid.")
+    column = 'Order Date'
+    label = 'Dates'
 
 class CategoryCleaner(DataCleaner):
-    def validate(self):
-        pattern = r"^(Consumer|Corporate|Home Office)$"
-        invalid_categories = self.cleaned_data[~self.cleaned_data.str.match(pattern)]
-        print("Invalid Categories:")
-        print(invalid_categories if not invalid_categories.empty else "All Categories are valid.")
-
-# Load Data
-data = pd.read_csv('C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.csv')
-
-# Apply Cleaners
-order_id_cleaner = OrderIDCleaner(data['Order ID'])
-order_id_cleaner.validate()
-order_id_cleaner.check_missing_values()
-order_id_cleaner.check_extra_spaces()
-
-order_date_cleaner = DateCleaner(data['Order Date'])
-order_date_cleaner.validate()
-order_date_cleaner.check_missing_values()
-order_date_cleaner.check_extra_spaces()
-
-category_cleaner = CategoryCleaner(data['Segment'])
-category_cleaner.validate()
-category_cleaner.check_missing_values()
-category_cleaner.check_extra_spaces()
-
-print("Data Cleaning Complete!")
+    column = 'Segment'
+    label = 'Categories'
+
+# Exports larger than this are validated in chunks instead of being loaded whole
+STREAMING_THRESHOLD_BYTES = 512 * 1024 ** 2
+
+# Loaded frames longer than this are validated on a process pool
+PARALLEL_THRESHOLD_ROWS = 2000000
+
+# Revalidate only the rows added or changed since the previous run
+INCREMENTAL_VALIDATION = False
+
+# Write the repaired, typed dataset that the analysis scripts memory-map
+WRITE_REPAIRED_DATASET = False
+
+if __name__ == "__main__":
+    # Load Data
+    file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.csv'
+    # Workbook the analysis scripts load through load_repaired_dataset
+    analysis_file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
+
+    if os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES:
+        # Streaming mode: memory bounded by the chunk size
+        report, stats = validate_csv_stream(file_path, SUPERSTORE_SCHEMA)
+        print(report)
+        print(f"Validated {stats['rows']} rows in {stats['chunks']} chunks: {stats['rows_per_second']:,.0f} rows/s")
+    else:
+        data = pd.read_csv(file_path)
+
+        if len(data) > PARALLEL_THRESHOLD_ROWS:
+            # Parallel mode: columns and row shards validated across cores
+            print(validate_parallel(data, SUPERSTORE_SCHEMA))
+        elif INCREMENTAL_VALIDATION:
+            # Incremental mode: stored outcomes reused for unchanged rows
+            delta_report, cumulative_report, summary = validate_incremental(data, SUPERSTORE_SCHEMA)
+            print(f"Validated {summary['validated']} of {summary['rows']} rows: {summary['new']} new, {summary['changed']} changed, "
+                  f"{summary['unchanged']} unchanged, {summary['removed']} removed")
+            print(delta_report)
+            print(cumulative_report)
+        else:
+            # Apply Cleaners
+            order_id_cleaner = OrderIDCleaner(data['Order ID'])
+            order_id_cleaner.validate()
+            order_id_cleaner.check_missing_values()
+            order_id_cleaner.check_extra_spaces()
+
+            order_date_cleaner = DateCleaner(data['Order Date'])
+            order_date_cleaner.validate()
+            order_date_cleaner.check_missing_values()
+            order_date_cleaner.check_extra_spaces()
+
+            category_cleaner = CategoryCleaner(data['Segment'])
+            category_cleaner.validate()
+            category_cleaner.check_missing_values()
+            category_cleaner.check_extra_spaces()
+
+            # Structured report of every rule, from the checks the cleaners already ran
+            report = pd.concat([cleaner.report() for cleaner in (order_id_cleaner, order_date_cleaner, category_cleaner)], ignore_index=True)
+            print(report)
+
+        # Cross-row integrity: duplicate order lines, orders and customers with conflicting values
+        print(check_integrity(data))
+
+        if WRITE_REPAIRED_DATASET:
+            # Repair mode: normalised text, parsed dates and float Sales
+            _, repairs = write_repaired_dataset(data, file_path)
+            print(repairs[repairs['rows'] > 0])
+
+    if WRITE_REPAIRED_DATASET and os.path.exists(analysis_file_path):
+        # The repaired file is keyed by source path, so repair the workbook under its own key too
+        _, repairs = write_repaired_dataset(load_dataset(analysis_file_path), analysis_file_path)
+        print(repairs[repairs['rows'] > 0])
+
+    print("Data Cleaning Complete!")
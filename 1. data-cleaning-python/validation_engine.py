@@ -0,0 +1,439 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '2. stats-analysis-python')))
+from dataset_cache import write_frame, read_frame, read_manifest, write_manifest
+from dataset_repair import clean_text, normalised_codes
+
+# Rules of the Superstore columns checked by the cleaners
+SUPERSTORE_SCHEMA = {
+    'Order ID': {'pattern': r"^(CA|US)-\d{4}-1\d{5}$"},
+    'Order Date': {'pattern': r"^\d{4}-\d{2}-\d{2}$"},
+    'Segment': {'enum': ['Consumer', 'Corporate', 'Home Office']}
+}
+
+# Whitespace pattern flagged by the extra-spaces rule
+EXTRA_SPACES = re.compile(r'^\s+|\s{2,}|\s+$')
+
+# Columns of the violation report
+REPORT_COLUMNS = ['column', 'rule', 'violations', 'rows_checked', 'sample_rows', 'sample_values']
+
+# Rows read per chunk in streaming mode
+CHUNK_ROWS = 100000
+
+# Rows of one column validated per task in parallel mode
+SHARD_ROWS = 500000
+
+# Cross-row rules: (key column, attribute column, rule) where every key must map to one attribute value
+INTEGRITY_RULES = [
+    ('Order ID', 'Order Date', 'order_date_conflict'),
+    ('Order ID', 'Customer ID', 'order_customer_conflict'),
+    ('Customer ID', 'Segment', 'customer_segment_conflict')
+]
+
+# Persisted row fingerprints and validation outcomes of incremental mode
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dataset-cache', 'validation')
+
+# Function to precompile the rules of a schema
+def compile_schema(schema):
+    """Compile every pattern once and turn every enum into a set; columns are required unless 'required' is False."""
+    return {
+        column: {
+            'pattern': re.compile(rules['pattern']) if rules.get('pattern') else None,
+            'enum': frozenset(rules['enum']) if rules.get('enum') is not None else None,
+            'required': rules.get('required', True)
+        }
+        for column, rules in schema.items()
+    }
+
+# Function to evaluate every rule of one column in a single pass
+def column_checks(values, rules):
+    """
+    Factorize the column once and run the whitespace, pattern and enum checks on its
+    distinct values only; the per-row results are gathered back through the codes.
+    Returns the codes, the cleaned distinct values and a row mask per rule.
+    """
+    codes, uniques = pd.factorize(values)
+    texts = [str(value) for value in uniques]
+    cleaned = np.array([clean_text(text) for text in texts], dtype=object)
+    missing = codes == -1
+
+    unique_checks = {'extra_spaces': np.array([EXTRA_SPACES.search(text) is not None for text in texts], dtype=bool)}
+    if rules['pattern'] is not None:
+        unique_checks['pattern'] = np.array([rules['pattern'].match(text) is None for text in cleaned], dtype=bool)
+    if rules['enum'] is not None:
+        # Set membership of the category codes rather than a regex per row
+        unique_checks['enum'] = np.array([text not in rules['enum'] for text in cleaned], dtype=bool)
+
+    masks = {'missing': missing if rules['required'] else np.zeros(len(codes), dtype=bool)}
+    for rule, failed in unique_checks.items():
+        masks[rule] = np.append(failed, False)[codes]
+    return codes, cleaned, masks
+
+# Function to summarise the rows failing each rule
+def violation_rows(column, values, masks, sample_size=5):
+    """Return one report row per rule with the violation count and the first sample_size row labels and values."""
+    rows = []
+    for rule, mask in masks.items():
+        positions = np.flatnonzero(mask)
+        sample = positions[:sample_size]
+        rows.append({
+            'column': column,
+            'rule': rule,
+            'violations': len(positions),
+            'rows_checked': len(mask),
+            'sample_rows': values.index[sample].tolist(),
+            'sample_values': values.iloc[sample].tolist()
+        })
+    return rows
+
+# Function to validate a frame against a schema
+def validate_frame(data, schema=SUPERSTORE_SCHEMA, sample_size=5):
+    """
+    Check every schema column in one pass per column and return the violation report:
+    one row per (column, rule) with the count and sampled row labels and values.
+    Schema columns absent from the frame are reported as a 'column_missing' violation.
+    """
+    rows = []
+    for column, rules in compile_schema(schema).items():
+        if column not in data.columns:
+            rows.append({'column': column, 'rule': 'column_missing', 'violations': len(data), 'rows_checked': len(data),
+                         'sample_rows': [], 'sample_values': []})
+            continue
+        _, _, masks = column_checks(data[column], rules)
+        rows.extend(violation_rows(column, data[column], masks, sample_size))
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+class Reservoir:
+    """Uniform sample of at most `size` offending rows from a stream of unknown length (Algorithm R)."""
+
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        self.rows = []
+        self.values = []
+
+    def offer(self, rows, values):
+        """
+        Fill the reservoir, then let the i-th offered item replace a random slot with
+        probability size / i. `rows` and `values` are the row labels and a Series of the
+        offending values; only the items kept are read from them.
+        """
+        fill = max(0, min(self.size - len(self.rows), len(rows)))
+        self.rows.extend(rows[:fill].tolist())
+        self.values.extend(values.iloc[:fill].tolist())
+        if len(rows) > fill:
+            # One draw per remaining item, all at once; only the accepted ones are written
+            slots = self.rng.integers(0, self.seen + fill + 1 + np.arange(len(rows) - fill))
+            for item in np.flatnonzero(slots < self.size):
+                self.rows[slots[item]] = rows[fill + item].item()
+                self.values[slots[item]] = values.iloc[fill + item]
+        self.seen += len(rows)
+
+# Function to validate a CSV export chunk by chunk
+def validate_csv_stream(file_path, schema=SUPERSTORE_SCHEMA, chunksize=CHUNK_ROWS, sample_size=5, seed=0):
+    """
+    Validate a CSV too large to load at once: read only the schema columns, as text, in
+    chunks of `chunksize` rows, run the same one-pass column checks on each chunk and merge
+    the per-rule counts and reservoir samples of offending rows. Peak memory is set by the
+    chunk size. Returns the violation report (row labels are 0-based data row numbers)
+    and the throughput statistics.
+    """
+    start = time.perf_counter()
+    compiled = compile_schema(schema)
+    header = pd.read_csv(file_path, nrows=0).columns
+    present = [column for column in compiled if column in header]
+    rng = np.random.default_rng(seed)
+    counts, reservoirs, rows_read, chunks = {}, {}, 0, 0
+
+    for chunk in pd.read_csv(file_path, usecols=present, dtype=str, chunksize=chunksize):
+        for column in present:
+            _, _, masks = column_checks(chunk[column], compiled[column])
+            for rule, mask in masks.items():
+                positions = np.flatnonzero(mask)
+                counts[column, rule] = counts.get((column, rule), 0) + len(positions)
+                reservoir = reservoirs.setdefault((column, rule), Reservoir(sample_size, rng))
+                reservoir.offer(chunk.index.to_numpy()[positions], chunk[column].iloc[positions])
+        rows_read += len(chunk)
+        chunks += 1
+
+    rows = []
+    for column in compiled:
+        if column not in present:
+            rows.append({'column': column, 'rule': 'column_missing', 'violations': rows_read, 'rows_checked': rows_read,
+                         'sample_rows': [], 'sample_values': []})
+            continue
+        for (name, rule), count in counts.items():
+            if name == column:
+                order = np.argsort(reservoirs[name, rule].rows)
+                rows.append({'column': column, 'rule': rule, 'violations': count, 'rows_checked': rows_read,
+                             'sample_rows': [reservoirs[name, rule].rows[item] for item in order],
+                             'sample_values': [reservoirs[name, rule].values[item] for item in order]})
+    seconds = time.perf_counter() - start
+    stats = {'rows': rows_read, 'chunks': chunks, 'chunk_rows': chunksize, 'seconds': seconds,
+             'rows_per_second': rows_read / seconds if seconds else float('inf')}
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS), stats
+
+# Function to copy the Arrow string buffers of a column into shared memory
+def share_column(values):
+    """
+    Encode a column as an Arrow large_string array (validity bitmap, int64 offsets and
+    UTF-8 data) and copy each buffer into its own shared-memory block. Returns the blocks
+    and the {part: (block name, size)} layout workers attach to.
+    """
+    import pyarrow as pa
+    try:
+        array = pa.array(values, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = pa.array(values.astype(str).where(values.notna()), type=pa.large_string(), from_pandas=True)
+    blocks, layout = [], {}
+    for part, buffer in zip(('validity', 'offsets', 'data'), array.buffers()):
+        if buffer is None:
+            continue
+        block = SharedMemory(create=True, size=max(buffer.size, 1))
+        blocks.append(block)
+        np.ndarray(buffer.size, dtype=np.uint8, buffer=block.buf)[:] = np.frombuffer(buffer, dtype=np.uint8)
+        layout[part] = (block.name, buffer.size)
+    return blocks, layout
+
+# Function to validate one row range of a shared column inside a worker process
+def validate_shard(column, rules, layout, length, start, stop, sample_size=5):
+    """
+    Attach to the column's shared buffers, rebuild the rows start..stop as a zero-copy
+    Arrow slice and run the one-pass column checks on them. Returns per-rule counts and
+    the first sample_size offending row positions and values.
+    """
+    import pyarrow as pa
+    attached = {part: SharedMemory(name=name) for part, (name, _) in layout.items()}
+    try:
+        views = {part: attached[part].buf[:size] for part, (_, size) in layout.items()}
+        buffers = [pa.py_buffer(views[part]) if part in views else None for part in ('validity', 'offsets', 'data')]
+        array = pa.LargeStringArray.from_buffers(length, buffers[1], buffers[2], buffers[0]).slice(start, stop - start)
+        # Arrow-backed strings may still point into shared memory, so check them while attached
+        values = array.to_pandas()
+        _, _, masks = column_checks(values, compile_schema({column: rules})[column])
+        results = {}
+        for rule, mask in masks.items():
+            positions = np.flatnonzero(mask)
+            results[rule] = (len(positions), (positions[:sample_size] + start).tolist(), values.iloc[positions[:sample_size]].tolist())
+        # Every object holding the shared buffers must be gone before the blocks are closed
+        del values, array, buffers
+        for view in views.values():
+            view.release()
+    finally:
+        for block in attached.values():
+            block.close()
+    return column, start, results
+
+# Function to validate the columns of a frame on a process pool
+def validate_parallel(data, schema=SUPERSTORE_SCHEMA, workers=None, shard_rows=SHARD_ROWS, sample_size=5):
+    """
+    Validate every schema column with its rows split into shards of shard_rows, one task
+    per (column, shard) on a process pool. Columns reach the workers as Arrow buffers in
+    shared memory rather than pickled strings, and the shard results are reduced into the
+    validate_frame report (the same counts and first sample_size offending rows).
+    Falls back to validate_frame when pyarrow is not installed.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return validate_frame(data, schema, sample_size)
+
+    present = [column for column in schema if column in data.columns]
+    blocks, results = [], {}
+    try:
+        tasks = []
+        for column in present:
+            column_blocks, layout = share_column(data[column])
+            blocks.extend(column_blocks)
+            for start in range(0, max(len(data), 1), shard_rows):
+                tasks.append((column, schema[column], layout, len(data), start, min(start + shard_rows, len(data)), sample_size))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for column, start, shard in executor.map(validate_shard, *zip(*tasks)) if tasks else []:
+                results[column, start] = shard
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    rows = []
+    for column in schema:
+        if column not in present:
+            rows.append({'column': column, 'rule': 'column_missing', 'violations': len(data), 'rows_checked': len(data),
+                         'sample_rows': [], 'sample_values': []})
+            continue
+        shards = [results[key] for key in sorted(key for key in results if key[0] == column)]
+        for rule in shards[0]:
+            positions = [position for shard in shards for position in shard[rule][1]][:sample_size]
+            rows.append({
+                'column': column,
+                'rule': rule,
+                'violations': sum(shard[rule][0] for shard in shards),
+                'rows_checked': len(data),
+                'sample_rows': data.index[positions].tolist(),
+                'sample_values': [value for shard in shards for value in shard[rule][2]][:sample_size]
+            })
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+# Function to fingerprint every row of the order table
+def row_fingerprints(data, key='Row ID'):
+    """
+    Return the key and the 64-bit content hash of every row. The hash covers every column,
+    the key included; rows are keyed by `key` when it is present and unique, by position
+    otherwise.
+    """
+    fingerprints = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    if key in data.columns and data[key].is_unique:
+        return data[key].astype(str).to_numpy(), fingerprints
+    return np.arange(len(data)).astype(str), fingerprints
+
+# Function to list the rules checked for each schema column
+def rule_names(data, compiled):
+    """Return the 'column|rule' flag names in report order; absent columns get a single 'column_missing' rule."""
+    names = []
+    for column, rules in compiled.items():
+        if column not in data.columns:
+            names.append(f"{column}|column_missing")
+            continue
+        names.extend(f"{column}|{rule}" for rule in ['missing', 'extra_spaces', 'pattern', 'enum']
+                     if rule in ('missing', 'extra_spaces') or rules[rule] is not None)
+    return names
+
+# Function to fingerprint the rules the stored outcomes were computed with
+def schema_hash(schema):
+    """SHA-256 of the schema; stored outcomes are discarded when it changes."""
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()
+
+# Function to report the rows flagged for each rule
+def flagged_report(data, flags, positions, sample_size=5):
+    """Build the report rows of the (column, rule) flags over the given row positions."""
+    rows = []
+    for name in flags.columns:
+        column, rule = name.split('|', 1)
+        offending = positions[flags[name].to_numpy()[positions]]
+        sample = offending[:sample_size]
+        rows.append({'column': column, 'rule': rule, 'violations': len(offending), 'rows_checked': len(positions),
+                     'sample_rows': data.index[sample].tolist(),
+                     'sample_values': data[column].iloc[sample].tolist() if column in data.columns else []})
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+# Function to validate only the rows added or changed since the last run
+def validate_incremental(data, schema=SUPERSTORE_SCHEMA, index_dir=DEFAULT_INDEX_DIR, key='Row ID', sample_size=5):
+    """
+    Compare the row fingerprints with the persisted index, run the one-pass column checks
+    on the new and changed rows only and carry the stored outcome of every unchanged row
+    forward. The index is rewritten with the current rows, so removed rows drop out.
+    A different schema invalidates the stored outcomes.
+
+    Returns the delta report (new and changed rows), the cumulative report (every current
+    row) and a summary of the row counts.
+    """
+    start = time.perf_counter()
+    os.makedirs(index_dir, exist_ok=True)
+    stem, manifest_path = os.path.join(index_dir, 'row-index'), os.path.join(index_dir, 'row-index.json')
+    manifest = read_manifest(manifest_path)
+    current_schema = schema_hash(schema)
+    stored = None
+    if manifest is not None and manifest.get('schema') == current_schema:
+        try:
+            stored = read_frame(stem, manifest['format'])
+        except (OSError, ValueError, ImportError):
+            stored = None
+
+    keys, fingerprints = row_fingerprints(data, key)
+    compiled = compile_schema(schema)
+    flag_names = rule_names(data, compiled)
+    flags = pd.DataFrame(False, index=np.arange(len(data)), columns=flag_names)
+
+    if stored is not None and list(stored.columns[2:]) == flag_names:
+        previous = pd.Index(stored['key']).get_indexer(keys)
+        unchanged = (previous >= 0) & (stored['fingerprint'].to_numpy()[np.maximum(previous, 0)] == fingerprints)
+        flags.loc[unchanged, :] = stored[flag_names].to_numpy()[previous[unchanged]]
+        new = previous < 0
+        removed = len(stored) - int(np.count_nonzero(previous >= 0))
+    else:
+        unchanged, new, removed = np.zeros(len(data), dtype=bool), np.ones(len(data), dtype=bool), 0
+
+    delta = np.flatnonzero(~unchanged)
+    subset = data.iloc[delta]
+    for column, rules in compiled.items():
+        if column not in data.columns:
+            flags.iloc[delta, flags.columns.get_loc(f"{column}|column_missing")] = True
+            continue
+        _, _, masks = column_checks(subset[column], rules)
+        for rule, mask in masks.items():
+            flags.iloc[delta, flags.columns.get_loc(f"{column}|{rule}")] = mask
+
+    index = pd.concat([pd.DataFrame({'key': keys, 'fingerprint': fingerprints}), flags], axis=1)
+    write_manifest(manifest_path, {
+        'schema': current_schema,
+        'format': write_frame(index, stem),
+        'rows': len(index),
+        'validated_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    })
+    summary = {'rows': len(data), 'new': int(new.sum()), 'changed': int((~unchanged & ~new).sum()), 'unchanged': int(unchanged.sum()),
+               'removed': removed, 'validated': len(delta), 'seconds': time.perf_counter() - start}
+    return flagged_report(data, flags, delta, sample_size), flagged_report(data, flags, np.arange(len(data)), sample_size), summary
+
+# Function to integer-code a key column
+def key_codes(values):
+    """Factorize the column on its whitespace-normalised values; missing values get -1. Returns the codes and the number of keys."""
+    codes, cleaned, _ = normalised_codes(values)
+    return codes, len(cleaned)
+
+# Function to flag the rows whose code occurs more than once
+def repeated_codes(codes):
+    """Row mask of the non-negative codes shared with at least one other row, from one bincount."""
+    counts = np.bincount(codes[codes >= 0])
+    return (codes >= 0) & (np.append(counts, 0)[codes] > 1)
+
+# Function to flag the rows of keys that map to more than one attribute value
+def conflicting_rows(keys, n_keys, attributes, n_attributes):
+    """
+    Combine the key and attribute codes into one int64 pair code, keep the distinct pairs and
+    count them per key; keys with more than one distinct attribute value are conflicts.
+    Rows with a missing key are never flagged; a missing attribute counts as a value.
+    """
+    present = keys >= 0
+    pairs = np.unique(keys[present].astype(np.int64) * (n_attributes + 1) + attributes[present] + 1)
+    distinct = np.bincount(pairs // (n_attributes + 1), minlength=n_keys)
+    return present & (np.append(distinct, 0)[keys] > 1)
+
+# Function to check duplicates and cross-row consistency of the order lines
+def check_integrity(data, rules=INTEGRITY_RULES, key='Row ID', sample_size=5):
+    """
+    Build integer-coded indexes on Order ID, Customer ID, Product ID and the attribute
+    columns in one factorize pass each, then report in the validation report format:
+    duplicate order lines (every column but `key` identical, by 64-bit row fingerprint),
+    products repeated within an order, and every INTEGRITY_RULES key that maps to more
+    than one attribute value (an order with several dates or customers, a customer whose
+    Segment changes). Memory is a few integer arrays per row instead of pandas merges.
+    """
+    needed = ['Order ID', 'Product ID'] + [column for rule in rules for column in rule[:2]]
+    rows = [{'column': column, 'rule': 'column_missing', 'violations': len(data), 'rows_checked': len(data),
+             'sample_rows': [], 'sample_values': []} for column in dict.fromkeys(needed) if column not in data.columns]
+    if rows:
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+    codes = {column: key_codes(data[column]) for column in dict.fromkeys(needed)}
+
+    fingerprints = pd.util.hash_pandas_object(data.drop(columns=[key], errors='ignore'), index=False).to_numpy()
+    lines = pd.factorize(fingerprints)[0]
+    (orders, _), (products, n_products) = codes['Order ID'], codes['Product ID']
+    order_products = np.where((orders >= 0) & (products >= 0), orders.astype(np.int64) * n_products + products, -1)
+    masks = {'duplicate_line': repeated_codes(lines),
+             'repeated_product': repeated_codes(np.where(order_products >= 0, pd.factorize(order_products)[0], -1))}
+    rows.extend(violation_rows('Order ID', data['Order ID'], masks, sample_size))
+    for key_column, attribute, rule in rules:
+        mask = conflicting_rows(*codes[key_column], *codes[attribute])
+        rows.extend(violation_rows(attribute, data[attribute], {rule: mask}, sample_size))
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
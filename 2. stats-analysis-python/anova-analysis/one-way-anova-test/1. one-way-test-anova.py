@@ -1,18 +1,22 @@
-import pandas as pd
-import math
 import plotly.express as px
 from scipy.stats import levene, bartlett, f_oneway
 from abc import ABC, abstractmethod
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from dataset_cache import load_repaired_dataset
+from transforms import log_transform
 
 class DataProcessor:
     def __init__(self, file_path: str):
-        self.data = pd.read_excel(file_path)
+        self.data = load_repaired_dataset(file_path)
     
     def filter_states(self, states):
         return self.data[self.data['State'].isin(states)].copy()
 
     def log_transform_sales(self, df, column='Sales'):
-        df['log_sales'] = df[column].apply(lambda x: math.log(x) if x > 0 else None)
+        df['log_sales'] = log_transform(df[column])
         return df
 
 class StatisticalTests(ABC):
@@ -0,0 +1,75 @@
+import warnings
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from statsmodels.tsa.seasonal import DecomposeResult
+
+# Function to build the centred moving-average weights used by statsmodels
+def trend_weights(period):
+    """Return the 2 x period centred moving-average filter for even periods, a plain mean for odd ones."""
+    if period % 2 == 0:
+        return np.array([0.5] + [1.0] * (period - 1) + [0.5]) / period
+    return np.repeat(1.0 / period, period)
+
+# Function to compute the trend of every series at once
+def batch_trend(values, period=12):
+    """Apply the centred moving average along the last axis, leaving NaN where the window is incomplete."""
+    weights = trend_weights(period)
+    half = len(weights) // 2
+    trend = np.full(values.shape, np.nan)
+    trend[:, half:values.shape[1] - half] = sliding_window_view(values, len(weights), axis=1) @ weights
+    return trend
+
+# Function to compute the centred seasonal indices of every series at once
+def batch_seasonal_indices(detrended, period=12, model='additive'):
+    """Average the detrended values of each phase and centre the indices, one row per series."""
+    n_series, n_obs = detrended.shape
+    cycles = -(-n_obs // period)
+    padded = np.full((n_series, cycles * period), np.nan)
+    padded[:, :n_obs] = detrended
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        indices = np.nanmean(padded.reshape(n_series, cycles, period), axis=1)
+    if model == 'additive':
+        return indices - indices.mean(axis=1, keepdims=True)
+    return indices / indices.mean(axis=1, keepdims=True)
+
+# Function to decompose a (series x months) array
+def decompose_batch(values, period=12, model='additive'):
+    """
+    Decompose every row of a 2-D (series x months) array into trend, seasonal and
+    residual components with the same arithmetic as statsmodels' seasonal_decompose.
+    """
+    if model not in ('additive', 'multiplicative'):
+        raise ValueError("model must be 'additive' or 'multiplicative'")
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    # The same input checks as statsmodels
+    if not np.isfinite(values).all():
+        raise ValueError("This function does not handle missing values")
+    if model == 'multiplicative' and (values <= 0).any():
+        raise ValueError("Multiplicative seasonality is not appropriate for zero and negative values")
+    if values.shape[1] < 2 * period:
+        raise ValueError(f"x must have 2 complete cycles requires {2 * period} observations. x only has {values.shape[1]} observation(s)")
+
+    trend = batch_trend(values, period)
+    detrended = values - trend if model == 'additive' else values / trend
+    indices = batch_seasonal_indices(detrended, period, model)
+    seasonal = np.tile(indices, values.shape[1] // period + 1)[:, :values.shape[1]]
+    resid = detrended - seasonal if model == 'additive' else detrended / seasonal
+    return trend, seasonal, resid
+
+# Drop-in replacement for statsmodels' seasonal_decompose
+def seasonal_decompose(data, model='additive', period=12):
+    """
+    Decompose a monthly Series, or every column of a month x series DataFrame, and
+    return a statsmodels DecomposeResult whose components match the input's shape.
+    """
+    if isinstance(data, pd.Series):
+        trend, seasonal, resid = decompose_batch(data.to_numpy()[np.newaxis, :], period, model)
+        components = [pd.Series(component[0], index=data.index, name=name)
+                      for component, name in ((seasonal, 'seasonal'), (trend, 'trend'), (resid, 'resid'))]
+    else:
+        trend, seasonal, resid = decompose_batch(data.to_numpy().T, period, model)
+        components = [pd.DataFrame(component.T, index=data.index, columns=data.columns)
+                      for component in (seasonal, trend, resid)]
+    return DecomposeResult(data, *components)
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from statsmodels.tsa.adfvalues import mackinnonp, mackinnoncrit
+
+# KPSS critical values and their p-values (Kwiatkowski et al., 1992)
+KPSS_CRITICAL = {'c': [0.347, 0.463, 0.574, 0.739], 'ct': [0.119, 0.146, 0.176, 0.216]}
+KPSS_PVALUES = [0.10, 0.05, 0.025, 0.01]
+
+# Columns of the stationarity table
+STATIONARITY_COLUMNS = ['nobs', 'adf_statistic', 'adf_pvalue', 'adf_lags', 'adf_1%', 'adf_5%', 'adf_10%',
+                        'kpss_statistic', 'kpss_pvalue', 'kpss_lags', 'stationary']
+
+# Function to pick the default maximum ADF lag the way adfuller does
+def default_maxlag(n_obs, regression='c'):
+    """Schwert's rule, capped so the regression keeps enough observations."""
+    n_trend = len(regression) if regression != 'n' else 0
+    maxlag = min(int(np.ceil(12.0 * np.power(n_obs / 100.0, 1 / 4.0))), n_obs // 2 - n_trend - 1)
+    if maxlag < 0:
+        raise ValueError("sample size is too short to use selected regression component")
+    return maxlag
+
+# Function to build the deterministic columns shared by every series
+def trend_columns(n_obs, regression='c'):
+    """Return the (n_obs x n_trend) constant and linear trend columns for 'n', 'c' or 'ct'."""
+    columns = {'n': [], 'c': [np.ones(n_obs)], 'ct': [np.ones(n_obs), np.arange(1, n_obs + 1, dtype=float)]}
+    if regression not in columns:
+        raise ValueError("regression must be 'n', 'c' or 'ct'")
+    return np.column_stack(columns[regression]) if columns[regression] else np.empty((n_obs, 0))
+
+# Function to build the ADF design of every series with stride tricks
+def adf_design(values, lags, regression='c', level_last=False):
+    """
+    Return a (series x obs x columns) array [trend, level, diff lags 1..lags, response]
+    from a (series x time) array, or [trend, diff lags, level, response] when level_last
+    is set. The lagged differences are a reversed sliding window over np.diff.
+    """
+    differences = np.diff(values, axis=1)
+    windows = sliding_window_view(differences, lags + 1, axis=1)[:, :, ::-1]
+    n_series, n_obs = windows.shape[:2]
+    level = values[:, lags:-1, np.newaxis]
+    trend = trend_columns(n_obs, regression)
+    trend = np.broadcast_to(trend, (n_series,) + trend.shape)
+    regressors = [trend, windows[:, :, 1:], level] if level_last else [trend, level, windows[:, :, 1:]]
+    return np.concatenate(regressors + [windows[:, :, :1]], axis=2)
+
+# Function to get the residual sum of squares of every leading-column regression at once
+def prefix_ssr(design):
+    """
+    QR-decompose each augmented [X | y] design once. The last column of R holds Q'y,
+    so the residual sum of squares of y regressed on the first m columns of X is the
+    sum of squares of its entries from row m down.
+    """
+    r = np.linalg.qr(design, mode='r')
+    ssr = np.cumsum((r[:, :, -1] ** 2)[:, ::-1], axis=1)[:, ::-1]
+    return r, ssr
+
+# Function to choose the ADF lag of every series from one shared-sample regression
+def select_lags(values, maxlag, regression='c', autolag='AIC'):
+    """Return the chosen lag per series using the AIC, BIC or t-stat rule of adfuller."""
+    design = adf_design(values, maxlag, regression)
+    n_obs = design.shape[1]
+    first = design.shape[2] - 1 - maxlag
+    r, ssr = prefix_ssr(design)
+    n_params = np.arange(first, first + maxlag + 1)
+    ssr = ssr[:, first:first + maxlag + 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if autolag.lower() == 'aic':
+            criterion = n_obs * np.log(ssr / n_obs) + 2 * n_params
+            return np.argmin(np.where(np.isfinite(criterion), criterion, np.inf), axis=1)
+        if autolag.lower() == 'bic':
+            criterion = n_obs * np.log(ssr / n_obs) + np.log(n_obs) * n_params
+            return np.argmin(np.where(np.isfinite(criterion), criterion, np.inf), axis=1)
+        if autolag.lower() == 't-stat':
+            # |t| of the last column of each prefix is |Q'y| / residual standard error
+            t_last = np.abs(r[:, first - 1:first + maxlag, -1]) / np.sqrt(ssr / (n_obs - n_params))
+            significant = (t_last >= 1.6448536269514722)[:, ::-1]
+            return np.where(significant.any(axis=1), maxlag - np.argmax(significant, axis=1), 0)
+    raise ValueError("autolag must be 'AIC', 'BIC', 't-stat' or None")
+
+# Function to run the augmented Dickey-Fuller test on every row of a matrix
+def adf_matrix(values, maxlag=None, regression='c', autolag='AIC'):
+    """
+    Batched equivalent of adfuller for a (series x time) array of equal-length series.
+
+    autolag='AIC', 'BIC' or 't-stat' selects the lag of every series from one
+    regression per series on a shared sample; autolag=None is the fixed-lag fast mode
+    and uses maxlag for all of them. Returns a dict of per-series arrays.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_series, n_time = values.shape
+    if maxlag is None:
+        maxlag = default_maxlag(n_time, regression)
+    used_lags = select_lags(values, maxlag, regression, autolag) if autolag else np.full(n_series, maxlag)
+
+    statistic = np.full(n_series, np.nan)
+    n_obs = np.zeros(n_series, dtype=int)
+    for lag in np.unique(used_lags):
+        rows = np.flatnonzero(used_lags == lag)
+        design = adf_design(values[rows], lag, regression, level_last=True)
+        r, ssr = prefix_ssr(design)
+        k = design.shape[2] - 1
+        # The level is the last regressor: its coefficient is R[k-1, -1] / R[k-1, k-1]
+        # and its standard error is the residual standard error / |R[k-1, k-1]|
+        with np.errstate(divide='ignore', invalid='ignore'):
+            statistic[rows] = np.sign(r[:, k - 1, k - 1]) * r[:, k - 1, -1] / np.sqrt(ssr[:, k] / (design.shape[1] - k))
+        n_obs[rows] = design.shape[1]
+
+    statistic[~np.isfinite(statistic)] = np.nan
+    pvalue = np.array([mackinnonp(stat, regression=regression, N=1) if np.isfinite(stat) else np.nan for stat in statistic])
+    critical = {nobs: mackinnoncrit(N=1, regression=regression, nobs=nobs) for nobs in np.unique(n_obs)}
+    critical = np.array([critical[nobs] for nobs in n_obs]).reshape(n_series, 3)
+    return {'adf_statistic': statistic, 'adf_pvalue': pvalue, 'adf_lags': used_lags, 'nobs': n_obs,
+            'adf_1%': critical[:, 0], 'adf_5%': critical[:, 1], 'adf_10%': critical[:, 2]}
+
+# Function to compute the autocovariance sums used by the KPSS variance estimates
+def lagged_products(resids, max_lag):
+    """Return a (series x max_lag) array of sum(e[t] * e[t - i]) for i = 1..max_lag."""
+    products = np.zeros((resids.shape[0], max_lag))
+    for i in range(1, max_lag + 1):
+        products[:, i - 1] = np.einsum('ij,ij->i', resids[:, i:], resids[:, :-i])
+    return products
+
+# Function to run the KPSS test on every row of a matrix
+def kpss_matrix(values, regression='c', nlags='auto'):
+    """
+    Batched equivalent of statsmodels' kpss for a (series x time) array.
+    nlags is 'auto' (Hobijn et al.), 'legacy' or a fixed number of lags.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_series, n_obs = values.shape
+    if regression == 'c':
+        resids = values - values.mean(axis=1, keepdims=True)
+    elif regression == 'ct':
+        trend = trend_columns(n_obs, 'ct')
+        coefficients = np.linalg.lstsq(trend, values.T, rcond=None)[0]
+        resids = values - (trend @ coefficients).T
+    else:
+        raise ValueError("regression must be 'c' or 'ct'")
+
+    sum_squares = np.einsum('ij,ij->i', resids, resids)
+    if nlags == 'auto':
+        cov_lags = int(np.power(n_obs, 2.0 / 9.0))
+        products = lagged_products(resids, cov_lags) / (n_obs / 2.0)
+        s0 = sum_squares / n_obs + products.sum(axis=1)
+        s1 = products @ np.arange(1, cov_lags + 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gamma_hat = 1.1447 * np.power((s1 / s0) ** 2, 1.0 / 3.0)
+        lags = np.nan_to_num(gamma_hat * np.power(n_obs, 1.0 / 3.0)).astype(int)
+        lags = np.minimum(lags, n_obs - 1)
+    elif nlags == 'legacy':
+        lags = np.full(n_series, min(int(np.ceil(12.0 * np.power(n_obs / 100.0, 1 / 4.0))), n_obs - 1))
+    else:
+        if nlags >= n_obs:
+            raise ValueError(f"lags ({nlags}) must be < number of observations ({n_obs})")
+        lags = np.full(n_series, int(nlags))
+
+    # Bartlett-weighted long-run variance, with each series' weights zeroed past its own lag
+    max_lag = int(lags.max()) if n_series else 0
+    steps = np.arange(1, max_lag + 1)
+    weights = np.where(steps <= lags[:, np.newaxis], 1.0 - steps / (lags[:, np.newaxis] + 1.0), 0.0)
+    long_run_variance = (sum_squares + 2 * (lagged_products(resids, max_lag) * weights).sum(axis=1)) / n_obs
+    eta = np.einsum('ij,ij->i', np.cumsum(resids, axis=1), np.cumsum(resids, axis=1)) / n_obs ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        statistic = eta / long_run_variance
+    statistic[~np.isfinite(statistic)] = np.nan
+    pvalue = np.interp(statistic, KPSS_CRITICAL[regression], KPSS_PVALUES)
+    return {'kpss_statistic': statistic, 'kpss_pvalue': pvalue, 'kpss_lags': lags}
+
+# Function to split a month x series frame into equal-length blocks
+def aligned_groups(data):
+    """Drop the missing values of every column and group the columns by remaining length."""
+    values = data.to_numpy(dtype=float)
+    complete = ~np.isnan(values).any(axis=0)
+    if complete.any():
+        yield list(data.columns[complete]), np.ascontiguousarray(values[:, complete].T)
+
+    # Columns with gaps are compacted one by one
+    columns = {name: data[name].dropna().to_numpy(dtype=float) for name in data.columns[~complete]}
+    lengths = pd.Series({name: len(column) for name, column in columns.items()}, dtype=int)
+    for length, names in lengths.groupby(lengths).groups.items():
+        yield list(names), np.vstack([columns[name] for name in names]) if length else np.empty((len(names), 0))
+
+# Function to test the stationarity of every column of a frame in one pass
+def stationarity_table(data, maxlag=None, regression='c', autolag='AIC', kpss_regression='c', nlags='auto', alpha=0.05):
+    """
+    Run batched ADF and KPSS tests on every column of a time x series DataFrame and
+    return one row per series. A series is stationary when ADF rejects a unit root and
+    KPSS does not reject stationarity at alpha. Series too short to test get NaN.
+    """
+    frames = []
+    for names, values in aligned_groups(data):
+        try:
+            results = {**adf_matrix(values, maxlag, regression, autolag), **kpss_matrix(values, kpss_regression, nlags)}
+        except ValueError:
+            results = {'nobs': np.full(len(names), values.shape[1])}
+        frames.append(pd.DataFrame(results, index=names))
+    table = pd.concat(frames).reindex(index=data.columns, columns=STATIONARITY_COLUMNS)
+    table['stationary'] = (table['adf_pvalue'] < alpha) & (table['kpss_pvalue'] > alpha)
+    table.index.name = data.columns.name or 'series'
+    return table
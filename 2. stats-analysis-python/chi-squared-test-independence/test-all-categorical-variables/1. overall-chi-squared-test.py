@@ -1,6 +1,11 @@
 import pandas as pd
 from scipy.stats import chi2_contingency
 import plotly.graph_objects as go
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from dataset_cache import load_repaired_dataset
 
 
 class DataLoader:
@@ -8,9 +13,8 @@ class DataLoader:
     
     @staticmethod
     def load_data(file_path: str) -> pd.DataFrame:
-        """Loads dataset from CSV and processes datetime columns."""
-        data = pd.read_csv(file_path)
-        data['Order Date'] = pd.to_datetime(data['Order Date'])
+        """Loads the repaired dataset, where Order Date is already parsed, and extracts the month."""
+        data = load_repaired_dataset(file_path)
         data['Order Month'] = data['Order Date'].dt.month
         return data
 
@@ -2,16 +2,20 @@ import pandas as pd
 import scipy.stats as stats
 import itertools
 from statsmodels.stats.multitest import multipletests
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from dataset_cache import load_repaired_dataset
 
 # Load the dataset
 def load_data(file_path):
     """Load the dataset from a specified file path."""
-    return pd.read_excel(file_path)
+    return load_repaired_dataset(file_path)
 
-# Convert 'Order Date' to datetime format and extract the month
+# Extract the month of the parsed 'Order Date'
 def preprocess_data(data):
-    """Preprocess data by converting 'Order Date' to datetime and extracting the 'Order Month'."""
-    data['Order Date'] = pd.to_datetime(data['Order Date'])
+    """Preprocess data by extracting the 'Order Month' from 'Order Date'."""
     data['Order Month'] = data['Order Date'].dt.month
     return data
 
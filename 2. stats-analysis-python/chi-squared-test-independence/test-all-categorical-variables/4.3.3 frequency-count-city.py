@@ -1,9 +1,14 @@
 import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from dataset_cache import load_repaired_dataset
 
 # Function to load data
 def load_data(file_path):
     """Load dataset from a specified file path."""
-    return pd.read_excel(file_path)
+    return load_repaired_dataset(file_path)
 
 # Function to count total transaction frequency per city
 def count_city_sales(data):
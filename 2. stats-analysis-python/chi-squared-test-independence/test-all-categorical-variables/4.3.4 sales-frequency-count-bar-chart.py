@@ -1,15 +1,18 @@
-import pandas as pd
 import plotly.express as px
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from dataset_cache import load_repaired_dataset
 
 # Function to load the dataset
 def load_data(file_path):
     """Load dataset from a specified file path."""
-    return pd.read_excel(file_path)
+    return load_repaired_dataset(file_path)
 
-# Function to preprocess data by converting 'Order Date' to datetime and extracting the month
+# Function to preprocess data by extracting the month of the parsed 'Order Date'
 def preprocess_data(data):
-    """Convert 'Order Date' to datetime and extract the month."""
-    data['Order Date'] = pd.to_datetime(data['Order Date'])
+    """Extract the month of the 'Order Date'."""
     data['Order Month'] = data['Order Date'].dt.month
     return data
 
@@ -1,6 +1,11 @@
 import pandas as pd
 import plotly.express as px
 import plotly.io as pio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from dataset_cache import load_repaired_dataset
 
 # Set Plotly to dark theme
 pio.templates.default = "plotly_dark"
@@ -8,12 +13,11 @@ pio.templates.default = "plotly_dark"
 # Function to load the dataset
 def load_data(file_path):
     """Load dataset from a specified file path."""
-    return pd.read_excel(file_path)
+    return load_repaired_dataset(file_path)
 
-# Function to preprocess data: Convert 'Order Date' to datetime and extract month, year, and create Year-Month column
+# Function to preprocess data: extract month, year, and create Year-Month column from the parsed 'Order Date'
 def preprocess_data(data):
-    """Convert 'Order Date' to datetime and extract month, year, and Year-Month column."""
-    data['Order Date'] = pd.to_datetime(data['Order Date'])
+    """Extract month, year, and Year-Month column from 'Order Date'."""
     data['Order Month'] = data['Order Date'].dt.month
     data['Order Year'] = data['Order Date'].dt.year
     data['Order Year-Month'] = pd.to_datetime(dict(year=data['Order Year'], month=data['Order Month'], day=1))
@@ -1,9 +1,13 @@
-import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from dataset_cache import load_repaired_dataset
 
 # Function to load the dataset
 def load_data(file_path):
     """Load dataset from the given file path."""
-    return pd.read_excel(file_path)
+    return load_repaired_dataset(file_path)
 
 # Function to group and sum sales by Region, State, and Category
 def group_sales_by_region_state_category(data):
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import pickle
+import pandas as pd
+from dataset_repair import repair_frame, repair_settings
+
+# Cache directory shared by every analysis script
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dataset-cache')
+
+# Errors raised when a cached frame file is missing or corrupt; the frame is then rebuilt
+CACHE_READ_ERRORS = (OSError, ValueError, EOFError, pickle.UnpicklingError)
+
+# Derived frame holding the repaired export
+REPAIRED_NAME = 'repaired'
+
+# Function to read the size and modification time of the source file
+def file_signature(file_path):
+    """Return the size and modification time of the source file."""
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+# Function to hash the contents of the source file
+def content_hash(file_path, chunk_size=1 << 20):
+    """Return the SHA-256 digest of the file contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Function to locate the cache and manifest files for a source file
+def cache_paths(file_path, cache_dir=None):
+    """Return the cache file stem and manifest path for the given source file."""
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+    stem = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(file_path))[0]}-{key}")
+    return stem, stem + '.json'
+
+# Function to read the source file with the reader matching its extension
+def read_source(file_path):
+    """Parse the raw workbook or CSV export."""
+    if file_path.lower().endswith('.csv'):
+        return pd.read_csv(file_path)
+    return pd.read_excel(file_path)
+
+# Function to write a frame to the columnar cache
+def write_frame(data, stem, cache_format='parquet'):
+    """
+    Write the frame as Parquet, or as uncompressed Feather that readers can memory-map,
+    falling back to a pickle when pyarrow is unavailable.
+    """
+    try:
+        if cache_format == 'feather':
+            # Replace rather than overwrite, so a reader mapping the old file keeps valid pages
+            data.to_feather(stem + '.feather.tmp', compression='uncompressed')
+            os.replace(stem + '.feather.tmp', stem + '.feather')
+            return 'feather'
+        data.to_parquet(stem + '.parquet', index=False)
+        return 'parquet'
+    except (ImportError, TypeError, ValueError):
+        # pyarrow missing or a mixed-type column it cannot encode
+        data.to_pickle(stem + '.pkl')
+        return 'pickle'
+
+# Function to read a frame back from the columnar cache
+def read_frame(stem, cache_format, columns=None):
+    """Read the cached frame, or only the given columns, in the format recorded in the manifest; Feather is memory-mapped."""
+    if cache_format == 'feather':
+        from pyarrow import feather
+        return feather.read_table(stem + '.feather', columns=columns, memory_map=True).to_pandas()
+    if cache_format == 'parquet':
+        return pd.read_parquet(stem + '.parquet', columns=columns)
+    data = pd.read_pickle(stem + '.pkl')
+    return data[columns] if columns is not None else data
+
+# Function to read the manifest of a cached source file
+def read_manifest(manifest_path):
+    """Return the cache manifest, or None when it is missing or unreadable."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+# Function to write the manifest of a cached source file
+def write_manifest(manifest_path, manifest):
+    """Write the cache manifest atomically."""
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(temp_path, manifest_path)
+
+# Function to read a cached frame, or None when its file is missing or unreadable
+def try_read_frame(stem, cache_format, columns=None):
+    """Return the cached frame, or None so the caller rebuilds it from the source."""
+    try:
+        return read_frame(stem, cache_format, columns)
+    except CACHE_READ_ERRORS:
+        return None
+
+# Function to load the dataset through the columnar cache
+def load_dataset(file_path, cache_dir=None, refresh=False):
+    """
+    Load the Superstore dataset, parsing the workbook only when it has changed.
+
+    The cache is keyed by the source file's size, modification time and SHA-256
+    content hash. An unchanged size and mtime serves the cache directly; a touched
+    file with identical contents is re-hashed and still served from the cache. A cached
+    file that is missing or corrupt is rebuilt from the source.
+    """
+    stem, manifest_path = cache_paths(file_path, cache_dir)
+    signature = file_signature(file_path)
+    manifest = None if refresh else read_manifest(manifest_path)
+
+    digest = None
+    if manifest is not None:
+        if manifest['size'] == signature['size'] and manifest['mtime_ns'] == signature['mtime_ns']:
+            data = try_read_frame(stem, manifest['format'])
+            if data is not None:
+                return data
+        else:
+            digest = content_hash(file_path)
+            if manifest['size'] == signature['size'] and manifest['sha256'] == digest:
+                data = try_read_frame(stem, manifest['format'])
+                if data is not None:
+                    write_manifest(manifest_path, {**manifest, **signature})
+                    return data
+    digest = digest or content_hash(file_path)
+
+    data = read_source(file_path)
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    cache_format = write_frame(data, stem)
+    write_manifest(manifest_path, {
+        'source': os.path.abspath(file_path),
+        'format': cache_format,
+        'sha256': digest,
+        'rows': len(data),
+        **signature
+    })
+    return data
+
+# Function to fingerprint the source file without parsing it
+def dataset_fingerprint(file_path, cache_dir=None):
+    """Return the content hash of the source file, trusting the manifest while size and mtime are unchanged."""
+    _, manifest_path = cache_paths(file_path, cache_dir)
+    manifest = read_manifest(manifest_path)
+    signature = file_signature(file_path)
+    if manifest is not None and manifest['size'] == signature['size'] and manifest['mtime_ns'] == signature['mtime_ns']:
+        return manifest['sha256']
+    return content_hash(file_path)
+
+# Function to store a frame derived from the dataset in the cache
+def write_derived_frame(file_path, name, data, params=None, cache_dir=None, cache_format='parquet'):
+    """Write the derived frame with a manifest tying it to the source file's content hash and the build parameters."""
+    stem, _ = cache_paths(file_path, cache_dir)
+    derived_stem = f"{stem}-{name}"
+    os.makedirs(os.path.dirname(derived_stem), exist_ok=True)
+    cache_format = write_frame(data, derived_stem, cache_format)
+    write_manifest(derived_stem + '.json', {
+        'source': os.path.abspath(file_path),
+        'format': cache_format,
+        'sha256': dataset_fingerprint(file_path, cache_dir),
+        'params': json.loads(json.dumps(params)),
+        'rows': len(data)
+    })
+
+# Function to load a frame derived from the dataset through the cache
+def load_derived_frame(file_path, name, build, params=None, cache_dir=None, cache_format='parquet', columns=None):
+    """
+    Return build(dataset) from the cache, rebuilding it only when the source file
+    or the JSON-serialisable build parameters have changed, or the cached file is
+    missing or corrupt.
+    """
+    stem, _ = cache_paths(file_path, cache_dir)
+    derived_stem = f"{stem}-{name}"
+    params = json.loads(json.dumps(params))
+    manifest = read_manifest(derived_stem + '.json')
+    if manifest is not None and manifest['sha256'] == dataset_fingerprint(file_path, cache_dir) and manifest.get('params') == params:
+        data = try_read_frame(derived_stem, manifest['format'], columns)
+        if data is not None:
+            return data
+
+    data = build(load_dataset(file_path, cache_dir))
+    write_derived_frame(file_path, name, data, params, cache_dir, cache_format)
+    return data[columns] if columns is not None else data
+
+# Function to load the repaired, typed dataset
+def load_repaired_dataset(file_path, cache_dir=None, columns=None):
+    """
+    Load the Superstore dataset as repaired by the cleaning step: whitespace normalised,
+    Order and Ship Date as datetime64 (day first), Sales as float and the other text as
+    str. The repaired file is uncompressed Feather, memory-mapped on read
+    so only the requested columns are paged in, and it is rebuilt when the source file or
+    the repair version and settings (dataset_repair.repair_settings) change.
+    """
+    return load_derived_frame(file_path, REPAIRED_NAME, lambda data: repair_frame(data)[0].reset_index(drop=True),
+                              params=repair_settings(), cache_dir=cache_dir, cache_format='feather', columns=columns)
+
+# Function to repair a loaded export and store it where load_repaired_dataset finds it
+def write_repaired_dataset(data, file_path, cache_dir=None):
+    """
+    Repair the frame loaded from file_path and write it as the memory-mappable Feather
+    file that load_repaired_dataset serves for that source. Returns the repaired frame
+    and the repair log.
+    """
+    repaired, log = repair_frame(data)
+    write_derived_frame(file_path, REPAIRED_NAME, repaired.reset_index(drop=True), params=repair_settings(),
+                        cache_dir=cache_dir, cache_format='feather')
+    return repaired, log
@@ -0,0 +1,101 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Version of the repair logic; bump it when a change alters the repaired output
+REPAIR_VERSION = 2
+
+# Whitespace runs collapsed to one space
+WHITESPACE_RUNS = re.compile(r'\s+')
+
+# Date formats tried in order when canonicalising date columns; day first as in the export
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S']
+# Columns repaired as dates and as numbers
+DATE_COLUMNS = ['Order Date', 'Ship Date']
+NUMERIC_COLUMNS = ['Sales']
+
+# Function to collect everything the repaired output depends on
+def repair_settings():
+    """Return the repair version and settings, recorded with the cached repaired frame so a change rebuilds it."""
+    return {
+        'version': REPAIR_VERSION,
+        'date_formats': DATE_FORMATS,
+        'date_columns': DATE_COLUMNS,
+        'numeric_columns': NUMERIC_COLUMNS
+    }
+
+# Function to normalise the whitespace of one value
+def clean_text(text):
+    """Strip the ends and collapse inner whitespace runs to one space."""
+    return WHITESPACE_RUNS.sub(' ', text.strip())
+
+# Function to factorize a column on its whitespace-normalised values
+def normalised_codes(values):
+    """
+    Return the codes (-1 for missing), the distinct cleaned values and a row mask of the
+    values the normalisation changed, cleaning each distinct value once.
+    """
+    codes, uniques = pd.factorize(values)
+    texts = np.array([str(value) for value in uniques], dtype=object)
+    cleaned_codes, cleaned = pd.factorize(np.array([clean_text(text) for text in texts], dtype=object))
+    return np.append(cleaned_codes, -1)[codes], cleaned, np.append(texts != cleaned[cleaned_codes], False)[codes]
+
+# Function to parse distinct date strings against the known formats
+def parse_dates(texts):
+    """Try DATE_FORMATS in order on the values still unparsed; returns the timestamps and the index of the format used (-1 if none)."""
+    texts = pd.Series(texts, dtype=object)
+    parsed = pd.Series(pd.NaT, index=texts.index, dtype='datetime64[ns]')
+    used = np.full(len(texts), -1)
+    for position, date_format in enumerate(DATE_FORMATS):
+        pending = parsed.isna().to_numpy()
+        if not pending.any():
+            break
+        attempt = pd.to_datetime(texts[pending], format=date_format, errors='coerce')
+        parsed[pending] = attempt
+        used[np.flatnonzero(pending)[attempt.notna().to_numpy()]] = position
+    return parsed.to_numpy(), used
+
+# Function to repair the export into typed columns
+def repair_frame(data, date_columns=None, numeric_columns=None):
+    """
+    Return a repaired copy of the frame and a log of the rows changed per (column, repair).
+    Every step runs on the distinct values of a column and is gathered back through its codes:
+    whitespace is normalised in every text column, date columns become datetime64 from the
+    first DATE_FORMATS entry that parses (day first), numeric columns become float (currency
+    signs and thousands separators dropped, unparseable values NaN) and other text columns
+    stay str. Text is not made categorical: groupbys over categories without observed=True
+    would add a row for every unobserved combination under pandas < 3. Settings left as None
+    use the module constants.
+    """
+    date_columns = DATE_COLUMNS if date_columns is None else date_columns
+    numeric_columns = NUMERIC_COLUMNS if numeric_columns is None else numeric_columns
+    repaired, log = {}, []
+    for column in data.columns:
+        values = data[column]
+        if column in date_columns and pd.api.types.is_datetime64_any_dtype(values):
+            repaired[column] = values.astype('datetime64[ns]')
+            continue
+        if column in numeric_columns and pd.api.types.is_numeric_dtype(values):
+            repaired[column] = values.astype(float)
+            continue
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            repaired[column] = values
+            continue
+
+        codes, cleaned, changed = normalised_codes(values)
+        present = codes >= 0
+        log.append({'column': column, 'repair': 'whitespace', 'rows': int(np.count_nonzero(changed))})
+
+        if column in date_columns:
+            parsed, used = parse_dates(cleaned)
+            used = np.append(used, -1)[codes]
+            repaired[column] = pd.Series(np.append(parsed, np.datetime64('NaT', 'ns'))[codes], index=data.index)
+            log.append({'column': column, 'repair': 'date_format', 'rows': int(np.count_nonzero(used > 0))})
+            log.append({'column': column, 'repair': 'unparsed_date', 'rows': int(np.count_nonzero(present & (used < 0)))})
+        elif column in numeric_columns:
+            numbers = pd.to_numeric(pd.Series(cleaned, dtype=object).str.replace(r'[$,]', '', regex=True), errors='coerce').to_numpy(dtype=float)
+            repaired[column] = pd.Series(np.append(numbers, np.nan)[codes], index=data.index)
+            log.append({'column': column, 'repair': 'unparsed_number', 'rows': int(np.count_nonzero(present & repaired[column].isna().to_numpy()))})
+        else:
+            repaired[column] = pd.Series(np.append(cleaned, None)[codes], index=data.index, dtype='str')
+    return pd.DataFrame(repaired, index=data.index), pd.DataFrame(log, columns=['column', 'repair', 'rows'])
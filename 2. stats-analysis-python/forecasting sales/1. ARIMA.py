@@ -1,36 +1,71 @@
 # 1. Dependencies
+import argparse
 import pandas as pd
 import numpy as np
-import math
-import statsmodels.api as sm
-from statsmodels.tsa.stattools import adfuller, kpss
 from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import os
+import sys
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from dataset_cache import load_repaired_dataset
+from time_aggregation import aggregate_sales
+from transforms import log_transform, TransformPipeline
+from sales_cube import load_monthly_cube, cube_matrix
+from fast_ar import fit_ar_batch
+from order_search import search_orders, selected_orders
+from stationarity_cache import StationarityTests, STATIONARITY_CACHE_DIR
+from batch_stationarity import stationarity_table
+from incremental_update import update_from_dataset, state_forecasts
+from model_registry import ModelRegistry
+from holt_winters import fit_holt_winters
+from backtest import backtest
+from reconciliation import hierarchical_forecast
+from prediction_intervals import simulate_quantiles
+from intermittent_demand import forecast_demand
+
+# Batch modes the script can run instead of the single-series workflow
+MODES = ['batch', 'stationarity', 'seasonal', 'backtest', 'reconcile', 'transform', 'quantiles', 'intermittent']
+
+# Memoised ADF/KPSS/ACF/PACF results shared across runs and with the decomposition scripts
+@lru_cache(maxsize=None)
+def stationarity_tests():
+    """Open the stationarity cache on first use rather than at import."""
+    return StationarityTests(cache_dir=STATIONARITY_CACHE_DIR)
+
+# Fitted models reused across runs while the training data is unchanged
+@lru_cache(maxsize=None)
+def model_registry():
+    """Open the model registry on first use rather than at import."""
+    return ModelRegistry()
 
 # 2. Load Dataset
-def load_data(file_path):
-    """Load dataset from the given file path."""
-    data = pd.read_excel(file_path)
-    data['Sales'] = pd.to_numeric(data['Sales'], errors='coerce')
-    return data['Sales'].dropna()  # Ensure no missing values for analysis
+def load_data(file_path, freq='monthly', by=None):
+    """
+    Load the order table and aggregate Sales into a regularly spaced daily, weekly or monthly
+    series (one column per group when `by` is given), with periods without orders set to 0.
+    """
+    data = load_repaired_dataset(file_path, columns=['Order Date', 'Sales'] + ([by] if isinstance(by, str) else list(by or [])))
+    return aggregate_sales(data, freq=freq, value='Sales', by=by)
 
 # 3. Logarithm Transformation
 def apply_log_transformation(series):
     """Apply logarithmic transformation to the series."""
-    return series.apply(lambda x: math.log(x) if x > 0 else None)
+    return log_transform(series)
 
 # 4. Stationarity Test
 def adf_test(series):
     """Perform the Augmented Dickey-Fuller (ADF) test for stationarity."""
-    result = adfuller(series)
+    result = stationarity_tests().adf(series)
     print(f"ADF Statistic: {result[0]}")
     print(f"p-value: {result[1]}")
     return result[1] < 0.05  # Stationary if p-value < 0.05
 
 def kpss_test(series):
     """Perform the Kwiatkowski-Phillips-Schmidt-Shin (KPSS) test for stationarity."""
-    result = kpss(series, regression='c')
+    result = stationarity_tests().kpss(series, regression='c')
     print(f"KPSS Statistic: {result[0]}")
     print(f"p-value: {result[1]}")
     return result[1] > 0.05  # Stationary if p-value > 0.05
@@ -40,10 +75,10 @@ def plot_acf_pacf(series):
     """Plot ACF and PACF for the time series."""
     fig = make_subplots(rows=1, cols=2, subplot_titles=("ACF", "PACF"))
 
-    acf_values = sm.tsa.stattools.acf(series, nlags=20)
+    acf_values = stationarity_tests().acf(series, nlags=20)
     fig.add_trace(go.Bar(x=list(range(len(acf_values))), y=acf_values), row=1, col=1)
 
-    pacf_values = sm.tsa.stattools.pacf(series, nlags=20)
+    pacf_values = stationarity_tests().pacf(series, nlags=20)
     fig.add_trace(go.Bar(x=list(range(len(pacf_values))), y=pacf_values), row=1, col=2)
 
     fig.update_layout(title_text="ACF and PACF Plots", template="plotly_dark")
@@ -62,8 +97,8 @@ def test_stationarity_and_autocorrelation(series):
 
 # 7. Build ARIMA Model
 def fit_arima_model(series, order):
-    """Fit an ARIMA model to the series."""
-    model = sm.tsa.ARIMA(series, order=order).fit()
+    """Fit an ARIMA model to the series, or load it from the registry when the training data is unchanged."""
+    model = model_registry().fit_or_load(series, order)
     print(model.summary())
     return model
 
@@ -93,64 +128,160 @@ def arima_model(series):
             return model_ar
 
 # 9. Execute the ARIMA process
-def main(file_path):
-    """Main function to execute the time series analysis and ARIMA modeling."""
-    series = load_data(file_path)
+def main(file_path, freq='monthly'):
+    """Main function to execute the time series analysis and ARIMA modeling on the aggregated sales."""
+    series = load_data(file_path, freq)
     series = apply_log_transformation(series)  # Apply log transformation
     resulting_model = arima_model(series)
     return resulting_model
 
-# Run the main workflow
+# 10. Batch Forecasting Mode
+def batch_forecast(file_path, dimension='Sub-Category', order=(1, 0, 0), steps=12, workers=None, exact=False):
+    """
+    Fit one ARIMA per monthly series of the given dimension and return the result table.
+    order='auto' selects a (p,d,q)(P,D,Q,12) order per series with the AIC order search first;
+    series for which no candidate order could be fitted are left out of the results.
+    Pure AR orders are estimated in closed form in one batch unless exact=True; orders
+    with MA or seasonal terms are fitted in parallel by exact likelihood.
+    """
+    monthly_sales = cube_matrix(load_monthly_cube(file_path), dimension, 'sum')
+    if order == 'auto':
+        search = search_orders(monthly_sales, workers=workers)
+        print(search[['series', 'order', 'seasonal_order', 'aic', 'models_fitted', 'models_pruned', 'search_seconds']])
+        order = selected_orders(search)
+        monthly_sales = monthly_sales[list(order)]
+    results = fit_ar_batch(monthly_sales, order=order, steps=steps, exact=exact, workers=workers)
+    results.insert(0, 'dimension', dimension)
+    return results
+
+# 11. Batch Stationarity Sweep
+def stationarity_sweep(file_path, dimension='Sub-Category', autolag='AIC'):
+    """
+    Run ADF and KPSS on every log-transformed monthly series of the given dimension in one batch.
+    autolag=None is the fixed-lag fast mode.
+    """
+    monthly_sales = cube_matrix(load_monthly_cube(file_path), dimension, 'sum')
+    table = stationarity_table(log_transform(monthly_sales), autolag=autolag)
+    table.insert(0, 'dimension', dimension)
+    return table
+
+# 12. Incremental Monthly Update
+def incremental_forecast(file_path, dimension='Sub-Category', order=(1, 0, 0), steps=12, refresh=False):
+    """
+    Append the months added since the last run to the saved ARIMA state of every series
+    and forecast from it; series are refitted only when new, restated or refresh is set.
+    """
+    summary, states = update_from_dataset(file_path, dimension, order=order, refresh=refresh)
+    forecasts = state_forecasts(states, steps).loc[summary['series']]
+    return pd.concat([summary.set_index('series')[['action', 'nobs', 'new_months']], forecasts], axis=1)
+
+# 13. Holt-Winters Seasonal Forecasts
+def seasonal_forecast(file_path, dimension='Sub-Category', model='additive', steps=12):
+    """Fit Holt-Winters with a 12-month season to every monthly series of the given dimension in one batch."""
+    monthly_sales = cube_matrix(load_monthly_cube(file_path), dimension, 'sum')
+    results = fit_holt_winters(monthly_sales, period=12, model=model, steps=steps)
+    results.insert(0, 'dimension', dimension)
+    return results
+
+# 14. Rolling-Origin Backtest
+def backtest_forecasts(file_path, dimension='Sub-Category', order=(1, 0, 0), folds=6, horizon=6, refit='warm', workers=None, output_path=None):
+    """
+    Evaluate the ARIMA of every monthly series of the given dimension on expanding windows,
+    forecasting 1..horizon months from each of the last `folds` origins, and return the
+    MAPE, sMAPE and MASE of every series and horizon.
+    """
+    monthly_sales = cube_matrix(load_monthly_cube(file_path), dimension, 'sum')
+    accuracy, _ = backtest(monthly_sales, order=order, folds=folds, horizon=horizon, refit=refit, workers=workers, output_path=output_path)
+    accuracy.insert(0, 'dimension', dimension)
+    return accuracy
+
+# 15. Hierarchical Reconciliation
+def reconciled_forecast(file_path, levels=('Category', 'Sub-Category'), order=(1, 0, 0), steps=12, methods=('bottom_up', 'top_down', 'ols', 'mint_diagonal')):
+    """Forecast every node of a hierarchy (e.g. Category -> Sub-Category, Region -> State) in one batch and make the forecasts add up."""
+    return hierarchical_forecast(load_monthly_cube(file_path), levels=levels, order=order, steps=steps, methods=('base',) + tuple(methods))
+
+# 16. Forecasts Through a Transform Pipeline
+def transformed_forecast(file_path, transform=('boxcox',), order=(1, 0, 0), steps=12, alpha=0.05):
+    """
+    Fit the ARIMA on transformed monthly sales and return the forecast and its interval on
+    the sales scale. Interval bounds are mapped back only for pipelines without differencing
+    (put differencing in the ARIMA order instead), since bounds do not add up like values.
+    """
+    pipeline = TransformPipeline(transform)
+    series = pipeline.fit_transform(load_data(file_path)).dropna()
+    prediction = fit_arima_model(series, order).get_forecast(steps)
+    months = pd.date_range(series.index[-1] + pd.offsets.MonthEnd(), periods=steps, freq='ME')
+    forecast = pd.DataFrame({'forecast': pipeline.inverse(np.asarray(prediction.predicted_mean))}, index=months)
+    if not any(name in ('diff', 'seasonal_diff') for name, _ in pipeline.steps):
+        bounds = np.asarray(prediction.conf_int(alpha=alpha))
+        forecast['lower'], forecast['upper'] = pipeline.inverse(bounds[:, 0]), pipeline.inverse(bounds[:, 1])
+    return forecast
+
+# 17. Simulated Prediction Intervals
+def forecast_quantiles(file_path, dimension='Sub-Category', order=(1, 0, 0), steps=12, n_paths=10000, seed=0, transform=('log1p',)):
+    """
+    P10/P50/P90 monthly sales of every series of the given dimension, from n_paths seeded
+    simulated paths per series fitted on log1p sales so the quantiles stay non-negative.
+    """
+    monthly_sales = cube_matrix(load_monthly_cube(file_path), dimension, 'sum')
+    quantiles = simulate_quantiles(monthly_sales, order=order, steps=steps, n_paths=n_paths, seed=seed, transform=transform)
+    quantiles.insert(0, 'dimension', dimension)
+    return quantiles
+
+# 18. Intermittent-Demand Forecasts
+def intermittent_forecast(file_path, dimension='Product ID', steps=12, method='sba', order=(1, 0, 0)):
+    """
+    Forecast the monthly sales of every product (or other grouping column) with zero months
+    kept: smooth series go to the batch ARIMA path, the rest to Croston, SBA or TSB.
+    """
+    results = forecast_demand(load_data(file_path, 'monthly', by=dimension), steps=steps, method=method, order=order)
+    results.insert(0, 'dimension', dimension)
+    return results
+
+# 19. Command-Line Modes
+def parse_args(argv=None):
+    """Parse the optional batch mode; without one the script runs the single-series ARIMA workflow only."""
+    parser = argparse.ArgumentParser(description="ARIMA forecasting of Superstore monthly sales.")
+    parser.add_argument('mode', nargs='?', choices=MODES, help="batch forecasting mode to run instead of the single-series workflow")
+    parser.add_argument('--output', help="CSV path for the backtest accuracy table (not written unless given)")
+    return parser.parse_args(argv)
+
+def run_mode(mode, file_path, output_path=None):
+    """Run one batch forecasting mode and print its results."""
+    if mode == 'batch':
+        # Forecast every sub-category, region and segment in one batch
+        print(pd.concat([batch_forecast(file_path, dimension) for dimension in ('Sub-Category', 'Region', 'Segment')], ignore_index=True))
+    elif mode == 'stationarity':
+        # Stationarity of every sub-category, region and segment in one batch
+        sweep = pd.concat([stationarity_sweep(file_path, dimension) for dimension in ('Sub-Category', 'Region', 'Segment')])
+        print(sweep[['dimension', 'adf_statistic', 'adf_pvalue', 'kpss_statistic', 'kpss_pvalue', 'stationary']])
+    elif mode == 'seasonal':
+        # Seasonal forecasts for every sub-category, state and segment
+        print(pd.concat([seasonal_forecast(file_path, dimension) for dimension in ('Sub-Category', 'State', 'Segment')], ignore_index=True))
+    elif mode == 'backtest':
+        # Backtest accuracy of every sub-category forecast by horizon
+        accuracy = backtest_forecasts(file_path, output_path=output_path)
+        print(accuracy.groupby('horizon')[['mape', 'smape', 'mase']].mean())
+    elif mode == 'reconcile':
+        # Coherent forecasts over Category -> Sub-Category and Region -> State
+        for levels in (('Category', 'Sub-Category'), ('Region', 'State')):
+            reconciled = reconciled_forecast(file_path, levels)
+            print(reconciled[reconciled['level'] != levels[-1]])
+    elif mode == 'transform':
+        # Box-Cox forecast of total monthly sales, back on the sales scale
+        print(transformed_forecast(file_path))
+    elif mode == 'quantiles':
+        # Quantile forecasts of every sub-category for inventory planning
+        print(forecast_quantiles(file_path))
+    elif mode == 'intermittent':
+        # Product-level forecasts routed by demand pattern
+        print(intermittent_forecast(file_path).groupby(['demand_class', 'method']).size())
+
+# Run the main workflow, or one batch mode when given (e.g. python "1. ARIMA.py" backtest --output accuracy.csv)
 if __name__ == "__main__":
     file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
-    model = main(file_path)
-
-"""
-ADF Statistic: -68.4498114214115
-p-value: 0.0
-KPSS Statistic: 0.07649061258135344
-p-value: 0.1
-C:\Users\loydt\AppData\Local\Temp\ipykernel_15936\1139732235.py:30: InterpolationWarning:
-
-The test statistic is outside of the range of p-values available in the
-look-up table. The actual p-value is greater than the p-value returned.
-
-
-Series is stationary.
-                               SARIMAX Results                                
-==============================================================================
-Dep. Variable:                  Sales   No. Observations:                 9800
-Model:                 ARIMA(1, 0, 0)   Log Likelihood              -18788.007
-Date:                Wed, 30 Oct 2024   AIC                          37582.014
-Time:                        20:47:10   BIC                          37603.584
-Sample:                             0   HQIC                         37589.323
-                               - 9800                                         
-Covariance Type:                  opg                                         
-==============================================================================
-                 coef    std err          z      P>|z|      [0.025      0.975]
-------------------------------------------------------------------------------
-const          4.1111      0.017    240.792      0.000       4.078       4.145
-ar.L1          0.0142      0.010      1.415      0.157      -0.005       0.034
-sigma2         2.7085      0.046     58.994      0.000       2.619       2.799
-===================================================================================
-Ljung-Box (L1) (Q):                   0.00   Jarque-Bera (JB):               178.58
-Prob(Q):                              0.98   Prob(JB):                         0.00
-Heteroskedasticity (H):               0.99   Skew:                             0.19
-Prob(H) (two-sided):                  0.88   Kurtosis:                         2.46
-===================================================================================
-
-Warnings:
-[1] Covariance matrix calculated using the outer product of gradients (complex-step).
-ADF Statistic: -68.95774979092295
-p-value: 0.0
-KPSS Statistic: 0.07625561044700856
-p-value: 0.1
-C:\Users\loydt\AppData\Local\Temp\ipykernel_15936\1139732235.py:30: InterpolationWarning:
-
-The test statistic is outside of the range of p-values available in the
-look-up table. The actual p-value is greater than the p-value returned.
-
-
-Series is stationary.
-No autocorrelation in AR model residuals.
-"""
+    args = parse_args()
+    if args.mode is None:
+        model = main(file_path)
+    else:
+        run_mode(args.mode, file_path, args.output)
@@ -0,0 +1,121 @@
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+# Function to separate a non-seasonal order from an optional seasonal order
+def split_order(order):
+    """Return ((p, d, q), (P, D, Q, s)) from either form of order."""
+    if len(order) == 2:
+        return tuple(order[0]), tuple(order[1])
+    return tuple(order), (0, 0, 0, 0)
+
+# Function to fit one series inside a worker process
+def fit_series(name, values, order, steps):
+    """
+    Fit an ARIMA to a NumPy array and return a flat result record; errors are returned, not raised.
+    `order` is (p, d, q) or ((p, d, q), (P, D, Q, s)).
+    """
+    start = time.perf_counter()
+    order, seasonal_order = split_order(order)
+    record = {'series': name, 'order': order, 'seasonal_order': seasonal_order, 'nobs': len(values)}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            model = sm.tsa.ARIMA(values, order=order, seasonal_order=seasonal_order).fit()
+        record.update({
+            'aic': model.aic,
+            'bic': model.bic,
+            'params': dict(zip(model.param_names, np.asarray(model.params))),
+            'forecast': np.asarray(model.forecast(steps)),
+            'error': None
+        })
+    except Exception as error:
+        record.update({'aic': np.nan, 'bic': np.nan, 'params': {}, 'forecast': np.full(steps, np.nan),
+                       'error': f"{type(error).__name__}: {error}"})
+    record['fit_seconds'] = time.perf_counter() - start
+    return record
+
+# Function to turn a matrix or mapping of series into compact float arrays
+def series_arrays(series):
+    """Return (name, float array) pairs from a month x series DataFrame or a name -> values mapping."""
+    items = series.items() if isinstance(series, (pd.DataFrame, dict)) else series
+    for name, values in items:
+        values = pd.Series(values).dropna()
+        yield name, np.ascontiguousarray(values.to_numpy(dtype=float))
+
+# Function to gather worker records into one result table
+def batch_results_table(records, steps):
+    """Flatten per-series records into one row per series with parameter and forecast columns."""
+    rows = []
+    for record in records:
+        row = {key: record[key] for key in ('series', 'order', 'seasonal_order', 'nobs', 'aic', 'bic', 'fit_seconds', 'error')}
+        row.update(record['params'])
+        row.update({f"h{step}": value for step, value in enumerate(record['forecast'], start=1)})
+        rows.append(row)
+    table = pd.DataFrame(rows)
+    leading = ['series', 'order', 'seasonal_order', 'nobs', 'aic', 'bic']
+    forecast_columns = [f"h{step}" for step in range(1, steps + 1)]
+    params = [column for column in table.columns if column not in leading + forecast_columns + ['fit_seconds', 'error']]
+    return table[leading + params + forecast_columns + ['fit_seconds', 'error']]
+
+# Function to build the result record of a series whose fit did not return
+def error_record(task, steps, message):
+    """Return an all-NaN record carrying the error message for a (name, values, order) task."""
+    name, values, series_order = task
+    non_seasonal, seasonal = split_order(series_order)
+    return {'series': name, 'order': non_seasonal, 'seasonal_order': seasonal, 'nobs': len(values), 'aic': np.nan, 'bic': np.nan,
+            'params': {}, 'forecast': np.full(steps, np.nan), 'fit_seconds': np.nan, 'error': message}
+
+# Function to fit a list of series over one process pool
+def pool_records(tasks, steps, workers):
+    """Return the records of the tasks that finished and the tasks left unfinished because a worker died and broke the pool."""
+    records, unfinished = [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fit_series, name, values, series_order, steps): (name, values, series_order)
+                   for name, values, series_order in tasks}
+        for future in as_completed(futures):
+            try:
+                records.append(future.result())
+            except BrokenProcessPool:
+                unfinished.append(futures[future])
+            except Exception as error:
+                records.append(error_record(futures[future], steps, f"{type(error).__name__}: {error}"))
+    return records, unfinished
+
+# Function to fit many independent ARIMA models in parallel
+def fit_arima_batch(series, order=(1, 0, 0), steps=12, workers=None):
+    """
+    Fit one ARIMA per series over a process pool and return a result table with the
+    parameters, AIC/BIC and a steps-ahead forecast for every series.
+
+    `order` is either one order or a mapping from series name to order, where an
+    order is (p, d, q) or ((p, d, q), (P, D, Q, s)).
+    Series that fail to fit keep a row with the error message instead of aborting
+    the batch. A worker that dies (e.g. out of memory) breaks the whole pool, so the
+    series it left unfinished are refitted one at a time in fresh single-worker pools:
+    the first one to break such a pool is the series that kills its worker and gets an
+    error row, and the rest carry on. workers=1 fits in the calling process.
+    """
+    tasks = [(name, values, order[name] if isinstance(order, dict) else order) for name, values in series_arrays(series)]
+    if workers == 1:
+        records = [fit_series(name, values, series_order, steps) for name, values, series_order in tasks]
+    else:
+        position = {name: index for index, (name, _, _) in enumerate(tasks)}
+        records, unfinished = pool_records(tasks, steps, workers)
+        while unfinished:
+            # One worker runs the tasks in submission order, so the first one left
+            # unfinished is the series that killed it
+            unfinished.sort(key=lambda task: position[task[0]])
+            retried, broken = pool_records(unfinished, steps, 1)
+            records.extend(retried)
+            if broken:
+                broken.sort(key=lambda task: position[task[0]])
+                records.append(error_record(broken[0], steps, "BrokenProcessPool: the worker process died while fitting this series"))
+                broken = broken[1:]
+            unfinished = broken
+        records.sort(key=lambda record: position[record['series']])
+    return batch_results_table(records, steps)
@@ -0,0 +1,132 @@
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from arima_batch import split_order, series_arrays
+
+# Columns of the accuracy table
+ACCURACY_COLUMNS = ['series', 'horizon', 'folds', 'mape', 'smape', 'mase']
+
+# Function to place the training-window ends of the expanding folds
+def rolling_origins(n_obs, folds=6, horizon=6, min_train=24):
+    """Return up to `folds` origins one month apart; the last leaves `horizon` months to test."""
+    last = n_obs - horizon
+    return list(range(max(min_train, last - folds + 1), last + 1))
+
+# Function to backtest one series over a chain of consecutive folds
+def backtest_chain(name, values, origins, order, horizon, refit='warm'):
+    """
+    Fit on values[:origin] and forecast `horizon` months for each origin in turn.
+
+    refit='full' fits every fold from scratch, 'warm' refits starting from the previous
+    fold's parameters, and 'append' extends the previous fold's results with the new
+    months through the state-space filter without re-estimating. Errors are returned
+    per fold, and the next fold then starts from scratch.
+    """
+    non_seasonal, seasonal = split_order(order)
+    records = []
+    model, previous = None, None
+    for origin in origins:
+        start = time.perf_counter()
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                if model is not None and refit == 'append':
+                    model = model.append(values[previous:origin])
+                elif model is not None and refit == 'warm':
+                    model = sm.tsa.ARIMA(values[:origin], order=non_seasonal, seasonal_order=seasonal).fit(start_params=model.params)
+                else:
+                    model = sm.tsa.ARIMA(values[:origin], order=non_seasonal, seasonal_order=seasonal).fit()
+            forecast, error = np.asarray(model.forecast(horizon)), None
+        except Exception as failure:
+            model, forecast, error = None, np.full(horizon, np.nan), f"{type(failure).__name__}: {failure}"
+        records.append({'series': name, 'origin': origin, 'forecast': forecast, 'error': error, 'fit_seconds': time.perf_counter() - start})
+        previous = origin
+    return records
+
+# Function to compute the in-sample naive error used to scale MASE
+def mase_scale(values, origins, season=1):
+    """Mean absolute `season`-step naive error of values[:origin] for every origin, from one cumulative sum."""
+    naive_errors = np.concatenate([[0.0], np.cumsum(np.abs(values[season:] - values[:-season]))])
+    origins = np.asarray(origins)
+    return naive_errors[origins - season] / (origins - season)
+
+# Function to compute the error measures of every fold and horizon at once
+def accuracy_metrics(actual, forecast, scale):
+    """Return the absolute percentage, symmetric absolute percentage and scaled errors of (folds x horizon) arrays."""
+    absolute_error = np.abs(actual - forecast)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.where(actual != 0, absolute_error / np.abs(actual), np.nan)
+        sape = np.where(np.abs(actual) + np.abs(forecast) > 0, 2 * absolute_error / (np.abs(actual) + np.abs(forecast)), np.nan)
+        ase = absolute_error / scale[:, np.newaxis]
+    ase[~np.isfinite(ase)] = np.nan
+    return ape, sape, ase
+
+# Function to schedule the backtest tasks
+def run_backtest_tasks(tasks, workers=None):
+    """Run backtest_chain tasks serially (workers=1) or on a process pool; a dead worker fails only its folds."""
+    if workers == 1:
+        return [record for task in tasks for record in backtest_chain(*task)]
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(backtest_chain, *task): task for task in tasks}
+        for future in as_completed(futures):
+            name, _, origins, _, horizon, _ = futures[future]
+            try:
+                records.extend(future.result())
+            except Exception as error:
+                records.extend({'series': name, 'origin': origin, 'forecast': np.full(horizon, np.nan),
+                                'error': f"{type(error).__name__}: {error}", 'fit_seconds': np.nan} for origin in origins)
+    return records
+
+# Function to backtest many series with rolling origins
+def backtest(series, order=(1, 0, 0), folds=6, horizon=6, min_train=24, refit='warm', season=1, workers=None, output_path=None):
+    """
+    Rolling-origin evaluation with expanding windows for every series of a month x series
+    DataFrame (or name -> values mapping), with 1..horizon month forecasts per fold.
+
+    With refit='full' every (series, fold) is an independent task on the process pool;
+    'warm' and 'append' reuse each fold's fitted model for the next, so the folds of a
+    series run as one task. Returns the accuracy table (one row per series and horizon,
+    MAPE and sMAPE in percent, MASE against the `season`-step naive forecast), written
+    to output_path (.csv or .parquet) when given, and the per-fold records.
+    """
+    arrays = dict(series_arrays(series))
+    tasks = []
+    for name, values in arrays.items():
+        series_order = order[name] if isinstance(order, dict) else order
+        origins = rolling_origins(len(values), folds, horizon, min_train)
+        chains = [[origin] for origin in origins] if refit == 'full' else [origins]
+        tasks.extend((name, values, chain, series_order, horizon, refit) for chain in chains if chain)
+    records = run_backtest_tasks(tasks, workers)
+
+    rank = {name: position for position, name in enumerate(arrays)}
+    folds_table = pd.DataFrame(records, columns=['series', 'origin', 'forecast', 'error', 'fit_seconds'])
+    folds_table = folds_table.iloc[np.lexsort((folds_table['origin'], folds_table['series'].map(rank)))].reset_index(drop=True)
+    rows = []
+    for name, group in folds_table.groupby('series', sort=False):
+        values = arrays[name]
+        origins = group['origin'].to_numpy()
+        actual = values[origins[:, np.newaxis] + np.arange(horizon)]
+        forecast = np.vstack(group['forecast'].to_numpy())
+        ape, sape, ase = accuracy_metrics(actual, forecast, mase_scale(values, origins, season))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            rows.append(pd.DataFrame({
+                'series': name,
+                'horizon': np.arange(1, horizon + 1),
+                'folds': np.isfinite(forecast).sum(axis=0),
+                'mape': 100 * np.nanmean(ape, axis=0),
+                'smape': 100 * np.nanmean(sape, axis=0),
+                'mase': np.nanmean(ase, axis=0)
+            }))
+    accuracy = pd.concat(rows, ignore_index=True)[ACCURACY_COLUMNS] if rows else pd.DataFrame(columns=ACCURACY_COLUMNS)
+
+    if output_path:
+        if output_path.endswith('.parquet'):
+            accuracy.to_parquet(output_path, index=False)
+        else:
+            accuracy.to_csv(output_path, index=False, float_format='%.4f')
+    return accuracy, folds_table
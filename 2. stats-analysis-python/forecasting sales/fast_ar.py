@@ -0,0 +1,131 @@
+import time
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from batch_stationarity import aligned_groups
+from arima_batch import split_order, fit_arima_batch
+
+# Function to estimate AR(p) coefficients of every row by conditional least squares
+def ar_ols(values, p, constant=True):
+    """
+    Regress y[t] on [1, y[t-1], ..., y[t-p]] for every row of a (series x time) array
+    with one batched QR of the lagged design. Returns (intercepts, coefficients, sigma2)
+    with sigma2 as the maximum-likelihood residual variance.
+    """
+    windows = sliding_window_view(values, p + 1, axis=1)[:, :, ::-1]
+    n_series, n_obs = windows.shape[:2]
+    columns = [np.ones((n_series, n_obs, 1))] if constant else []
+    design = np.concatenate(columns + [windows[:, :, 1:], windows[:, :, :1]], axis=2)
+    r = np.linalg.qr(design, mode='r')
+    k = design.shape[2] - 1
+    beta = np.linalg.solve(r[:, :k, :k], r[:, :k, -1:])[:, :, 0]
+    sigma2 = r[:, k, -1] ** 2 / n_obs
+    intercept = beta[:, 0] if constant else np.zeros(n_series)
+    return intercept, beta[:, int(constant):], sigma2
+
+# Function to estimate AR(p) coefficients of every row from the sample autocovariances
+def ar_yule_walker(values, p, constant=True):
+    """Solve the Yule-Walker equations of every row at once from biased sample autocovariances."""
+    n_series, n_obs = values.shape
+    mean = values.mean(axis=1) if constant else np.zeros(n_series)
+    centred = values - mean[:, np.newaxis]
+    autocov = np.stack([np.einsum('ij,ij->i', centred[:, lag:], centred[:, :n_obs - lag]) / n_obs for lag in range(p + 1)], axis=1)
+    lags = np.abs(np.subtract.outer(np.arange(p), np.arange(p)))
+    coefficients = np.linalg.solve(autocov[:, lags], autocov[:, 1:, np.newaxis])[:, :, 0]
+    sigma2 = autocov[:, 0] - np.einsum('ij,ij->i', coefficients, autocov[:, 1:])
+    return mean * (1 - coefficients.sum(axis=1)), coefficients, sigma2
+
+# Function to forecast every row recursively
+def ar_forecast(values, intercept, coefficients, steps):
+    """Iterate y[t] = c + sum(phi_i * y[t-i]) forward `steps` months for every row."""
+    p = coefficients.shape[1]
+    history = values[:, values.shape[1] - p:] if p else values[:, :0]
+    forecast = np.empty((values.shape[0], steps))
+    for step in range(steps):
+        forecast[:, step] = intercept + np.einsum('ij,ij->i', coefficients, history[:, ::-1])
+        history = np.concatenate([history[:, 1:], forecast[:, step:step + 1]], axis=1) if p else history
+    return forecast
+
+# Function to undo d rounds of differencing on the forecasts
+def integrate_forecast(values, forecast, d):
+    """Add the differenced forecasts back onto the last observed level of each differencing round."""
+    levels = [values]
+    for _ in range(d):
+        levels.append(np.diff(levels[-1], axis=1))
+    for level in reversed(levels[:-1]):
+        forecast = level[:, -1:] + np.cumsum(forecast, axis=1)
+    return forecast
+
+# Function to fit AR(p, d, 0) to a block of equal-length series
+def fit_ar_matrix(values, order=(1, 0, 0), steps=12, method='ols'):
+    """
+    Fit AR(p) with d rounds of differencing to every row of a (series x time) array.
+    As in statsmodels' ARIMA, a constant is estimated only when d is 0 and it is
+    reported as the process mean. Returns a dict of per-series arrays.
+    """
+    p, d, q = order
+    if q:
+        raise ValueError("fit_ar_matrix only handles pure AR orders; use fit_arima_batch for MA terms")
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    differenced = np.diff(values, n=d, axis=1) if d else values
+    estimator = {'ols': ar_ols, 'yule-walker': ar_yule_walker}[method]
+    intercept, coefficients, sigma2 = estimator(differenced, p, constant=d == 0)
+
+    forecast = integrate_forecast(values, ar_forecast(differenced, intercept, coefficients, steps), d)
+    n_obs = differenced.shape[1] - p
+    n_params = p + (d == 0) + 1
+    llf = -n_obs / 2 * (np.log(2 * np.pi * sigma2) + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = intercept / (1 - coefficients.sum(axis=1))
+    return {'intercept': intercept, 'mean': mean, 'coefficients': coefficients, 'sigma2': sigma2,
+            'aic': -2 * llf + 2 * n_params, 'bic': -2 * llf + np.log(n_obs) * n_params, 'forecast': forecast}
+
+# Function to lay out fast AR results like fit_arima_batch
+def ar_results_table(names, order, nobs, fitted, steps, fit_seconds):
+    """Return the fit_arima_batch column layout for one block of AR results."""
+    p, d, _ = order
+    table = pd.DataFrame({'series': names, 'order': [tuple(order)] * len(names), 'seasonal_order': [(0, 0, 0, 0)] * len(names),
+                          'nobs': nobs, 'aic': fitted['aic'], 'bic': fitted['bic']})
+    if d == 0:
+        table['const'] = fitted['mean']
+    for lag in range(p):
+        table[f"ar.L{lag + 1}"] = fitted['coefficients'][:, lag]
+    table['sigma2'] = fitted['sigma2']
+    for step in range(steps):
+        table[f"h{step + 1}"] = fitted['forecast'][:, step]
+    table['fit_seconds'] = fit_seconds
+    table['error'] = None
+    return table
+
+# Function to forecast many series, using the closed-form path for pure AR orders
+def fit_ar_batch(series, order=(1, 0, 0), steps=12, method='ols', exact=False, workers=None):
+    """
+    Fit every series of a month x series DataFrame and return the fit_arima_batch table.
+
+    Series whose order is pure AR (no MA or seasonal terms) are estimated in closed form,
+    in one batched call per order and series length; their AIC/BIC are conditional on the
+    first p observations. Series with MA or seasonal terms, or every series when exact
+    is set, go through the exact-likelihood fit_arima_batch.
+    """
+    orders = {name: split_order(order[name] if isinstance(order, dict) else order) for name in series.columns}
+    is_fast = {name: not exact and non_seasonal[2] == 0 and not any(seasonal) for name, (non_seasonal, seasonal) in orders.items()}
+    fast = [name for name in series.columns if is_fast[name]]
+    exact_names = [name for name in series.columns if not is_fast[name]]
+
+    tables = []
+    for ar_order in sorted({orders[name][0] for name in fast}):
+        block = series[[name for name in fast if orders[name][0] == ar_order]]
+        for names, values in aligned_groups(block):
+            start = time.perf_counter()
+            fitted = fit_ar_matrix(values, ar_order, steps, method)
+            seconds = (time.perf_counter() - start) / len(names)
+            tables.append(ar_results_table(names, ar_order, values.shape[1], fitted, steps, seconds))
+    if exact_names:
+        exact_order = {name: order[name] for name in exact_names} if isinstance(order, dict) else order
+        tables.append(fit_arima_batch(series[exact_names], exact_order, steps, workers))
+
+    table = pd.concat(tables, ignore_index=True).set_index('series').loc[list(series.columns)].reset_index()
+    leading = ['series', 'order', 'seasonal_order', 'nobs', 'aic', 'bic']
+    forecast_columns = [f"h{step}" for step in range(1, steps + 1)]
+    params = [column for column in table.columns if column not in leading + forecast_columns + ['fit_seconds', 'error']]
+    return table[leading + params + forecast_columns + ['fit_seconds', 'error']]
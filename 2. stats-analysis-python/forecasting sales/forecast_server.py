@@ -0,0 +1,176 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sales_cube import load_monthly_cube, cube_matrix, CUBE_DIMENSIONS
+from model_registry import fit_arima
+
+# Limits of the service
+MAX_HORIZON = 60
+LATENCY_WINDOW = 1000
+# Largest AR, differencing and MA terms a client may request
+MAX_ORDER = (5, 2, 5)
+
+class ForecastService:
+    """
+    Monthly sales forecasts served from memory. The sales cube is loaded once; fitted
+    models are kept per (dimension, series, order) in a bounded LRU, and concurrent
+    requests for a model that is still fitting wait on the same fit.
+    """
+
+    def __init__(self, file_path, max_models=64, order=(1, 0, 0)):
+        self.cube = load_monthly_cube(file_path)
+        self.matrices = {}
+        self.max_models = max_models
+        self.order = order
+        self.models = OrderedDict()
+        self.pending = {}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {'requests': 0, 'hits': 0, 'misses': 0, 'shared_fits': 0, 'fits': 0, 'evictions': 0, 'errors': 0}
+
+    def monthly_sales(self, dimension, series):
+        """Return the monthly sales of one series, building the dimension's matrix on first use."""
+        if dimension not in CUBE_DIMENSIONS:
+            raise KeyError(f"unknown dimension '{dimension}'")
+        if dimension not in self.matrices:
+            self.matrices[dimension] = cube_matrix(self.cube, dimension, 'sum')
+        if series not in self.matrices[dimension].columns:
+            raise KeyError(f"unknown {dimension} '{series}'")
+        return self.matrices[dimension][series]
+
+    async def model(self, dimension, series, order):
+        """Return the fitted model, fitting it once in a worker thread when it is not cached."""
+        key = (dimension, series, order)
+        if key in self.models:
+            self.counters['hits'] += 1
+            self.models.move_to_end(key)
+            return self.models[key], 'hit'
+        if key in self.pending:
+            self.counters['shared_fits'] += 1
+            return await asyncio.shield(self.pending[key]), 'shared'
+
+        values = self.monthly_sales(dimension, series).to_numpy(dtype=float)
+        self.counters['misses'] += 1
+        fit = asyncio.get_running_loop().run_in_executor(None, fit_arima, values, order)
+        self.pending[key] = fit
+        try:
+            model = await fit
+        finally:
+            del self.pending[key]
+        self.counters['fits'] += 1
+        self.models[key] = model
+        while len(self.models) > self.max_models:
+            self.models.popitem(last=False)
+            self.counters['evictions'] += 1
+        return model, 'miss'
+
+    async def forecast(self, dimension, series, horizon, order):
+        """Forecast `horizon` months ahead and return a JSON-ready payload."""
+        model, cache = await self.model(dimension, series, order)
+        last_month = self.monthly_sales(dimension, series).index[-1]
+        months = pd.date_range(last_month + pd.offsets.MonthEnd(), periods=horizon, freq='ME')
+        return {
+            'dimension': dimension,
+            'series': series,
+            'order': list(order),
+            'horizon': horizon,
+            'months': [month.strftime('%Y-%m-%d') for month in months],
+            'forecast': np.asarray(model.forecast(horizon)).tolist(),
+            'cache': cache
+        }
+
+    def stats(self):
+        """Return the request counters, hit rate and latency percentiles in milliseconds."""
+        answered = self.counters['hits'] + self.counters['misses'] + self.counters['shared_fits']
+        latencies = np.array(self.latencies) * 1000
+        return {
+            **self.counters,
+            'hit_rate': (self.counters['hits'] + self.counters['shared_fits']) / answered if answered else 0.0,
+            'cached_models': len(self.models),
+            'latency_ms': {
+                'mean': float(latencies.mean()) if len(latencies) else None,
+                'p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'p95': float(np.percentile(latencies, 95)) if len(latencies) else None,
+                'max': float(latencies.max()) if len(latencies) else None
+            }
+        }
+
+    async def route(self, method, target):
+        """Map one request to (status, payload)."""
+        url = urlsplit(target)
+        if method != 'GET':
+            return 405, {'error': 'only GET is supported'}
+        if url.path == '/stats':
+            return 200, self.stats()
+        if url.path == '/health':
+            return 200, {'status': 'ok'}
+        if url.path != '/forecast':
+            return 404, {'error': f"unknown path '{url.path}'"}
+
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if 'series' not in query:
+            return 400, {'error': "missing 'series' parameter"}
+        try:
+            horizon = int(query.get('horizon', 12))
+            order = tuple(int(term) for term in query['order'].split(',')) if 'order' in query else self.order
+        except ValueError:
+            return 400, {'error': "'horizon' and 'order' must be integers"}
+        if not 1 <= horizon <= MAX_HORIZON:
+            return 400, {'error': f"'horizon' must be 1-{MAX_HORIZON}"}
+        if len(order) != 3 or not all(0 <= term <= limit for term, limit in zip(order, MAX_ORDER)):
+            return 400, {'error': f"'order' must be p,d,q with 0 <= p <= {MAX_ORDER[0]}, 0 <= d <= {MAX_ORDER[1]} and 0 <= q <= {MAX_ORDER[2]}"}
+        try:
+            return 200, await self.forecast(query.get('dimension', 'Sub-Category'), query['series'], horizon, order)
+        except KeyError as error:
+            return 404, {'error': error.args[0]}
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP/1.1 request per connection."""
+        start = time.perf_counter()
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if len(request_line) < 2:
+                status, payload = 400, {'error': 'malformed request'}
+            else:
+                self.counters['requests'] += 1
+                status, payload = await self.route(request_line[0], request_line[1])
+        except Exception as error:
+            status, payload = 500, {'error': f"{type(error).__name__}: {error}"}
+        if status >= 400:
+            self.counters['errors'] += 1
+        self.latencies.append(time.perf_counter() - start)
+
+        body = json.dumps(payload).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1') + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+# Function to run the service on a TCP port or a Unix socket
+async def serve(file_path, host='127.0.0.1', port=8765, unix_path=None, max_models=64):
+    """Load the dataset once and serve /forecast, /stats and /health until cancelled."""
+    service = ForecastService(file_path, max_models)
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving forecasts on {unix_path or f'http://{host}:{port}'}")
+    async with server:
+        await server.serve_forever()
+
+# Run the forecast service
+if __name__ == "__main__":
+    file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
+    asyncio.run(serve(file_path))
@@ -0,0 +1,186 @@
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from batch_stationarity import aligned_groups
+from batch_decompose import batch_trend, batch_seasonal_indices
+
+# Starting grid of smoothing parameters, refinement rounds and initial-state re-estimations
+INITIAL_GRID = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+REFINE_ROUNDS = 5
+STATE_ROUNDS = 2
+
+# Function to derive the starting level, trend and seasonal indices of every series
+def initial_states(values, period=12, model='additive'):
+    """
+    Heuristic start of Hyndman and Athanasopoulos (section 2.6), as in statsmodels:
+    decompose the first two to five cycles with the centred moving average, take the
+    seasonal indices from the detrended values and the level and trend from a straight
+    line through the first 10 trend values.
+    """
+    cycles = max(min(5, values.shape[1] // period), int(np.ceil((10 + 2 * (period // 2)) / period)))
+    head = values[:, :cycles * period]
+    trend_values = batch_trend(head, period)
+    detrended = head - trend_values if model == 'additive' else head / trend_values
+    seasonal = batch_seasonal_indices(detrended, period, model)
+
+    # Least-squares line through the first 10 moving-average values against t = 1..10
+    first_trend = trend_values[:, period // 2:period // 2 + 10]
+    t = np.arange(1, 11) - 5.5
+    slope = (first_trend - first_trend.mean(axis=1, keepdims=True)) @ t / (t @ t)
+    level = first_trend.mean(axis=1) - slope * 5.5
+    return level, slope, seasonal
+
+# Function to run the Holt-Winters recursions over many (series, parameter) rows at once
+def smooth(values, alpha, beta, gamma, states, period=12, model='additive', rows=None, errors=None):
+    """
+    Run the Holt-Winters smoothing over the time axis for every row, where row i uses
+    series rows[i] with parameters (alpha[i], beta[i], gamma[i]). Returns the sum of
+    squared one-step-ahead errors and the final level, trend and seasonal states; the
+    errors themselves are written to `errors` when an array is given.
+    """
+    # Time-major copies keep every per-month read and seasonal update contiguous
+    columns = np.ascontiguousarray(values.T)
+    level, trend, seasonal = states if rows is None else (state[rows] for state in states)
+    seasonal = np.array(seasonal.T)
+    sse = np.zeros(len(level))
+    additive = model == 'additive'
+    for t in range(values.shape[1]):
+        y = columns[t] if rows is None else columns[t][rows]
+        phase = t % period
+        season = seasonal[phase]
+        base = level + trend
+        error = y - (base + season if additive else base * season)
+        sse += error ** 2
+        if errors is not None:
+            errors[:, t] = error
+        new_level = alpha * (y - season if additive else y / season) + (1 - alpha) * base
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasonal[phase] = gamma * (y - base if additive else y / base) + (1 - gamma) * season
+        level = new_level
+    return sse, level, trend, seasonal.T
+
+# Function to choose the smoothing parameters of every series on a coarse grid
+def grid_parameters(values, states, period=12, model='additive'):
+    """Evaluate every (alpha, beta, gamma) of the starting grid for every series in one batched recursion."""
+    n_series = len(values)
+    grid = np.array(list(itertools.product(INITIAL_GRID, repeat=3)))
+    rows = np.repeat(np.arange(n_series), len(grid))
+    candidates = np.tile(grid, (n_series, 1))
+    sse = smooth(values, *candidates.T, states, period, model, rows)[0].reshape(n_series, len(grid))
+    sse[~np.isfinite(sse)] = np.inf
+    return grid[np.argmin(sse, axis=1)], sse.min(axis=1)
+
+# Function to refine the smoothing parameters of every series by batched pattern search
+def refine_parameters(values, states, best, best_sse, period=12, model='additive', step=0.1, rounds=REFINE_ROUNDS):
+    """
+    Repeatedly evaluate a 3 x 3 x 3 grid around each series' best point, keeping any
+    improvement and halving the grid spacing every round.
+    """
+    n_series = len(values)
+    best, best_sse = best.copy(), best_sse.copy()
+    offsets = np.array(list(itertools.product([-1, 0, 1], repeat=3)), dtype=float)
+    rows = np.repeat(np.arange(n_series), len(offsets))
+    for _ in range(rounds):
+        candidates = np.clip(np.repeat(best, len(offsets), axis=0) + np.tile(offsets * step, (n_series, 1)), 0.0, 1.0)
+        sse = smooth(values, *candidates.T, states, period, model, rows)[0].reshape(n_series, len(offsets))
+        sse[~np.isfinite(sse)] = np.inf
+        choice = np.argmin(sse, axis=1)
+        improved = sse[np.arange(n_series), choice] < best_sse
+        best[improved] = candidates.reshape(n_series, len(offsets), 3)[improved, choice[improved]]
+        best_sse[improved] = sse[improved, choice[improved]]
+        step /= 2
+    return best, best_sse
+
+# Function to estimate the additive initial states of every series by least squares
+def estimate_additive_states(values, parameters, period=12):
+    """
+    With the smoothing parameters fixed, the one-step errors of the additive model are
+    affine in the initial (level, trend, seasonal) states: e = e0 + E x0. e0 comes from
+    smoothing the data from zero states and each column of E from smoothing zeros from
+    one unit state, all in one batched recursion; x0 is then the least-squares solution.
+    """
+    n_series, n_obs = values.shape
+    n_states = 2 + period
+    basis = np.eye(n_states)
+    runs = np.concatenate([values[:, np.newaxis, :], np.zeros((n_series, n_states, n_obs))], axis=1).reshape(-1, n_obs)
+    unit = np.concatenate([np.zeros((1, n_states)), basis])
+    start = np.tile(unit, (n_series, 1))
+    states = (start[:, 0], start[:, 1], start[:, 2:])
+    errors = np.empty_like(runs)
+    smooth(runs, *np.repeat(parameters, n_states + 1, axis=0).T, states, period, 'additive', errors=errors)
+    errors = errors.reshape(n_series, n_states + 1, n_obs)
+    offset, design = errors[:, 0, :], errors[:, 1:, :].transpose(0, 2, 1)
+    initial = -(np.linalg.pinv(design) @ offset[:, :, np.newaxis])[:, :, 0]
+    return initial[:, 0], initial[:, 1], initial[:, 2:]
+
+# Function to forecast from the final states
+def forecast_states(level, trend, seasonal, n_obs, steps, period=12, model='additive'):
+    """Return level + h * trend combined with the matching seasonal index, for h = 1..steps."""
+    horizon = np.arange(1, steps + 1)
+    phases = (n_obs + horizon - 1) % period
+    base = level[:, np.newaxis] + horizon * trend[:, np.newaxis]
+    return base + seasonal[:, phases] if model == 'additive' else base * seasonal[:, phases]
+
+# Function to fit Holt-Winters to a block of equal-length series
+def fit_holt_winters_matrix(values, period=12, model='additive', steps=12):
+    """Fit additive or multiplicative Holt-Winters with additive trend to every row of a (series x time) array."""
+    if model not in ('additive', 'multiplicative'):
+        raise ValueError("model must be 'additive' or 'multiplicative'")
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    if values.shape[1] < 2 * period:
+        raise ValueError(f"Holt-Winters needs 2 complete cycles ({2 * period} observations); got {values.shape[1]}")
+    states = initial_states(values, period, model)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        parameters, sse = refine_parameters(values, states, *grid_parameters(values, states, period, model), period, model)
+        # Re-estimate the initial states by least squares, alternating with the parameters.
+        # The multiplicative model takes the additive estimate as seasonal ratios and keeps
+        # it only for the series where it lowers the SSE.
+        for _ in range(STATE_ROUNDS):
+            estimate = estimate_additive_states(values, parameters, period)
+            if model == 'multiplicative':
+                estimate = (estimate[0], estimate[1], 1 + estimate[2] / estimate[0][:, np.newaxis])
+            estimate_sse = smooth(values, *parameters.T, estimate, period, model)[0]
+            better = estimate_sse < sse
+            states = tuple(np.where(better.reshape((-1,) + (1,) * (new.ndim - 1)), new, old) for new, old in zip(estimate, states))
+            sse = np.where(better, estimate_sse, sse)
+            parameters, sse = refine_parameters(values, states, parameters, sse, period, model, step=0.025, rounds=3)
+        _, level, trend, seasonal = smooth(values, *parameters.T, states, period, model)
+    n_obs = values.shape[1]
+    n_params = 3 + 2 + period
+    with np.errstate(divide='ignore'):
+        aic = n_obs * np.log(sse / n_obs) + 2 * n_params
+    return {'alpha': parameters[:, 0], 'beta': parameters[:, 1], 'gamma': parameters[:, 2], 'sse': sse, 'aic': aic,
+            'forecast': forecast_states(level, trend, seasonal, n_obs, steps, period, model)}
+
+# Function to fit Holt-Winters to every column of a month x series frame
+def fit_holt_winters(series, period=12, model='additive', steps=12):
+    """
+    Return one row per series with the smoothing parameters, SSE, AIC and h1..hN forecasts.
+    Multiplicative models need strictly positive series; other series, and series
+    shorter than two cycles, keep a row with the error instead of aborting the batch.
+    """
+    tables = []
+    for names, values in aligned_groups(series):
+        start = time.perf_counter()
+        table = pd.DataFrame({'series': names, 'model': model, 'nobs': values.shape[1]})
+        valid = np.ones(len(names), dtype=bool) if model == 'additive' else (values > 0).all(axis=1)
+        table['error'] = np.where(valid, None, 'multiplicative model needs positive values')
+        try:
+            fitted = fit_holt_winters_matrix(values[valid], period, model, steps) if valid.any() else None
+        except ValueError as error:
+            fitted, valid = None, np.zeros(len(names), dtype=bool)
+            table['error'] = str(error)
+        for column in ('alpha', 'beta', 'gamma', 'sse', 'aic'):
+            table[column] = np.nan
+            if fitted is not None:
+                table.loc[valid, column] = fitted[column]
+        forecast = np.full((len(names), steps), np.nan)
+        if fitted is not None:
+            forecast[valid] = fitted['forecast']
+        table[[f"h{step}" for step in range(1, steps + 1)]] = forecast
+        table['fit_seconds'] = (time.perf_counter() - start) / len(names)
+        tables.append(table)
+    table = pd.concat(tables, ignore_index=True).set_index('series').loc[list(series.columns)].reset_index()
+    columns = ['series', 'model', 'nobs', 'alpha', 'beta', 'gamma', 'sse', 'aic'] + [f"h{step}" for step in range(1, steps + 1)]
+    return table[columns + ['fit_seconds', 'error']]
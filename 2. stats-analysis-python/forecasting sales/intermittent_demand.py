@@ -0,0 +1,118 @@
+import warnings
+import numpy as np
+import pandas as pd
+from fast_ar import fit_ar_batch
+
+# Syntetos-Boylan cut-offs on the average demand interval and squared demand-size variation
+ADI_CUTOFF = 1.32
+CV2_CUTOFF = 0.49
+# Smoothing constants tried for every series
+ALPHA_GRID = np.array([0.05, 0.1, 0.2, 0.3])
+# Methods applied to the series that are not routed to ARIMA
+INTERMITTENT_METHODS = ['croston', 'sba', 'tsb']
+
+# Function to classify the demand pattern of every series
+def classify_demand(values):
+    """
+    Return ADI (periods per demand), CV² of the non-zero demand sizes and the class of every
+    row of a (series x time) array: smooth, erratic, intermittent, lumpy, or no demand.
+    """
+    demand = values > 0
+    occurrences = demand.sum(axis=1)
+    # Rows without demand have no sizes; their NaN statistics are expected
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        adi = values.shape[1] / occurrences
+        sizes = np.where(demand, values, np.nan)
+        mean = np.nanmean(sizes, axis=1)
+        cv2 = np.nanvar(sizes, axis=1) / mean ** 2
+    frequent, stable = adi < ADI_CUTOFF, cv2 < CV2_CUTOFF
+    classes = np.select([occurrences == 0, frequent & stable, frequent, stable], ['no demand', 'smooth', 'erratic', 'intermittent'], 'lumpy')
+    return adi, cv2, classes
+
+# Function to run Croston-type smoothing over many (series, alpha) rows at once
+def smooth_demand(values, alpha, method='sba', beta=None):
+    """
+    Run Croston, SBA or TSB over the time axis for every row and return the one-step-ahead
+    forecasts before each period (time axis last; NaN before the first demand) and the
+    final forecast.
+
+    Croston smooths the demand size z and the interval p at demand periods and forecasts
+    z / p; SBA scales that by (1 - alpha / 2). TSB smooths the demand probability every
+    period with beta (alpha when not given) and forecasts probability * z.
+    """
+    n_rows, n_obs = values.shape
+    demand = values > 0
+    first = np.where(demand.any(axis=1), demand.argmax(axis=1), n_obs)
+    rows = np.arange(n_rows)
+    started = first < n_obs
+    size = np.where(started, values[rows, np.minimum(first, n_obs - 1)], np.nan)
+    interval = (first + 1).astype(float)
+    probability = 1.0 / interval
+    since = np.ones(n_rows)
+    beta = alpha if beta is None else beta
+    forecasts = np.full((n_rows, n_obs), np.nan)
+
+    for t in range(n_obs):
+        if method == 'tsb':
+            current = probability * size
+        else:
+            current = size / interval * ((1 - alpha / 2) if method == 'sba' else 1.0)
+        active = t > first
+        forecasts[:, t] = np.where(active, current, np.nan)
+        update = active & demand[:, t]
+        size = np.where(update, size + alpha * (values[:, t] - size), size)
+        if method == 'tsb':
+            probability = np.where(active, probability + beta * (demand[:, t] - probability), probability)
+        else:
+            interval = np.where(update, interval + alpha * (since - interval), interval)
+            since = np.where(active, np.where(demand[:, t], 1.0, since + 1.0), since)
+    if method == 'tsb':
+        final = probability * size
+    else:
+        final = size / interval * ((1 - alpha / 2) if method == 'sba' else 1.0)
+    return forecasts, final
+
+# Function to forecast every row with the smoothing constant that fits it best
+def fit_intermittent(values, method='sba'):
+    """Try every ALPHA_GRID value for every row in one batched run and keep the one with the lowest in-sample MSE."""
+    n_series = len(values)
+    alpha = np.repeat(ALPHA_GRID[np.newaxis, :], n_series, axis=0).ravel()
+    rows = np.repeat(np.arange(n_series), len(ALPHA_GRID))
+    forecasts, final = smooth_demand(values[rows], alpha, method)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        mse = np.nanmean((values[rows] - forecasts) ** 2, axis=1).reshape(n_series, len(ALPHA_GRID))
+    best = np.argmin(np.where(np.isnan(mse), np.inf, mse), axis=1)
+    chosen = np.arange(n_series) * len(ALPHA_GRID) + best
+    return ALPHA_GRID[best], final[chosen], mse[np.arange(n_series), best]
+
+# Function to forecast a month x series matrix, routing each series by its demand class
+def forecast_demand(series, steps=12, method='sba', order=(1, 0, 0), workers=None):
+    """
+    Classify every series of a month x series DataFrame (e.g. Product ID sales with zero
+    months) by ADI/CV². Smooth series go to the batch ARIMA path; intermittent, lumpy and
+    erratic series get a flat Croston, SBA or TSB forecast computed for all of them at once;
+    series without demand forecast 0. Returns one row per series with its class, the
+    method used and h1..hN.
+    """
+    values = np.ascontiguousarray(series.fillna(0).to_numpy(dtype=float).T)
+    adi, cv2, classes = classify_demand(values)
+    table = pd.DataFrame({'series': series.columns, 'demand_class': classes, 'adi': adi, 'cv2': cv2, 'method': method, 'alpha': np.nan})
+    forecast_columns = [f"h{step}" for step in range(1, steps + 1)]
+    forecasts = np.zeros((len(table), steps))
+
+    routed = classes != 'smooth'
+    if routed.any():
+        alpha, final, _ = fit_intermittent(values[routed], method)
+        table.loc[routed, 'alpha'] = alpha
+        forecasts[routed] = np.nan_to_num(final)[:, np.newaxis]
+    table.loc[classes == 'no demand', ['method', 'alpha']] = ['zero', np.nan]
+
+    smooth = ~routed
+    if smooth.any():
+        arima = fit_ar_batch(series.loc[:, smooth], order=order, steps=steps, workers=workers).set_index('series')
+        forecasts[smooth] = arima.loc[series.columns[smooth], forecast_columns].to_numpy(dtype=float)
+        table.loc[smooth, 'method'] = 'arima'
+    table[forecast_columns] = forecasts
+    return table
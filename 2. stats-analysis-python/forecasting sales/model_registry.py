@@ -0,0 +1,137 @@
+import glob
+import hashlib
+import json
+import os
+import time
+import warnings
+from collections import OrderedDict
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from statsmodels.tools.sm_exceptions import ValueWarning
+from dataset_cache import DEFAULT_CACHE_DIR
+
+# Local store of fitted ARIMA results
+DEFAULT_REGISTRY_DIR = os.path.join(DEFAULT_CACHE_DIR, 'models')
+# statsmodels index and frequency notices that carry no information for these series
+INDEX_WARNINGS = r'(A date index has been provided|An unsupported index was provided|No frequency information was provided)'
+
+# Function to fingerprint the training data of a model
+def training_data_hash(series):
+    """SHA-256 of the values (and index, for a pandas Series) the model is trained on."""
+    digest = hashlib.sha256()
+    if isinstance(series, pd.Series):
+        digest.update(pd.util.hash_pandas_object(series, index=True).to_numpy().tobytes())
+    else:
+        values = np.ascontiguousarray(np.asarray(series, dtype=float))
+        digest.update(str(values.shape).encode('utf-8'))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+# Function to fit an ARIMA the way the forecasting workflow does
+def fit_arima(series, order, seasonal_order=(0, 0, 0, 0)):
+    """Fit sm.tsa.ARIMA with the given order; only the index and frequency notices are silenced, convergence warnings still show."""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message=INDEX_WARNINGS, category=ValueWarning)
+        return sm.tsa.ARIMA(series, order=order, seasonal_order=seasonal_order).fit()
+
+class ModelRegistry:
+    """
+    Fitted ARIMA results stored on disk with their order, training-data hash and fit
+    timestamp. Models are loaded lazily on first request and kept in a small LRU, so a
+    forecast is a load-and-predict until the training data or the order changes.
+    """
+
+    def __init__(self, store_dir=DEFAULT_REGISTRY_DIR, maxsize=32):
+        self.store_dir = store_dir
+        self.maxsize = maxsize
+        self.loaded = OrderedDict()
+        self.hits = 0
+        self.disk_loads = 0
+        self.misses = 0
+        os.makedirs(store_dir, exist_ok=True)
+
+    def model_key(self, data_hash, order, seasonal_order):
+        """Name a stored model after its training data and order."""
+        order_text = '-'.join(str(term) for term in tuple(order) + tuple(seasonal_order))
+        return f"{data_hash[:32]}-{order_text}"
+
+    def paths(self, key):
+        """Return the results pickle and metadata paths of a stored model."""
+        return os.path.join(self.store_dir, f"{key}.pickle"), os.path.join(self.store_dir, f"{key}.json")
+
+    def remember(self, key, model):
+        """Keep a loaded model in the LRU, evicting the least recently used one when full."""
+        self.loaded[key] = model
+        self.loaded.move_to_end(key)
+        while len(self.loaded) > self.maxsize:
+            self.loaded.popitem(last=False)
+
+    def get(self, series, order, seasonal_order=(0, 0, 0, 0)):
+        """Return the stored model for this data and order, or None when it has not been fitted."""
+        key = self.model_key(training_data_hash(series), order, seasonal_order)
+        if key in self.loaded:
+            self.hits += 1
+            self.loaded.move_to_end(key)
+            return self.loaded[key]
+        model_path, _ = self.paths(key)
+        if not os.path.exists(model_path):
+            return None
+        model = sm.load(model_path)
+        self.disk_loads += 1
+        self.remember(key, model)
+        return model
+
+    def put(self, series, order, model, seasonal_order=(0, 0, 0, 0), fit_seconds=None):
+        """Save fitted results with their order, training-data hash and timestamp."""
+        data_hash = training_data_hash(series)
+        key = self.model_key(data_hash, order, seasonal_order)
+        model_path, metadata_path = self.paths(key)
+        temp_path = f"{model_path}.{os.getpid()}.tmp"
+        model.save(temp_path)
+        os.replace(temp_path, model_path)
+        metadata = {
+            'key': key,
+            'order': list(order),
+            'seasonal_order': list(seasonal_order),
+            'training_data_hash': data_hash,
+            'nobs': int(model.nobs),
+            'aic': float(model.aic),
+            'converged': bool((model.mle_retvals or {}).get('converged', True)),
+            'fit_seconds': fit_seconds,
+            'fitted_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        }
+        with open(metadata_path, 'w') as handle:
+            json.dump(metadata, handle, indent=2)
+        self.remember(key, model)
+        return model
+
+    def fit_or_load(self, series, order, seasonal_order=(0, 0, 0, 0)):
+        """Return the stored model when the training data is unchanged, otherwise fit and store it."""
+        model = self.get(series, order, seasonal_order)
+        if model is not None:
+            return model
+        self.misses += 1
+        start = time.perf_counter()
+        model = fit_arima(series, order, seasonal_order)
+        return self.put(series, order, model, seasonal_order, time.perf_counter() - start)
+
+    def forecast(self, series, order, steps=12, seasonal_order=(0, 0, 0, 0)):
+        """Forecast `steps` ahead from the stored (or freshly fitted) model."""
+        return self.fit_or_load(series, order, seasonal_order).forecast(steps)
+
+    def entries(self):
+        """Return the metadata of every stored model, newest first."""
+        rows = []
+        for metadata_path in glob.glob(os.path.join(self.store_dir, '*.json')):
+            with open(metadata_path) as handle:
+                rows.append(json.load(handle))
+        entries = pd.DataFrame(rows)
+        return entries.sort_values('fitted_at', ascending=False, ignore_index=True) if rows else entries
+
+    def stats(self):
+        """Return the hit, disk-load and miss counters and the hit rate."""
+        requests = self.hits + self.disk_loads + self.misses
+        return {'hits': self.hits, 'disk_loads': self.disk_loads, 'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_loads) / requests if requests else 0.0, 'loaded': len(self.loaded)}
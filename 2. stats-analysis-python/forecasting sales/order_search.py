@@ -0,0 +1,146 @@
+import itertools
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.seasonal import seasonal_decompose
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.stattools import adfuller, kpss
+
+# Default candidate grid for (p, q) and seasonal (P, Q)
+DEFAULT_GRID = {'p': range(0, 3), 'q': range(0, 3), 'P': range(0, 2), 'Q': range(0, 2)}
+
+# Function to apply the same ADF and KPSS rule as arima_model
+def is_stationary(values, alpha=0.05):
+    """Stationary when ADF rejects a unit root and KPSS does not reject stationarity."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return adfuller(values)[1] < alpha and kpss(values, regression='c')[1] > alpha
+
+# Function to measure the strength of the seasonal component
+def seasonal_strength(values, period=12):
+    """Return max(0, 1 - var(resid) / var(seasonal + resid)) from a classical decomposition."""
+    if len(values) < 2 * period:
+        return 0.0
+    decomposition = seasonal_decompose(values, model='additive', period=period)
+    resid = decomposition.resid[np.isfinite(decomposition.resid)]
+    detrended = (decomposition.seasonal + decomposition.resid)[np.isfinite(decomposition.resid)]
+    return max(0.0, 1 - np.var(resid) / np.var(detrended)) if np.var(detrended) > 0 else 0.0
+
+# Function to choose the differencing orders once per series
+def differencing_orders(values, period=12, max_d=2, seasonal_threshold=0.64):
+    """Pick D from the seasonal strength and d by repeated stationarity tests on the differenced series."""
+    seasonal_d = int(seasonal_strength(values, period) > seasonal_threshold)
+    differenced = values[period:] - values[:-period] if seasonal_d else values
+    d = 0
+    while d < max_d and len(differenced) > 12 and not is_stationary(differenced):
+        differenced = np.diff(differenced)
+        d += 1
+    return d, seasonal_d, np.ascontiguousarray(differenced)
+
+# Function to list candidate orders from the simplest upwards
+def candidate_orders(grid=None):
+    """Return (p, q, P, Q) tuples sorted by total number of ARMA terms."""
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    candidates = itertools.product(grid['p'], grid['q'], grid['P'], grid['Q'])
+    return sorted(candidates, key=lambda candidate: (sum(candidate), candidate))
+
+# Function to fit one candidate on the pre-differenced series
+def fit_candidate(differenced, candidate, period, has_constant, partial_iter, best_aic, prune_margin):
+    """
+    Fit a short partial optimisation first and prune the candidate when its AIC is
+    already worse than the best AIC by more than prune_margin; otherwise finish the
+    fit warm-started from the partial parameters.
+    """
+    p, q, seasonal_p, seasonal_q = candidate
+    start = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            model = SARIMAX(differenced, order=(p, 0, q), seasonal_order=(seasonal_p, 0, seasonal_q, period) if seasonal_p or seasonal_q else (0, 0, 0, 0),
+                            trend='c' if has_constant else 'n')
+            partial = model.fit(disp=False, maxiter=partial_iter)
+            if np.isfinite(best_aic) and partial.aic > best_aic + prune_margin:
+                return {'candidate': candidate, 'aic': partial.aic, 'pruned': True, 'seconds': time.perf_counter() - start, 'error': None}
+            result = model.fit(disp=False, start_params=partial.params)
+        return {'candidate': candidate, 'aic': result.aic, 'pruned': False, 'seconds': time.perf_counter() - start, 'error': None}
+    except Exception as error:
+        return {'candidate': candidate, 'aic': np.inf, 'pruned': False, 'seconds': time.perf_counter() - start,
+                'error': f"{type(error).__name__}: {error}"}
+
+# Function to search the order grid of one series
+def search_series_orders(name, values, executor=None, grid=None, period=12, partial_iter=5, prune_margin=2.0,
+                         min_improvement=1.0, patience=3, wave_size=4):
+    """
+    Evaluate candidate orders in concurrent waves, simplest first, and stop once
+    `patience` consecutive waves improve the best AIC by less than min_improvement.
+    When no candidate fits, the row is marked failed and its orders are None.
+    """
+    start = time.perf_counter()
+    values = np.asarray(pd.Series(values).dropna(), dtype=float)
+    d, seasonal_d, differenced = differencing_orders(values, period)
+    candidates = candidate_orders(grid)
+    best = {'candidate': None, 'aic': np.inf}
+    fitted = pruned = stalled = 0
+    errors = []
+
+    for offset in range(0, len(candidates), wave_size):
+        wave = candidates[offset:offset + wave_size]
+        arguments = [(differenced, candidate, period, d + seasonal_d == 0, partial_iter, best['aic'], prune_margin) for candidate in wave]
+        if executor is None:
+            outcomes = [fit_candidate(*argument) for argument in arguments]
+        else:
+            outcomes = list(executor.map(fit_candidate, *zip(*arguments)))
+
+        previous_best = best['aic']
+        for outcome in outcomes:
+            fitted += 1
+            pruned += outcome['pruned']
+            if outcome['error']:
+                errors.append(outcome['error'])
+            elif not outcome['pruned'] and outcome['aic'] < best['aic']:
+                best = outcome
+
+        improvement = previous_best - best['aic'] if np.isfinite(previous_best) else np.inf
+        stalled = stalled + 1 if improvement < min_improvement else 0
+        if stalled >= patience:
+            break
+
+    failed = best['candidate'] is None
+    if failed:
+        order = seasonal_order = None
+    else:
+        p, q, seasonal_p, seasonal_q = best['candidate']
+        order = (p, d, q)
+        seasonal_order = (seasonal_p, seasonal_d, seasonal_q, period) if seasonal_p or seasonal_q or seasonal_d else (0, 0, 0, 0)
+    return {
+        'series': name,
+        'order': order,
+        'seasonal_order': seasonal_order,
+        'aic': np.nan if failed else best['aic'],
+        'failed': failed,
+        'models_fitted': fitted,
+        'models_pruned': pruned,
+        'candidates': len(candidates),
+        'search_seconds': time.perf_counter() - start,
+        'errors': len(errors)
+    }
+
+# Function to search orders for many series on a shared process pool
+def search_orders(series, workers=None, **search_options):
+    """Return one row per series with the selected (p,d,q)(P,D,Q,s) orders, search time and model counts."""
+    items = series.items() if isinstance(series, (pd.DataFrame, dict)) else series
+    search_options.setdefault('wave_size', workers or os.cpu_count() or 1)
+    if workers == 1:
+        rows = [search_series_orders(name, values, None, **search_options) for name, values in items]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = [search_series_orders(name, values, executor, **search_options) for name, values in items]
+    return pd.DataFrame(rows)
+
+# Function to turn a search table into per-series orders for fit_arima_batch
+def selected_orders(search_table):
+    """Map each series to its ((p, d, q), (P, D, Q, s)) selection, leaving out series whose search failed."""
+    return {row.series: (row.order, row.seasonal_order) for row in search_table.itertuples(index=False) if not row.failed}
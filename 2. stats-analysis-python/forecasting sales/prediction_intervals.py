@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from batch_stationarity import aligned_groups
+from arima_batch import split_order
+from fast_ar import ar_ols
+from transforms import TransformPipeline, integrate
+
+# Default quantiles, simulated paths, paths per chunk and histogram bins
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+DEFAULT_PATHS = 10000
+CHUNK_PATHS = 1000
+HISTOGRAM_BINS = 512
+# Largest (horizon x series x paths) chunk simulated at once
+CHUNK_CELLS = 4000000
+# Share of the first chunk's range added on each side of the histogram
+HISTOGRAM_MARGIN = 0.5
+
+class StreamingQuantiles:
+    """
+    Quantiles of simulated paths accumulated chunk by chunk in one fixed-size histogram
+    per (horizon, series) cell, so memory does not grow with the number of paths. The bins
+    start at the first chunk's range plus a margin; when a later chunk falls outside a
+    cell's range, that cell's bins are widened by an integer factor, merging whole bins,
+    so every count stays in a bin that contains its value and quantiles are exact to
+    within one (current) bin width, tails included.
+    """
+
+    def __init__(self, bins=HISTOGRAM_BINS):
+        self.bins = bins
+        self.counts = None
+        self.total = 0
+
+    def update(self, paths):
+        """Add a (horizon x series x paths) chunk to the histograms and running moments."""
+        if self.counts is None:
+            low, high = paths.min(axis=2), paths.max(axis=2)
+            margin = HISTOGRAM_MARGIN * (high - low)
+            self.low = low - margin
+            self.width = np.where(high > low, (high - low + 2 * margin) / self.bins, 1.0)
+            self.counts = np.zeros(low.shape + (self.bins,), dtype=np.int64)
+            self.minimum, self.maximum, self.sum = low, high, np.zeros(low.shape)
+        else:
+            self.widen(paths.min(axis=2), paths.max(axis=2))
+        positions = np.clip(((paths - self.low[:, :, np.newaxis]) / self.width[:, :, np.newaxis]).astype(np.int64), 0, self.bins - 1)
+        cells = np.arange(self.low.size).reshape(self.low.shape + (1,)) * self.bins + positions
+        self.counts += np.bincount(cells.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.minimum, self.maximum = np.minimum(self.minimum, paths.min(axis=2)), np.maximum(self.maximum, paths.max(axis=2))
+        self.sum += paths.sum(axis=2)
+        self.total += paths.shape[2]
+
+    def widen(self, low, high):
+        """
+        Grow the range of every cell that the values [low, high] overflow: add whole bins
+        below, then merge `factor` adjacent bins into one until the range fits again.
+        """
+        top = self.low + self.width * self.bins
+        overflow = (low < self.low) | (high >= top)
+        if not overflow.any():
+            return
+        below = np.where(overflow, np.ceil((self.low - np.minimum(low, self.low)) / self.width), 0).astype(np.int64)
+        span = below + np.ceil((np.maximum(high, top) - self.low) / self.width).astype(np.int64)
+        factor = np.where(overflow, np.maximum(1, -(-span // self.bins)), 1)
+        # Old bin j of a cell lands in new bin (j + below) // factor
+        positions = (np.arange(self.bins) + below[:, :, np.newaxis]) // factor[:, :, np.newaxis]
+        cells = np.arange(self.low.size).reshape(self.low.shape + (1,)) * self.bins + positions
+        self.counts = np.bincount(cells.ravel(), weights=self.counts.ravel(), minlength=self.counts.size).astype(np.int64).reshape(self.counts.shape)
+        self.low = self.low - below * self.width
+        self.width = self.width * factor
+
+    def quantile(self, q):
+        """Interpolate the q-quantile of every cell from its cumulative histogram."""
+        cumulative = np.cumsum(self.counts, axis=2)
+        target = q * self.total
+        position = np.minimum((cumulative < target).sum(axis=2), self.bins - 1)
+        in_bin = np.take_along_axis(self.counts, position[:, :, np.newaxis], axis=2)[:, :, 0]
+        below = np.take_along_axis(cumulative, position[:, :, np.newaxis], axis=2)[:, :, 0] - in_bin
+        fraction = np.where(in_bin > 0, (target - below) / np.maximum(in_bin, 1), 0.5)
+        return np.clip(self.low + self.width * (position + fraction), self.minimum, self.maximum)
+
+    def mean(self):
+        """Mean of every cell over all paths seen."""
+        return self.sum / self.total
+
+# Function to compute the in-sample one-step residuals of AR fits
+def ar_residuals(values, intercept, coefficients):
+    """Return y[t] - c - sum(phi_i * y[t-i]) for t >= p, for every row of a (series x time) array."""
+    p = coefficients.shape[1]
+    windows = sliding_window_view(values, p + 1, axis=1)[:, :, ::-1]
+    return windows[:, :, 0] - intercept[:, np.newaxis] - np.einsum('stl,sl->st', windows[:, :, 1:], coefficients)
+
+# Function to simulate future paths of many AR(p, d) processes at once
+def simulate_paths(values, differenced, intercept, coefficients, residuals, d, steps, n_paths, rng):
+    """
+    Run y[t] = c + sum(phi_i * y[t-i]) + e[t] forward `steps` months on the differenced
+    scale for every series and path, drawing e from each series' own residuals, then
+    integrate the d rounds of differencing. Returns a (steps x series x paths) array.
+    """
+    n_series, p = coefficients.shape
+    history = np.repeat(differenced[:, differenced.shape[1] - p:, np.newaxis], n_paths, axis=2)
+    draws = rng.integers(0, residuals.shape[1], size=(steps, n_series, n_paths))
+    innovations = residuals[np.arange(n_series)[np.newaxis, :, np.newaxis], draws]
+    paths = np.empty((steps, n_series, n_paths))
+    for step in range(steps):
+        paths[step] = intercept[:, np.newaxis] + np.einsum('sl,slp->sp', coefficients, history[:, ::-1, :]) + innovations[step]
+        history = np.concatenate([history[:, 1:, :], paths[step][:, np.newaxis, :]], axis=1) if p else history
+
+    # Undo the differencing from the last observed value of each level, innermost first
+    levels = [values]
+    for _ in range(d):
+        levels.append(np.diff(levels[-1], axis=1))
+    for level in reversed(levels[:-1]):
+        paths = integrate(paths, level[:, -1:].T, 1)
+    return paths
+
+# Function to compute quantile forecasts of many series by simulation
+def simulate_quantiles(series, order=(1, 0, 0), steps=12, quantiles=DEFAULT_QUANTILES, n_paths=DEFAULT_PATHS, seed=0,
+                       transform=None, chunk=CHUNK_PATHS, bins=HISTOGRAM_BINS):
+    """
+    Fit AR(p, d) to every series of a month x series DataFrame in one batch, simulate
+    n_paths future paths per series with innovations bootstrapped from its residuals and
+    return one row per (series, horizon) with the mean and the requested quantiles (p10,
+    p50, p90 by default). Paths are generated `chunk` at a time from one seeded generator
+    and folded into streaming histograms, so only one chunk (at most CHUNK_CELLS values)
+    is held in memory.
+
+    `transform` is a TransformPipeline step list (e.g. ('log1p',)) applied before fitting;
+    the simulated paths are inverted onto the sales scale before their quantiles are taken.
+    """
+    (p, d, q), seasonal = split_order(order)
+    if q or any(seasonal):
+        raise ValueError("simulated intervals support AR(p, d) orders; MA and seasonal terms are not simulated")
+    rng = np.random.default_rng(seed)
+    quantile_columns = [f"p{round(100 * level):02d}" for level in quantiles]
+    tables = []
+    for names, values in aligned_groups(series):
+        pipeline = TransformPipeline(transform) if transform else None
+        if pipeline is not None:
+            values = pipeline.fit_transform(values.T).T
+            values = values[:, sum(lag for name, lag in pipeline.steps if name in ('diff', 'seasonal_diff')):]
+        differenced = np.diff(values, n=d, axis=1) if d else values
+        intercept, coefficients, _ = ar_ols(differenced, p, constant=d == 0)
+        residuals = ar_residuals(differenced, intercept, coefficients)
+        residuals = residuals - residuals.mean(axis=1, keepdims=True)
+
+        streaming = StreamingQuantiles(bins)
+        block_chunk = max(1, min(chunk, CHUNK_CELLS // (steps * len(names))))
+        for start in range(0, n_paths, block_chunk):
+            paths = simulate_paths(values, differenced, intercept, coefficients, residuals, d, steps, min(block_chunk, n_paths - start), rng)
+            streaming.update(pipeline.inverse(paths) if pipeline is not None else paths)
+
+        table = pd.DataFrame({'series': np.tile(names, steps), 'horizon': np.repeat(np.arange(1, steps + 1), len(names)),
+                              'mean': streaming.mean().ravel()})
+        for level, column in zip(quantiles, quantile_columns):
+            table[column] = streaming.quantile(level).ravel()
+        table['paths'] = n_paths
+        tables.append(table)
+    rank = {name: position for position, name in enumerate(series.columns)}
+    table = pd.concat(tables, ignore_index=True)
+    return table.iloc[np.lexsort((table['horizon'], table['series'].map(rank)))].reset_index(drop=True)
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+from scipy.sparse.linalg import splu
+from sales_cube import cube_matrix
+from fast_ar import fit_ar_batch
+
+# Reconciliation methods
+RECONCILE_METHODS = ['base', 'bottom_up', 'top_down', 'ols', 'mint_diagonal']
+
+# Function to build the sparse summing matrix of a hierarchy
+def summing_matrix(leaves, levels):
+    """
+    Return the (nodes x leaves) summing matrix S in CSR form and a table of its nodes.
+
+    `leaves` holds one row per bottom-level series with a column per level, e.g.
+    (Category, Sub-Category). The nodes are the grand total, then every distinct prefix
+    of the levels, so the last level gives one row per leaf. Each leaf sits in exactly
+    one node per level, so S has (levels + 1) non-zeros per column.
+    """
+    n_leaves = len(leaves)
+    rows, names, node_levels, offset = [np.zeros(n_leaves, dtype=np.int64)], ['Total'], ['Total'], 1
+    prefix_codes, paths = np.zeros(n_leaves, dtype=np.int64), None
+    for depth, level in enumerate(levels, start=1):
+        # Integer codes of each prefix; the ' / ' path names are joined once per node
+        level_codes, level_uniques = pd.factorize(leaves[level])
+        _, first, codes = np.unique(prefix_codes * len(level_uniques) + level_codes, return_index=True, return_inverse=True)
+        # Number the nodes in order of first appearance, as pd.factorize does
+        order = np.argsort(first)
+        codes = np.argsort(order)[codes]
+        labels = leaves[level].astype(str).to_numpy()
+        paths = labels if paths is None else paths + ' / ' + labels
+        prefix_codes = codes
+        rows.append(offset + codes)
+        names.extend(paths[first[order]])
+        node_levels.extend([level] * len(first))
+        offset += len(first)
+    rows = np.concatenate(rows)
+    columns = np.tile(np.arange(n_leaves), len(levels) + 1)
+    S = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(offset, n_leaves))
+    return S, pd.DataFrame({'node': names, 'level': node_levels})
+
+# Function to build the leaf series and the summing matrix from the monthly cube
+def hierarchy_matrix(cube, levels=('Category', 'Sub-Category')):
+    """Return the month x leaf sales matrix, S, and the node table of a hierarchy held in the cube."""
+    levels = list(levels)
+    leaf_sales = cube_matrix(cube, levels, 'sum')
+    leaves = leaf_sales.columns.to_frame(index=False) if len(levels) > 1 else pd.DataFrame({levels[0]: leaf_sales.columns})
+    S, nodes = summing_matrix(leaves, levels)
+    leaf_sales.columns = nodes['node'].iloc[-len(leaves):].to_list()
+    return leaf_sales, S, nodes
+
+# Function to solve the generalised least-squares reconciliation
+def project(S, base, weights=None):
+    """
+    Return S (S' W^-1 S)^-1 S' W^-1 y for base forecasts y (nodes x horizon) and a diagonal
+    W given as per-node variances (None for OLS).
+
+    S' W^-1 S is dense (every leaf shares the total), so the equivalent constraint form
+    is solved instead: with S = [A; I], the leaves move by W_b A' (W_a + A W_b A')^-1
+    (y_a - A y_b). W_a + A W_b A' only links nested aggregate nodes, so it stays sparse;
+    it is factorised once with a sparse LU and reused for every horizon.
+    """
+    n_aggregates = S.shape[0] - S.shape[1]
+    weights = np.ones(S.shape[0]) if weights is None else np.asarray(weights, dtype=float)
+    A = S[:n_aggregates]
+    leaf_weights = sparse.diags(weights[n_aggregates:])
+    system = (sparse.diags(weights[:n_aggregates]) + A @ leaf_weights @ A.T).tocsc()
+    gap = base[:n_aggregates] - A @ base[n_aggregates:]
+    leaf_forecast = base[n_aggregates:] + leaf_weights @ (A.T @ splu(system).solve(gap))
+    return S @ leaf_forecast
+
+# Function to make base forecasts coherent
+def reconcile(S, base, method='ols', proportions=None, variances=None):
+    """
+    Reconcile (nodes x horizon) base forecasts ordered like the rows of S.
+
+    bottom_up sums the leaf forecasts; top_down splits the total forecast by the leaves'
+    historical proportions; ols projects onto the coherent subspace; mint_diagonal
+    weights that projection by the inverse in-sample variance of each node's model.
+    """
+    base = np.asarray(base, dtype=float)
+    n_leaves = S.shape[1]
+    if method == 'base':
+        return base
+    if method == 'bottom_up':
+        return S @ base[-n_leaves:]
+    if method == 'top_down':
+        if proportions is None:
+            raise ValueError("top_down needs the historical proportions of the leaves")
+        return S @ (proportions[:, np.newaxis] * base[:1])
+    if method == 'ols':
+        return project(S, base)
+    if method == 'mint_diagonal':
+        if variances is None:
+            raise ValueError("mint_diagonal needs the in-sample variance of every node")
+        variances = np.where(np.isfinite(variances) & (variances > 0), variances, np.nanmax(variances))
+        return project(S, base, variances)
+    raise ValueError(f"unknown reconciliation method '{method}'; expected one of {RECONCILE_METHODS}")
+
+# Function to forecast every node of a hierarchy and reconcile the forecasts
+def hierarchical_forecast(cube, levels=('Category', 'Sub-Category'), order=(1, 0, 0), steps=12, methods=RECONCILE_METHODS,
+                          base_table=None, workers=None):
+    """
+    Forecast the total, every intermediate node and every leaf with the batch ARIMA path
+    (or take the h1..hN columns of a fit_ar_batch table given as base_table) and return
+    one row per (method, node) with the reconciled forecasts. Every method except 'base'
+    adds up across levels.
+    """
+    leaf_sales, S, nodes = hierarchy_matrix(cube, levels)
+    node_sales = pd.DataFrame((S @ leaf_sales.to_numpy().T).T, index=leaf_sales.index, columns=nodes['node'])
+    if base_table is None:
+        base_table = fit_ar_batch(node_sales, order=order, steps=steps, workers=workers)
+    base_table = base_table.set_index('series').loc[nodes['node']]
+    base = base_table[[f"h{step}" for step in range(1, steps + 1)]].to_numpy(dtype=float)
+    variances = base_table['sigma2'].to_numpy(dtype=float) if 'sigma2' in base_table else None
+
+    totals = leaf_sales.to_numpy().sum(axis=0)
+    proportions = totals / totals.sum()
+    horizon_columns = [f"h{step}" for step in range(1, steps + 1)]
+    tables = []
+    for method in methods:
+        table = nodes.copy()
+        table.insert(0, 'method', method)
+        table[horizon_columns] = reconcile(S, base, method, proportions, variances)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
+
+# Function to measure how far forecasts are from adding up
+def coherence_error(S, forecast):
+    """Largest absolute gap between each node's forecast and the sum of its leaves' forecasts."""
+    forecast = np.asarray(forecast, dtype=float)
+    return float(np.abs(S @ forecast[-S.shape[1]:] - forecast).max())
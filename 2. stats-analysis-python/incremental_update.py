@@ -0,0 +1,154 @@
+import os
+import pickle
+import time
+import warnings
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from dataset_cache import DEFAULT_CACHE_DIR
+from sales_cube import load_monthly_cube, cube_matrix, trim_to_orders
+from batch_decompose import decompose_batch, batch_trend, trend_weights
+from performance_classifier import performance_report
+
+# Per-series state kept between monthly runs, one file per dimension
+DEFAULT_STATE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'incremental')
+
+# Columns of the update summary
+UPDATE_COLUMNS = ['series', 'action', 'nobs', 'new_months', 'changed_cells', 'report_written', 'update_seconds']
+
+# Function to read the saved per-series state
+def load_state(state_path):
+    """Return the saved {series: state} mapping, or an empty one on the first run."""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, 'rb') as handle:
+        return pickle.load(handle)
+
+# Function to save the per-series state atomically
+def save_state(states, state_path):
+    """Write the {series: state} mapping next to the dataset cache."""
+    os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+    temp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as handle:
+        pickle.dump(states, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, state_path)
+
+# Function to fit the ARIMA and decomposition state of one series from scratch
+def initial_state(monthly_sales, order=(1, 0, 0), period=12):
+    """
+    Fit the ARIMA and decompose the series once. The seasonal indices are kept so later
+    months are judged against the same seasonal expectation as the published ones.
+    Series shorter than two seasonal cycles keep an ARIMA state only.
+    """
+    values = monthly_sales.to_numpy(dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        arima = sm.tsa.ARIMA(values, order=order).fit()
+    state = {'index': monthly_sales.index, 'values': values, 'order': order, 'period': period, 'arima': arima,
+             'trend': None, 'seasonal_indices': None}
+    if len(values) >= 2 * period:
+        trend, seasonal, _ = decompose_batch(values[np.newaxis, :], period, 'additive')
+        state.update({'trend': trend[0], 'seasonal_indices': seasonal[0, :period]})
+    return state
+
+# Function to append new months to an existing state
+def append_months(state, monthly_sales):
+    """
+    Extend the ARIMA results with the new observations through the state-space filter
+    (parameters are not re-estimated) and fill in the trend cells whose centred
+    moving-average window is now complete. Returns the positions of the changed cells.
+    """
+    values = monthly_sales.to_numpy(dtype=float)
+    n_old = len(state['values'])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        state['arima'] = state['arima'].append(values[n_old:])
+    state.update({'index': monthly_sales.index, 'values': values})
+    if state['trend'] is None:
+        return np.array([], dtype=int)
+
+    half = len(trend_weights(state['period'])) // 2
+    start = n_old - half
+    trend = np.concatenate([state['trend'], np.full(len(values) - n_old, np.nan)])
+    trend[start:] = batch_trend(values[np.newaxis, start - half:], state['period'])[0, half:]
+    state['trend'] = trend
+    return np.arange(start, len(values) - half)
+
+# Function to rebuild the seasonal and residual components from a state
+def state_components(state):
+    """Return the seasonal and residual Series implied by the stored trend and seasonal indices."""
+    positions = np.arange(len(state['values']))
+    seasonal = state['seasonal_indices'][positions % state['period']]
+    residual = state['values'] - state['trend'] - seasonal
+    return pd.Series(seasonal, index=state['index']), pd.Series(residual, index=state['index'])
+
+# Function to check whether the stored history still matches the data
+def history_matches(state, monthly_sales):
+    """True when the new series only adds months after the stored ones."""
+    n_old = len(state['values'])
+    return (len(monthly_sales) >= n_old and monthly_sales.index[:n_old].equals(state['index'])
+            and np.allclose(monthly_sales.to_numpy(dtype=float)[:n_old], state['values'], rtol=1e-9, atol=1e-9))
+
+# Function to update every series and rewrite only the reports that changed
+def update_series(monthly_sales, states, order=(1, 0, 0), period=12, output_dir=None, refresh=False):
+    """
+    Bring the state of every series in a {name: monthly Series} mapping up to date.
+
+    New months are appended to the stored ARIMA results and trend; a series is refitted
+    from scratch only when it is new, its history was restated, or refresh is set.
+    With an output_dir, a series' performance report is rewritten only when it gained
+    classified months or was refitted. Returns the summary table.
+    """
+    rows = []
+    for name, series in monthly_sales.items():
+        start = time.perf_counter()
+        state = states.get(name)
+        series_order = order[name] if isinstance(order, dict) else order
+        if refresh or state is None or state['order'] != series_order or not history_matches(state, series):
+            state = states[name] = initial_state(series, series_order, period)
+            action, new_months, changed = 'refit', len(series), np.arange(len(series))
+        elif len(series) == len(state['values']):
+            action, new_months, changed = 'unchanged', 0, np.array([], dtype=int)
+        else:
+            new_months = len(series) - len(state['values'])
+            action, changed = 'append', append_months(state, series)
+
+        written = False
+        if output_dir and state['trend'] is not None and len(changed):
+            seasonal, residual = state_components(state)
+            report = performance_report(seasonal, residual)
+            changed_dates = set(state['index'][changed].date)
+            report_path = os.path.join(output_dir, f"{name}_Sales_Performance.csv")
+            if action == 'refit' or report['Date'].isin(changed_dates).any() or not os.path.exists(report_path):
+                report.to_csv(report_path, index=False)
+                written = True
+
+        rows.append({'series': name, 'action': action, 'nobs': len(state['values']), 'new_months': new_months,
+                     'changed_cells': len(changed), 'report_written': written, 'update_seconds': time.perf_counter() - start})
+    return pd.DataFrame(rows, columns=UPDATE_COLUMNS)
+
+# Function to forecast every series from its stored ARIMA results
+def state_forecasts(states, steps=12):
+    """Return one row per series with the h1..hN forecasts of the stored (appended) ARIMA results."""
+    forecasts = {name: np.asarray(state['arima'].forecast(steps)) for name, state in states.items()}
+    return pd.DataFrame.from_dict(forecasts, orient='index', columns=[f"h{step}" for step in range(1, steps + 1)])
+
+# Function to run the monthly update from the dataset
+def update_from_dataset(file_path, dimension='Sub-Category', series=None, order=(1, 0, 0), period=12,
+                        output_dir=None, state_path=None, refresh=False):
+    """
+    Read the monthly series of a dimension from the cube, trimmed to the months with
+    orders, update their saved state and return the update summary and the states.
+    """
+    state_path = state_path or os.path.join(DEFAULT_STATE_DIR, f"{dimension}.pkl")
+    cube = load_monthly_cube(file_path)
+    sums = cube_matrix(cube, dimension, 'sum', series)
+    counts = cube_matrix(cube, dimension, 'count', series)
+    monthly_sales = {name: trim_to_orders(sums[name], counts[name]) for name in sums.columns}
+
+    states = load_state(state_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    summary = update_series(monthly_sales, states, order, period, output_dir, refresh)
+    save_state(states, state_path)
+    return summary, states
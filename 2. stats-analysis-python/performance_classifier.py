@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Columns of the classified performance table
+PERFORMANCE_COLUMNS = ["Series", "Date", "Expectation Type", "Expected Value", "Recorded Value", "Status", "Value Difference"]
+
+# Totals reported for every series
+TOTAL_COLUMNS = ["failed_increases", "exceeded_increases", "failed_drops", "exceeded_drops"]
+
+# Labels of the total rows appended to every saved performance report
+TOTAL_LABELS = {
+    "failed_increases": "Expected Increase but Failed Total",
+    "exceeded_increases": "Expected Increase and Exceeded Total",
+    "failed_drops": "Expected Drop but Failed Total",
+    "exceeded_drops": "Expected Drop and Exceeded Total"
+}
+
+# Function to align seasonal and residual components as month x series arrays
+def align_components(seasonal, residual, name=None):
+    """Return the shared month index, the series labels and the aligned seasonal and residual arrays."""
+    if isinstance(seasonal, pd.Series):
+        label = name if name is not None else seasonal.name
+        seasonal = seasonal.to_frame(label)
+        residual = residual.to_frame(label)
+    seasonal, residual = seasonal.align(residual, join='inner')
+    return seasonal.index, seasonal.columns, seasonal.to_numpy(dtype=float), residual.to_numpy(dtype=float)
+
+# Function to build the boolean masks for every (month, series) cell
+def performance_masks(expected, recorded):
+    """Label each cell as an expected increase or drop that failed or exceeded expectations."""
+    valid = np.isfinite(expected) & np.isfinite(recorded)
+    increase = valid & (expected > 0)
+    drop = valid & (expected < 0)
+    failed = recorded < expected
+    exceeded = recorded > expected
+    return increase, drop, failed, exceeded
+
+# Function to classify every month of every series
+def classify_performance(seasonal, residual, name=None):
+    """
+    Compare the residual (recorded) against the seasonal (expected) component for
+    every month of every series and return one row per classified cell.
+
+    Rows are ordered by series, then expected increases before expected drops, then date.
+    """
+    index, labels, expected, recorded = align_components(seasonal, residual, name)
+    increase, drop, failed, exceeded = performance_masks(expected, recorded)
+    classified = (increase | drop) & (failed | exceeded)
+
+    rows, cols = np.nonzero(classified)
+    is_drop = drop[rows, cols]
+    order = np.lexsort((rows, is_drop, cols))
+    rows, cols, is_drop = rows[order], cols[order], is_drop[order]
+    expected_values = expected[rows, cols]
+    recorded_values = recorded[rows, cols]
+
+    return pd.DataFrame({
+        "Series": labels[cols],
+        "Date": index[rows],
+        "Expectation Type": np.where(is_drop, "Expected Drop", "Expected Increase"),
+        "Expected Value": expected_values,
+        "Recorded Value": recorded_values,
+        "Status": np.where(failed[rows, cols], "Failed", "Exceeded"),
+        "Value Difference": np.abs(expected_values - recorded_values)
+    }, columns=PERFORMANCE_COLUMNS)
+
+# Function to total the failed and exceeded expectations of every series
+def performance_totals(seasonal, residual, name=None):
+    """Return the four failed/exceeded totals per series using masked reductions."""
+    _, labels, expected, recorded = align_components(seasonal, residual, name)
+    increase, drop, failed, exceeded = performance_masks(expected, recorded)
+    difference = np.abs(expected - recorded)
+    totals = np.column_stack([
+        np.where(increase & failed, difference, 0.0).sum(axis=0),
+        np.where(increase & exceeded, difference, 0.0).sum(axis=0),
+        np.where(drop & failed, difference, 0.0).sum(axis=0),
+        np.where(drop & exceeded, difference, 0.0).sum(axis=0)
+    ])
+    return pd.DataFrame(totals, index=labels, columns=TOTAL_COLUMNS)
+
+# Function to build the per-series report saved under sales-performance-results
+def performance_report(seasonal, residual):
+    """Return the classified months of one series followed by its four total rows."""
+    results = classify_performance(seasonal, residual).drop(columns="Series")
+    results["Date"] = results["Date"].dt.date
+    totals = performance_totals(seasonal, residual).iloc[0]
+    total_rows = pd.DataFrame([["Total", "N/A", "N/A", "N/A", label, totals[column]] for column, label in TOTAL_LABELS.items()],
+                              columns=results.columns)
+    return pd.concat([results, total_rows], ignore_index=True)
@@ -0,0 +1,82 @@
+import pandas as pd
+from dataset_cache import load_derived_frame
+from time_aggregation import order_dates, period_ends
+
+# Sub-categories analysed by the decomposition scripts
+SUB_CATEGORIES = [
+    'Bookcases', 'Chairs', 'Labels', 'Tables', 'Storage', 'Furnishings',
+    'Art', 'Phones', 'Binders', 'Appliances', 'Paper', 'Accessories',
+    'Envelopes', 'Fasteners', 'Supplies', 'Machines', 'Copiers'
+]
+
+# Dimensions held at the finest grain of the cube
+CUBE_DIMENSIONS = ['Sub-Category', 'Category', 'Segment', 'Region', 'State', 'Ship Mode']
+
+# Version of the cube layout; bumping it rebuilds every persisted cube
+CUBE_VERSION = 2
+
+# Function to map each order line to the end of its month
+def order_months(data):
+    """Return the month-end timestamp of every order, matching resample('ME') labels."""
+    return period_ends(order_dates(data), 'monthly')
+
+# Function to build the monthly cube in a single groupby pass
+def build_monthly_cube(data, dimensions=CUBE_DIMENSIONS, value='Sales'):
+    """
+    Aggregate order lines into (month, *dimensions) cells holding the sum, count and
+    mean of the value column. Rows with an unparseable Order Date are dropped, as
+    resample() does; a missing dimension value is kept as its own NaN key, so the row
+    still counts towards every other dimension's totals.
+    """
+    months = pd.Series(order_months(data), name='Month')
+    dated = months.notna().to_numpy()
+    values = pd.Series(pd.to_numeric(data[value], errors='coerce').to_numpy()[dated], name=value)
+    keys = [months[dated].reset_index(drop=True)] + [data[dimension][dated].reset_index(drop=True) for dimension in dimensions]
+    cube = values.groupby(keys, sort=True, dropna=False).agg(['sum', 'count']).reset_index()
+    cube['mean'] = cube['sum'] / cube['count'].where(cube['count'] > 0)
+    return cube
+
+# Function to load the persisted cube for a dataset
+def load_monthly_cube(file_path, dimensions=CUBE_DIMENSIONS, cache_dir=None):
+    """Return the monthly cube, rebuilding it only when the source dataset changes."""
+    return load_derived_frame(
+        file_path, 'monthly-cube', lambda data: build_monthly_cube(data, list(dimensions)),
+        params={'dimensions': list(dimensions), 'version': CUBE_VERSION}, cache_dir=cache_dir
+    )
+
+# Function to roll the cube up into a dense month x series matrix
+def cube_matrix(cube, dimension='Sub-Category', measure='sum', series=None):
+    """
+    Return a month x series matrix for one dimension (or a list of dimensions).
+
+    Months run over the whole range of the cube with no gaps. Empty cells hold 0 for
+    'sum' and 'count' and NaN for 'mean', as resample('ME') produces them. Rows missing
+    the rolled-up dimension belong to no series and are left out, as they are when the
+    data is filtered to one series and resampled.
+    """
+    dimensions = [dimension] if isinstance(dimension, str) else list(dimension)
+    rolled = cube.groupby(['Month'] + dimensions, sort=True)[['sum', 'count']].sum()
+    if measure == 'mean':
+        values = rolled['sum'] / rolled['count'].where(rolled['count'] > 0)
+    else:
+        values = rolled[measure]
+
+    matrix = values.unstack(dimensions)
+    months = pd.date_range(cube['Month'].min(), cube['Month'].max(), freq='ME')
+    matrix = matrix.reindex(months)
+    if series is not None:
+        matrix = matrix.reindex(columns=series)
+    if measure == 'count':
+        matrix = matrix.fillna(0).astype(int)
+    elif measure == 'sum':
+        matrix = matrix.fillna(0)
+    matrix.index.name = 'Order Date'
+    return matrix
+
+# Function to trim a cube series to the months that have orders
+def trim_to_orders(series, counts):
+    """Trim a matrix column to its first and last month with orders, the span resample('ME') covers."""
+    active = counts.index[counts > 0]
+    if active.empty:
+        return series.iloc[:0]
+    return series.loc[active[0]:active[-1]]
@@ -1,13 +1,15 @@
-import pandas as pd
 import statsmodels.api as sm
 import plotly.graph_objs as go
+import os
+import sys
 
-# Function to load the dataset
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sales_cube import load_monthly_cube, cube_matrix, trim_to_orders
+
+# Function to load the monthly sales cube as month x sub-category matrices
 def load_data(file_path: str):
-    data = pd.read_excel(file_path)
-    data['Order Date'] = pd.to_datetime(data['Order Date'], format='%d/%m/%Y', errors='coerce')
-    data.set_index('Order Date', inplace=True)
-    return data
+    cube = load_monthly_cube(file_path)
+    return {measure: cube_matrix(cube, 'Sub-Category', measure, get_sub_categories()) for measure in ('sum', 'count')}
 
 # Function to get the list of unique sub-categories
 def get_sub_categories():
@@ -19,8 +21,7 @@ def get_sub_categories():
 
 # Function to resample sales data monthly for a given sub-category
 def resample_monthly_sales(data, sub_category: str):
-    sub_category_data = data[data['Sub-Category'] == sub_category]
-    return sub_category_data['Sales'].resample('ME').sum()
+    return trim_to_orders(data['sum'][sub_category], data['count'][sub_category])
 
 # Function to perform seasonal decomposition on monthly sales data
 def perform_seasonal_decomposition(monthly_sales):
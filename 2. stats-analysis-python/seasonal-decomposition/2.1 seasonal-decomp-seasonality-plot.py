@@ -1,13 +1,14 @@
-import pandas as pd
 import statsmodels.api as sm
 import plotly.graph_objs as go
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from dataset_cache import load_repaired_dataset
 
 # Load the dataset
 file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
-data = pd.read_excel(file_path)
-
-# Convert the 'Order Date' column to datetime
-data['Order Date'] = pd.to_datetime(data['Order Date'], format='%d/%m/%Y', errors='coerce')
+data = load_repaired_dataset(file_path)
 
 # Set 'Order Date' as the index
 data.set_index('Order Date', inplace=True)
@@ -1,18 +1,17 @@
-import pandas as pd
 import statsmodels.api as sm
 import plotly.graph_objs as go
+import os
+import sys
 
-# Utility function to load data
-def load_data(file_path):
-    """Load data from an Excel file."""
-    return pd.read_excel(file_path)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sales_cube import load_monthly_cube, cube_matrix, trim_to_orders, SUB_CATEGORIES
+from performance_classifier import classify_performance
 
-# Function to prepare data for analysis
-def preprocess_data(data):
-    """Preprocess the data: convert 'Order Date' to datetime and set it as the index."""
-    data['Order Date'] = pd.to_datetime(data['Order Date'], format='%d/%m/%Y', errors='coerce')
-    data.set_index('Order Date', inplace=True)
-    return data
+# Utility function to load data
+def load_data(file_path, sub_categories):
+    """Load the monthly sales cube as month x sub-category sum and count matrices."""
+    cube = load_monthly_cube(file_path)
+    return {measure: cube_matrix(cube, 'Sub-Category', measure, sub_categories) for measure in ('sum', 'count')}
 
 # Function to perform seasonal decomposition
 def seasonal_decomposition(monthly_sales):
@@ -26,44 +25,26 @@ def extract_seasonal_residual(decomposition):
 
 # Function to analyze expected increases and drops
 def analyze_performance(seasonal, residual):
-    """Analyze expected increases and drops based on seasonal and residual data."""
-    expected_increases, expected_drops, expected_increases_exceeded, below_expected_drops = [], [], [], []
-    recorded_values = {date.date(): value for date, value in zip(residual.index, residual) if pd.notna(value)}
-    
-    for date, seasonal_value in zip(seasonal.index, seasonal):
-        if pd.notna(seasonal_value):
-            if seasonal_value < 0:
-                expected_drops.append((date.date(), seasonal_value))
-            elif seasonal_value > 0:
-                expected_increases.append((date.date(), seasonal_value))
-    
-    for date, expected_value in expected_increases:
-        recorded_value = recorded_values.get(date)
-        if recorded_value and recorded_value < expected_value:
-            expected_increases_exceeded.append((date, expected_value, recorded_value, abs(expected_value - recorded_value)))
-    
-    for date, expected_value in expected_drops:
-        recorded_value = recorded_values.get(date)
-        if recorded_value and recorded_value < expected_value:
-            below_expected_drops.append((date, expected_value, recorded_value, abs(expected_value - recorded_value)))
-    
-    return expected_increases, expected_drops, expected_increases_exceeded, below_expected_drops, recorded_values
+    """Classify every month as an expected increase or drop that failed or exceeded expectations."""
+    return classify_performance(seasonal, residual)
 
 # Function to print evaluation results
-def print_evaluation(sub_category, expected_increases, expected_drops, expected_increases_exceeded, below_expected_drops):
+def print_evaluation(sub_category, performance):
     """Print the sales performance evaluation results."""
     print(f"\nSales Performance Evaluation for {sub_category}:")
     
-    def print_category(title, data, headers):
+    def print_category(title, expectation_type, status, headers):
+        data = performance[(performance["Expectation Type"] == expectation_type) & (performance["Status"] == status)]
         print(f"\n{title}:")
         print(" | ".join(headers))
-        for entry in data:
-            print(f"{entry[0]} | {entry[1]:.2f} | {entry[2]:.2f} | {entry[3]:.2f}")
+        for date, expected_value, recorded_value, difference in data[["Date", "Expected Value", "Recorded Value", "Value Difference"]].itertuples(index=False, name=None):
+            print(f"{date.date()} | {expected_value:.2f} | {recorded_value:.2f} | {difference:.2f}")
     
     # Print results for each category
-    print_category("For Expected Increase but Failed", expected_increases, ["Date", "Expected Increase", "Recorded Value", "Failed Expectations"])
-    print_category("For Expected Increase and Exceeded", expected_increases_exceeded, ["Date", "Expected Increase", "Recorded Value", "Exceeded Expectations"])
-    print_category("For Below Expected Drop", below_expected_drops, ["Date", "Expected Drop", "Recorded Value", "Failed Expectations"])
+    print_category("For Expected Increase but Failed", "Expected Increase", "Failed", ["Date", "Expected Increase", "Recorded Value", "Failed Expectations"])
+    print_category("For Expected Increase and Exceeded", "Expected Increase", "Exceeded", ["Date", "Expected Increase", "Recorded Value", "Exceeded Expectations"])
+    print_category("For Below Expected Drop", "Expected Drop", "Failed", ["Date", "Expected Drop", "Recorded Value", "Failed Expectations"])
+    print_category("For Expected Drop but Exceeded", "Expected Drop", "Exceeded", ["Date", "Expected Drop", "Recorded Value", "Exceeded Expectations"])
 
 # Function to create the plot
 def create_plot(sub_category, seasonal, residual):
@@ -103,8 +84,7 @@ def create_plot(sub_category, seasonal, residual):
 # Main function to process sub-categories
 def process_sub_category(data, sub_category):
     """Process the data for a specific sub-category."""
-    sub_category_data = data[data['Sub-Category'] == sub_category]
-    monthly_sales = sub_category_data['Sales'].resample('ME').sum()
+    monthly_sales = trim_to_orders(data['sum'][sub_category], data['count'][sub_category])
 
     # Perform seasonal decomposition
     decomposition = seasonal_decomposition(monthly_sales)
@@ -113,10 +93,10 @@ def process_sub_category(data, sub_category):
     seasonal, residual = extract_seasonal_residual(decomposition)
 
     # Analyze performance
-    expected_increases, expected_drops, expected_increases_exceeded, below_expected_drops, recorded_values = analyze_performance(seasonal, residual)
+    performance = analyze_performance(seasonal, residual)
 
     # Print evaluation results
-    print_evaluation(sub_category, expected_increases, expected_drops, expected_increases_exceeded, below_expected_drops)
+    print_evaluation(sub_category, performance)
 
     # Create and display the plot
     create_plot(sub_category, seasonal, residual)
@@ -124,14 +104,11 @@ def process_sub_category(data, sub_category):
 # Main execution function
 def main(file_path):
     """Main function to execute the analysis for each sub-category."""
-    # Load and preprocess data
-    data = load_data(file_path)
-    data = preprocess_data(data)
-
     # List of unique sub-categories
-    sub_categories = ['Bookcases', 'Chairs', 'Labels', 'Tables', 'Storage', 'Furnishings', 
-                      'Art', 'Phones', 'Binders', 'Appliances', 'Paper', 'Accessories', 
-                      'Envelopes', 'Fasteners', 'Supplies', 'Machines', 'Copiers']
+    sub_categories = SUB_CATEGORIES
+
+    # Load the monthly sales matrices
+    data = load_data(file_path, sub_categories)
 
     # Process each sub-category
     for sub_category in sub_categories:
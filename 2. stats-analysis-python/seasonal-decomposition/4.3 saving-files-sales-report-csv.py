@@ -1,7 +1,12 @@
-import pandas as pd
-import statsmodels.api as sm
 import plotly.graph_objs as go
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sales_cube import load_monthly_cube, cube_matrix, trim_to_orders, SUB_CATEGORIES
+from batch_decompose import seasonal_decompose
+from performance_classifier import performance_report
+from incremental_update import update_from_dataset
 
 class SalesPerformanceEvaluator:
     def __init__(self, file_path, output_dir, sub_categories):
@@ -12,83 +17,38 @@ class SalesPerformanceEvaluator:
         os.makedirs(self.output_dir, exist_ok=True)
 
     def load_data(self):
-        """Load and prepare the dataset."""
-        data = pd.read_excel(self.file_path)
-        data['Order Date'] = pd.to_datetime(data['Order Date'], format='%d/%m/%Y', errors='coerce')
-        data.set_index('Order Date', inplace=True)
-        return data
+        """Load the monthly sales cube as month x sub-category sum and count matrices."""
+        cube = load_monthly_cube(self.file_path)
+        return {measure: cube_matrix(cube, 'Sub-Category', measure, self.sub_categories) for measure in ('sum', 'count')}
 
-    def resample_monthly_sales(self, sub_category_data):
-        """Resample sales data to monthly sums."""
-        return sub_category_data['Sales'].resample('ME').sum()
+    def resample_monthly_sales(self, sub_category):
+        """Read the monthly sales sums of a sub-category from the cube."""
+        return trim_to_orders(self.data['sum'][sub_category], self.data['count'][sub_category])
 
     def perform_seasonal_decomposition(self, monthly_sales):
         """Perform seasonal decomposition on monthly sales data."""
-        return sm.tsa.seasonal_decompose(monthly_sales, model='additive', period=12)
+        return seasonal_decompose(monthly_sales, model='additive', period=12)
 
     def get_seasonal_and_residual(self, decomposition):
         """Extract seasonal and residual components."""
         return decomposition.seasonal, decomposition.resid
 
-    def collect_expected_values(self, seasonal, residual):
-        """Collect expected increases, drops, and record residual values."""
-        expected_increases = []
-        expected_drops = []
-        recorded_values = {date.date(): residual_value for date, residual_value in zip(residual.index, residual) if pd.notna(residual_value)}
-        
-        for date, seasonal_value in zip(seasonal.index, seasonal):
-            if pd.notna(seasonal_value):
-                if seasonal_value > 0:
-                    expected_increases.append((date.date(), seasonal_value))
-                elif seasonal_value < 0:
-                    expected_drops.append((date.date(), seasonal_value))
-        
-        return expected_increases, expected_drops, recorded_values
-
-    def evaluate_performance(self, expected_values, recorded_values, expectation_type):
-        """Evaluate performance based on expected values and recorded residual values."""
-        results = []
-        total_failed_expectations = 0
-        total_exceeded_expectations = 0
-
-        for date, expected_value in expected_values:
-            recorded_value = recorded_values.get(date)
-            if recorded_value is not None:
-                if expected_value > 0 and recorded_value < expected_value:
-                    failed_expectations = abs(expected_value - recorded_value)
-                    total_failed_expectations += failed_expectations
-                    results.append([date, expectation_type, expected_value, recorded_value, "Failed", failed_expectations])
-                elif expected_value > 0 and recorded_value > expected_value:
-                    exceeded_expectations = abs(recorded_value - expected_value)
-                    total_exceeded_expectations += exceeded_expectations
-                    results.append([date, expectation_type, expected_value, recorded_value, "Exceeded", exceeded_expectations])
-
-        return results, total_failed_expectations, total_exceeded_expectations
+    def evaluate_performance(self, seasonal, residual):
+        """Classify every month against its seasonal expectation, followed by the total rows."""
+        return performance_report(seasonal, residual)
 
     def save_results(self, results, sub_category):
         """Save the performance results to a CSV file."""
-        results_df = pd.DataFrame(results, columns=["Date", "Expectation Type", "Expected Value", "Recorded Value", "Status", "Value Difference"])
-        results_df.to_csv(os.path.join(self.output_dir, f"{sub_category}_Sales_Performance.csv"), index=False)
+        results.to_csv(os.path.join(self.output_dir, f"{sub_category}_Sales_Performance.csv"), index=False)
 
     def evaluate_sub_category(self, sub_category):
         """Evaluate sales performance for each sub-category."""
-        sub_category_data = self.data[self.data['Sub-Category'] == sub_category]
-        monthly_sales = self.resample_monthly_sales(sub_category_data)
+        monthly_sales = self.resample_monthly_sales(sub_category)
         decomposition = self.perform_seasonal_decomposition(monthly_sales)
         seasonal, residual = self.get_seasonal_and_residual(decomposition)
         
-        expected_increases, expected_drops, recorded_values = self.collect_expected_values(seasonal, residual)
-        
-        increase_results, total_failed_increases, total_exceeded_increases = self.evaluate_performance(expected_increases, recorded_values, "Expected Increase")
-        drop_results, total_failed_drops, total_exceeded_drops = self.evaluate_performance(expected_drops, recorded_values, "Expected Drop")
-        
-        total_results = increase_results + drop_results
-        total_results.append(["Total", "N/A", "N/A", "N/A", "Expected Increase but Failed Total", total_failed_increases])
-        total_results.append(["Total", "N/A", "N/A", "N/A", "Expected Increase and Exceeded Total", total_exceeded_increases])
-        total_results.append(["Total", "N/A", "N/A", "N/A", "Expected Drop but Failed Total", total_failed_drops])
-        total_results.append(["Total", "N/A", "N/A", "N/A", "Expected Drop and Exceeded Total", total_exceeded_drops])
-
-        self.save_results(total_results, sub_category)
+        results = self.evaluate_performance(seasonal, residual)
+        self.save_results(results, sub_category)
 
     def run(self):
         """Run performance evaluation for all sub-categories."""
@@ -96,13 +56,17 @@ class SalesPerformanceEvaluator:
             self.evaluate_sub_category(sub_category)
         print("Performance evaluation files saved for each sub-category.")
 
+    def run_incremental(self, refresh=False):
+        """Append the new months to the saved per-series state and rewrite only the reports that changed."""
+        summary, _ = update_from_dataset(self.file_path, 'Sub-Category', self.sub_categories, output_dir=self.output_dir, refresh=refresh)
+        print(f"Performance evaluation files rewritten for {summary['report_written'].sum()} of {len(summary)} sub-categories.")
+        return summary
+
 
 # Usage example
 file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
 output_dir = 'Sales_Performance_Results'
-sub_categories = ['Bookcases', 'Chairs', 'Labels', 'Tables', 'Storage', 'Furnishings', 
-                  'Art', 'Phones', 'Binders', 'Appliances', 'Paper', 'Accessories', 
-                  'Envelopes', 'Fasteners', 'Supplies', 'Machines', 'Copiers']
+sub_categories = SUB_CATEGORIES
 
 evaluator = SalesPerformanceEvaluator(file_path, output_dir, sub_categories)
 evaluator.run()
@@ -1,6 +1,11 @@
-import pandas as pd
 import statsmodels.api as sm
 import plotly.graph_objs as go
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sales_cube import load_monthly_cube, cube_matrix, trim_to_orders, SUB_CATEGORIES
+from performance_classifier import performance_totals
 
 class SalesPerformanceEvaluator:
     def __init__(self, file_path, sub_categories):
@@ -9,61 +14,21 @@ class SalesPerformanceEvaluator:
         self.data = self.load_data()
 
     def load_data(self):
-        """Loads the sales dataset and processes the 'Order Date' column."""
-        data = pd.read_excel(self.file_path)
-        data['Order Date'] = pd.to_datetime(data['Order Date'], format='%d/%m/%Y', errors='coerce')
-        data.set_index('Order Date', inplace=True)
-        return data
+        """Loads the monthly sales cube as month x sub-category sum and count matrices."""
+        cube = load_monthly_cube(self.file_path)
+        return {measure: cube_matrix(cube, 'Sub-Category', measure, self.sub_categories) for measure in ('sum', 'count')}
 
-    def resample_sales(self, sub_category_data):
-        """Resamples sales data to monthly sales."""
-        return sub_category_data['Sales'].resample('ME').sum()
+    def resample_sales(self, sub_category):
+        """Reads the monthly sales of a sub-category from the cube."""
+        return trim_to_orders(self.data['sum'][sub_category], self.data['count'][sub_category])
 
     def perform_seasonal_decomposition(self, monthly_sales):
         """Performs seasonal decomposition on the resampled sales data."""
         return sm.tsa.seasonal_decompose(monthly_sales, model='additive', period=12)
 
-    def process_seasonal_and_residual(self, seasonal, residual):
-        """Categorizes seasonal values and processes them."""
-        expected_increases, expected_drops = [], []
-        recorded_values = {}
-
-        for date, seasonal_value, residual_value in zip(seasonal.index, seasonal, residual):
-            if pd.notna(residual_value):
-                recorded_values[date.date()] = residual_value
-            if seasonal_value < 0:
-                expected_drops.append((date.date(), seasonal_value))
-            elif seasonal_value > 0:
-                expected_increases.append((date.date(), seasonal_value))
-
-        return expected_increases, expected_drops, recorded_values
-
-    def evaluate_performance(self, expected_increases, expected_drops, recorded_values):
+    def evaluate_performance(self, seasonal, residual):
         """Evaluates performance based on seasonal expectations."""
-        results = {
-            "failed_increases": 0,
-            "exceeded_increases": 0,
-            "failed_drops": 0,
-            "exceeded_drops": 0,
-        }
-
-        for date, expected_value in expected_increases:
-            recorded_value = recorded_values.get(date)
-            if recorded_value is not None:
-                if expected_value > 0 and recorded_value < expected_value:
-                    results["failed_increases"] += abs(expected_value - recorded_value)
-                elif expected_value > 0 and recorded_value > expected_value:
-                    results["exceeded_increases"] += abs(recorded_value - expected_value)
-
-        for date, expected_value in expected_drops:
-            recorded_value = recorded_values.get(date)
-            if recorded_value is not None:
-                if recorded_value < expected_value:
-                    results["failed_drops"] += abs(expected_value - recorded_value)
-                elif recorded_value > expected_value:
-                    results["exceeded_drops"] += abs(recorded_value - expected_value)
-
-        return results
+        return performance_totals(seasonal, residual).iloc[0].to_dict()
 
     def create_performance_plot(self, seasonal, residual, sub_category):
         """Creates a performance plot with seasonal and residual components."""
@@ -97,13 +62,11 @@ class SalesPerformanceEvaluator:
 
     def evaluate_sub_category(self, sub_category):
         """Evaluates and processes the sales performance for a sub-category."""
-        sub_category_data = self.data[self.data['Sub-Category'] == sub_category]
-        monthly_sales = self.resample_sales(sub_category_data)
+        monthly_sales = self.resample_sales(sub_category)
         decomposition = self.perform_seasonal_decomposition(monthly_sales)
         seasonal, residual = decomposition.seasonal, decomposition.resid
 
-        expected_increases, expected_drops, recorded_values = self.process_seasonal_and_residual(seasonal, residual)
-        performance_results = self.evaluate_performance(expected_increases, expected_drops, recorded_values)
+        performance_results = self.evaluate_performance(seasonal, residual)
 
         # Print evaluation results
         self.print_evaluation_results(sub_category, performance_results)
@@ -125,9 +88,7 @@ class SalesPerformanceEvaluator:
             self.evaluate_sub_category(sub_category)
 
 # Define the sub-categories of interest
-sub_categories = ['Bookcases', 'Chairs', 'Labels', 'Tables', 'Storage', 'Furnishings', 
-                  'Art', 'Phones', 'Binders', 'Appliances', 'Paper', 'Accessories', 
-                  'Envelopes', 'Fasteners', 'Supplies', 'Machines', 'Copiers']
+sub_categories = SUB_CATEGORIES
 
 # Define file path
 file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
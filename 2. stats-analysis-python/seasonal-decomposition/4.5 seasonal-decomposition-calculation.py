@@ -1,20 +1,22 @@
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.seasonal import seasonal_decompose
+import os
+import sys
 
-# Function to load and preprocess data
-def load_and_preprocess_data(file_path):
-    data = pd.read_excel(file_path)
-    data['Order Date'] = pd.to_datetime(data['Order Date'], format='%d/%m/%Y', errors='coerce')
-    data.set_index('Order Date', inplace=True)
-    return data
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sales_cube import load_monthly_cube, cube_matrix, trim_to_orders, SUB_CATEGORIES
+from batch_decompose import seasonal_decompose
+
+# Function to load the monthly sales cube as month x sub-category matrices
+def load_monthly_matrices(file_path, sub_categories):
+    cube = load_monthly_cube(file_path)
+    return {measure: cube_matrix(cube, 'Sub-Category', measure, sub_categories) for measure in ('sum', 'count', 'mean')}
 
 # Function to calculate monthly sales and averages
-def calculate_monthly_sales_and_avg(data, sub_category):
-    sub_category_data = data[data['Sub-Category'] == sub_category]
-    monthly_sales = sub_category_data['Sales'].resample('ME').sum()
-    monthly_counts = sub_category_data['Sales'].resample('ME').count()
-    monthly_average_sales = monthly_sales / monthly_counts
+def calculate_monthly_sales_and_avg(monthly_matrices, sub_category):
+    monthly_counts = monthly_matrices['count'][sub_category]
+    monthly_sales = trim_to_orders(monthly_matrices['sum'][sub_category], monthly_counts)
+    monthly_average_sales = trim_to_orders(monthly_matrices['mean'][sub_category], monthly_counts)
     return monthly_sales, monthly_average_sales
 
 # Function to perform seasonal decomposition and return components
@@ -50,11 +52,11 @@ def filter_valid_results(results):
     return results[results['Residual'].notna()]
 
 # Function to process all sub-categories and accumulate results
-def process_sub_categories(data, sub_categories):
+def process_sub_categories(monthly_matrices, sub_categories):
     monthly_results = pd.DataFrame()
 
     for sub_category in sub_categories:
-        monthly_sales, monthly_average_sales = calculate_monthly_sales_and_avg(data, sub_category)
+        monthly_sales, monthly_average_sales = calculate_monthly_sales_and_avg(monthly_matrices, sub_category)
         trend, seasonal, residual = perform_seasonal_decomposition(monthly_sales)
         expected_sales = calculate_expected_sales(trend, seasonal)
         performance_deviation = calculate_performance_deviation(residual, expected_sales)
@@ -71,12 +73,10 @@ def process_sub_categories(data, sub_categories):
 # Main function to run the entire process
 def main():
     file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
-    data = load_and_preprocess_data(file_path)
-    sub_categories = ['Bookcases', 'Chairs', 'Labels', 'Tables', 'Storage', 'Furnishings', 
-                      'Art', 'Phones', 'Binders', 'Appliances', 'Paper', 'Accessories', 
-                      'Envelopes', 'Fasteners', 'Supplies', 'Machines', 'Copiers']
+    sub_categories = SUB_CATEGORIES
+    monthly_matrices = load_monthly_matrices(file_path, sub_categories)
     
-    monthly_results = process_sub_categories(data, sub_categories)
+    monthly_results = process_sub_categories(monthly_matrices, sub_categories)
 
     # Reset index for better readability and display the final results
     monthly_results.reset_index(drop=True, inplace=True)
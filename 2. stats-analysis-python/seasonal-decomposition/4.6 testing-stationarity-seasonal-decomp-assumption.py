@@ -1,74 +1,89 @@
 import pandas as pd
-import numpy as np
-import math
-import statsmodels.api as sm
-from statsmodels.tsa.stattools import adfuller, kpss
 import warnings
+import os
+import sys
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sales_cube import load_monthly_cube, cube_matrix, trim_to_orders, SUB_CATEGORIES
+from stationarity_cache import StationarityTests, STATIONARITY_CACHE_DIR
+from batch_stationarity import stationarity_table
+from transforms import log_transform
+
+# Memoised ADF/KPSS results, reused across runs when the monthly series are unchanged
+@lru_cache(maxsize=None)
+def stationarity_tests():
+    """Open the stationarity cache on first use rather than at import."""
+    return StationarityTests(cache_dir=STATIONARITY_CACHE_DIR)
 
 # Suppress specific warnings for KPSS
 warnings.filterwarnings("ignore", category=UserWarning, message="The test statistic is outside of the range of p-values available in the look-up table.")
 
-# Function to load and preprocess dataset
-def load_and_preprocess_data(file_path):
-    data = pd.read_excel(file_path)
-    data['Order Date'] = pd.to_datetime(data['Order Date'], errors='coerce')
-    data.set_index('Order Date', inplace=True)
-    return data
+# Function to load the monthly sales cube as month x sub-category matrices
+def load_monthly_matrices(file_path, sub_categories):
+    cube = load_monthly_cube(file_path)
+    return {measure: cube_matrix(cube, 'Sub-Category', measure, sub_categories) for measure in ('sum', 'count')}
 
 # Function to apply logarithmic transformation for stationarity testing
 def log_transform_sales(monthly_sales):
-    return monthly_sales.apply(lambda x: math.log(x) if x > 0 else None).dropna()
+    return log_transform(monthly_sales).dropna()
 
-# Function to perform ADF and KPSS tests for stationarity and autocorrelation
-def test_stationarity_and_autocorrelation(series, sub_category):
-    # Perform ADF Test
-    adf_result = adfuller(series)
+# Function to read the log-transformed monthly sales of one sub-category from the cube
+def transformed_sub_category(monthly_matrices, sub_category):
+    monthly_sales = trim_to_orders(monthly_matrices['sum'][sub_category], monthly_matrices['count'][sub_category])
+    return log_transform_sales(monthly_sales)
+
+# Function to print the ADF and KPSS results of one sub-category
+def print_test_results(sub_category, adf_statistic, adf_pvalue, kpss_statistic, kpss_pvalue):
     print(f"\nSub-Category: {sub_category}")
     print("ADF Test:")
-    print(f"  ADF Statistic: {adf_result[0]}")
-    print(f"  p-value: {adf_result[1]}")
-    
-    # Perform KPSS Test
-    kpss_result = kpss(series, regression='c')
+    print(f"  ADF Statistic: {adf_statistic}")
+    print(f"  p-value: {adf_pvalue}")
     print("\nKPSS Test:")
-    print(f"  KPSS Statistic: {kpss_result[0]}")
-    print(f"  p-value: {kpss_result[1]}")
+    print(f"  KPSS Statistic: {kpss_statistic}")
+    print(f"  p-value: {kpss_pvalue}")
+
+# Function to perform ADF and KPSS tests for stationarity and autocorrelation
+def test_stationarity_and_autocorrelation(series, sub_category):
+    adf_result = stationarity_tests().adf(series)
+    kpss_result = stationarity_tests().kpss(series, regression='c')
+    print_test_results(sub_category, adf_result[0], adf_result[1], kpss_result[0], kpss_result[1])
 
 # Function to process each sub-category
-def process_sub_category(data, sub_category):
-    # Filter data for the current sub-category
-    sub_category_data = data[data['Sub-Category'] == sub_category]
-    
-    # Aggregate sales by month
-    monthly_sales = sub_category_data['Sales'].resample('ME').sum()
-    
+def process_sub_category(monthly_matrices, sub_category):
     # Apply logarithmic transformation for stationarity testing
-    transformed_sales = log_transform_sales(monthly_sales)
+    transformed_sales = transformed_sub_category(monthly_matrices, sub_category)
     
     # Perform stationarity tests if there is sufficient data
     if len(transformed_sales) > 0:
         test_stationarity_and_autocorrelation(transformed_sales, sub_category)
 
+# Function to test every sub-category at once with the batched ADF/KPSS engine
+def process_all_sub_categories(monthly_matrices, sub_categories):
+    transformed = {sub_category: transformed_sub_category(monthly_matrices, sub_category) for sub_category in sub_categories}
+    transformed = pd.DataFrame({sub_category: sales for sub_category, sales in transformed.items() if len(sales) > 0})
+    table = stationarity_table(transformed)
+    for sub_category, row in table.iterrows():
+        print_test_results(sub_category, row['adf_statistic'], row['adf_pvalue'], row['kpss_statistic'], row['kpss_pvalue'])
+    return table
+
 # Main function to run the entire process
-def main():
+def main(batch=True):
     file_path = 'C:\\Users\\loydt\\Downloads\\Projects\\Superstore Sales Dataset.xlsx'
-    data = load_and_preprocess_data(file_path)
-    
-    sub_categories = [
-        'Bookcases', 'Chairs', 'Labels', 'Tables', 'Storage', 'Furnishings',
-        'Art', 'Phones', 'Binders', 'Appliances', 'Paper', 'Accessories',
-        'Envelopes', 'Fasteners', 'Supplies', 'Machines', 'Copiers'
-    ]
+    sub_categories = SUB_CATEGORIES
+    monthly_matrices = load_monthly_matrices(file_path, sub_categories)
     
+    if batch:
+        return process_all_sub_categories(monthly_matrices, sub_categories)
     for sub_category in sub_categories:
-        process_sub_category(data, sub_category)
+        process_sub_category(monthly_matrices, sub_category)
 
 # Run the main function
 if __name__ == "__main__":
     main()
 
 
-"""
+r"""
 Sub-Category: Bookcases
 ADF Test:
   ADF Statistic: -6.027134171995194
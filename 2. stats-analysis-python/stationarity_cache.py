@@ -0,0 +1,121 @@
+import copy
+import glob
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+import numpy as np
+import statsmodels
+from statsmodels.tsa.stattools import adfuller, kpss, acf, pacf
+from dataset_cache import DEFAULT_CACHE_DIR
+
+# On-disk store shared by the forecasting and decomposition scripts
+STATIONARITY_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'stationarity')
+# Result files kept on disk; the least recently used are removed beyond this
+DISK_MAX_FILES = 4096
+
+class StationarityTests:
+    """
+    ADF, KPSS, ACF and PACF results memoised by a hash of the series values, test parameters
+    and statsmodels version. Every call returns a copy, so callers cannot alter the cached
+    result; the disk store keeps at most max_files results, pruning the least recently used.
+    """
+
+    def __init__(self, maxsize=512, cache_dir=None, max_files=DISK_MAX_FILES):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def cache_key(self, test, values, params):
+        """Hash the test name, parameters, statsmodels version, dtype, shape and raw bytes of the values."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([test, params, statsmodels.__version__], sort_keys=True, default=str).encode('utf-8'))
+        digest.update(str((values.dtype.str, values.shape)).encode('utf-8'))
+        digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def remember(self, key, result):
+        """Store a result in the LRU, evicting the least recently used entry when full."""
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def prune(self):
+        """Delete the least recently used result files beyond max_files; disk hits refresh a file's modification time."""
+        paths = glob.glob(os.path.join(self.cache_dir, '*.pkl'))
+        if len(paths) <= self.max_files:
+            return
+        ages = []
+        for path in paths:
+            try:
+                ages.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        for _, path in sorted(ages)[:len(ages) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def cached(self, test, series, params, compute):
+        """Return the memoised result of compute(values), checking memory, then disk, then computing."""
+        values = np.ascontiguousarray(np.asarray(series, dtype=float))
+        key = self.cache_key(test, values, params)
+        if key in self.memory:
+            self.hits += 1
+            self.memory.move_to_end(key)
+            return copy.deepcopy(self.memory[key])
+
+        path = os.path.join(self.cache_dir, f"{test}-{key}.pkl") if self.cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as handle:
+                    result = pickle.load(handle)
+                self.disk_hits += 1
+                os.utime(path)
+                self.remember(key, result)
+                return copy.deepcopy(result)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+
+        self.misses += 1
+        result = compute(values)
+        self.remember(key, result)
+        if path:
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as handle:
+                pickle.dump(result, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+            self.prune()
+        return copy.deepcopy(result)
+
+    def adf(self, series, **params):
+        """Augmented Dickey-Fuller test, as statsmodels' adfuller."""
+        return self.cached('adf', series, params, lambda values: adfuller(values, **params))
+
+    def kpss(self, series, regression='c', **params):
+        """KPSS test, as statsmodels' kpss."""
+        params = {'regression': regression, **params}
+        return self.cached('kpss', series, params, lambda values: kpss(values, **params))
+
+    def acf(self, series, nlags=20, **params):
+        """Autocorrelation function, as statsmodels' acf."""
+        params = {'nlags': nlags, **params}
+        return self.cached('acf', series, params, lambda values: acf(values, **params))
+
+    def pacf(self, series, nlags=20, **params):
+        """Partial autocorrelation function, as statsmodels' pacf."""
+        params = {'nlags': nlags, **params}
+        return self.cached('pacf', series, params, lambda values: pacf(values, **params))
+
+    def stats(self):
+        """Return the hit, disk-hit and miss counters."""
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses, 'entries': len(self.memory)}
@@ -0,0 +1,44 @@
+import pandas as pd
+
+# Period aliases and matching date_range frequencies of the supported aggregation levels
+FREQUENCIES = {
+    'daily': ('D', 'D'),
+    'weekly': ('W-SUN', 'W-SUN'),
+    'monthly': ('M', 'ME')
+}
+
+# Function to parse the order dates of the order table
+def order_dates(data, date_column='Order Date'):
+    """Return the order dates as a DatetimeIndex; unparseable dates become NaT."""
+    if isinstance(data.index, pd.DatetimeIndex):
+        return data.index
+    return pd.DatetimeIndex(pd.to_datetime(data[date_column], format='%d/%m/%Y', errors='coerce'))
+
+# Function to label each date with the end of its period
+def period_ends(dates, freq='monthly'):
+    """Map dates to the last day of their day, week (ending Sunday) or month, matching resample() labels."""
+    if freq not in FREQUENCIES:
+        raise ValueError(f"unknown frequency '{freq}'; expected one of {list(FREQUENCIES)}")
+    return dates.to_period(FREQUENCIES[freq][0]).to_timestamp(how='end').normalize()
+
+# Function to turn order lines into regularly spaced series
+def aggregate_sales(data, freq='monthly', value='Sales', by=None, how='sum', fill_value=0, date_column='Order Date'):
+    """
+    Aggregate the order table into one value per period, or one column per group when
+    `by` names one or more grouping columns.
+
+    Periods run from the first to the last order with no gaps; periods without orders
+    hold fill_value (0 for sales totals; pass None to keep NaN, e.g. for means). Order
+    lines with an unparseable date or value are dropped.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    periods = pd.Series(period_ends(order_dates(data, date_column), freq), name=date_column)
+    values = pd.Series(pd.to_numeric(data[value], errors='coerce').to_numpy(), name=value)
+    keys = [periods] + [data[column].reset_index(drop=True) for column in by]
+    totals = values.groupby(keys, sort=True).agg(how)
+
+    if by:
+        totals = totals.unstack(by)
+    index = pd.date_range(periods.min(), periods.max(), freq=FREQUENCIES[freq][1], name=date_column)
+    totals = totals.reindex(index)
+    return totals if fill_value is None else totals.fillna(fill_value)
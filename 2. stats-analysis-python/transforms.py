@@ -0,0 +1,152 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Search range, grid and refinement rounds of the Box-Cox lambda estimate
+BOXCOX_BOUNDS = (-2.0, 2.0)
+BOXCOX_GRID = 41
+BOXCOX_ROUNDS = 40
+
+# Function to take the log of positive values
+def log_transform(values):
+    """Natural log of every positive value and NaN elsewhere, keeping a float Series, DataFrame or array."""
+    array = np.asarray(values, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logged = np.where(array > 0, np.log(np.where(array > 0, array, 1.0)), np.nan)
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(logged, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        return pd.Series(logged, index=values.index, name=values.name)
+    return logged
+
+# Function to apply the Box-Cox transform with one lambda per column
+def boxcox(values, lambdas):
+    """(y^lambda - 1) / lambda for every column of a (time x series) array, log(y) where lambda is 0."""
+    logs = np.log(values)
+    lambdas = np.asarray(lambdas, dtype=float)
+    safe = np.where(lambdas == 0, 1.0, lambdas)
+    return np.where(lambdas == 0, logs, np.expm1(safe * logs) / safe)
+
+# Function to undo the Box-Cox transform
+def inverse_boxcox(values, lambdas):
+    """Map Box-Cox values back to the original scale; values beyond the transform's range map to 0 or infinity."""
+    lambdas = np.asarray(lambdas, dtype=float)
+    safe = np.where(lambdas == 0, 1.0, lambdas)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        return np.where(lambdas == 0, np.exp(values), np.exp(np.log1p(np.maximum(safe * values, -1.0)) / safe))
+
+# Function to evaluate the Box-Cox profile log-likelihood of every column
+def boxcox_llf(logs, lambdas, counts, log_sums):
+    """(lambda - 1) * sum(log y) - n/2 * log(var), NaN-aware, for (time x series) logs and one lambda per column."""
+    safe = np.where(lambdas == 0, 1.0, lambdas)
+    transformed = np.where(lambdas == 0, logs, np.expm1(safe * logs) / safe)
+    variance = np.nanmean((transformed - np.nanmean(transformed, axis=0)) ** 2, axis=0)
+    return (lambdas - 1) * log_sums - counts / 2 * np.log(variance)
+
+# Function to estimate the Box-Cox lambda of many series at once
+def boxcox_lambdas(values, bounds=BOXCOX_BOUNDS):
+    """
+    Maximum-likelihood Box-Cox lambda of every column of a (time x series) array of positive
+    values (NaN allowed), as scipy.stats.boxcox_normmax(method='mle') estimates it: a grid
+    over the bounds for all columns at once, then a batched golden-section search around
+    each column's best grid point. Columns with non-positive values get NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[:, np.newaxis] if values.ndim == 1 else values
+    valid = ~(values <= 0).any(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        logs = np.log(np.where(valid, values, np.nan))
+    counts, log_sums = (~np.isnan(logs)).sum(axis=0), np.nansum(logs, axis=0)
+
+    grid = np.linspace(*bounds, BOXCOX_GRID)
+    # Columns left without values score NaN at every point; silence their empty-mean warnings
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        scores = np.stack([boxcox_llf(logs, np.full(logs.shape[1], point), counts, log_sums) for point in grid])
+        best = np.argmax(np.where(np.isnan(scores), -np.inf, scores), axis=0)
+        low, high = grid[np.maximum(best - 1, 0)], grid[np.minimum(best + 1, BOXCOX_GRID - 1)]
+        ratio = (np.sqrt(5) - 1) / 2
+        for _ in range(BOXCOX_ROUNDS):
+            left, right = high - ratio * (high - low), low + ratio * (high - low)
+            move_right = boxcox_llf(logs, left, counts, log_sums) < boxcox_llf(logs, right, counts, log_sums)
+            low, high = np.where(move_right, left, low), np.where(move_right, high, right)
+    return np.where(valid, (low + high) / 2, np.nan)
+
+# Function to undo one differencing step on values that continue a series
+def integrate(differences, tail, lag):
+    """
+    Rebuild y[T + j] = d[j] + y[T + j - lag] for j = 0..h-1 from the last `lag` values before
+    the forecast, with one cumulative sum per seasonal phase instead of a Python loop.
+    Works along the first axis, so the trailing axes can be series or simulated paths.
+    """
+    horizon = differences.shape[0]
+    cycles = -(-horizon // lag)
+    padded = np.zeros((cycles * lag,) + differences.shape[1:])
+    padded[:horizon] = differences
+    tail = np.broadcast_to(tail.reshape(tail.shape + (1,) * (differences.ndim - tail.ndim)), (lag,) + differences.shape[1:])
+    phases = padded.reshape((cycles, lag) + differences.shape[1:])
+    return (tail + np.cumsum(phases, axis=0)).reshape(padded.shape)[:horizon]
+
+class TransformPipeline:
+    """
+    Chain of vectorised transforms applied to a series or a (time x series) matrix and
+    inverted on forecasts. Steps are 'log', 'log1p', 'boxcox' (one lambda per series,
+    estimated in batch), 'diff' and 'seasonal_diff', or (name, lag) pairs. Each step keeps
+    what it needs to undo itself: the Box-Cox lambdas and the last `lag` values before
+    every differencing, so forecasts continuing the data map back to the sales scale.
+    """
+
+    def __init__(self, steps=('log',), period=12):
+        self.steps = [step if isinstance(step, tuple) else (step, period if step == 'seasonal_diff' else 1) for step in steps]
+        self.state = []
+
+    def fit_transform(self, data):
+        """Transform the data and remember the inversion state; differencing leaves NaN in the leading rows."""
+        values = np.asarray(data, dtype=float)
+        self.state = []
+        for name, lag in self.steps:
+            if name == 'log':
+                values, state = log_transform(values), None
+            elif name == 'log1p':
+                with np.errstate(invalid='ignore'):
+                    values, state = np.log1p(values), None
+            elif name == 'boxcox':
+                state = boxcox_lambdas(values)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    values = boxcox(values, state if values.ndim > 1 else state[0])
+            elif name in ('diff', 'seasonal_diff'):
+                state = values[-lag:].copy()
+                differenced = np.full_like(values, np.nan)
+                differenced[lag:] = values[lag:] - values[:-lag]
+                values = differenced
+            else:
+                raise ValueError(f"unknown transform '{name}'")
+            self.state.append(state)
+        if isinstance(data, pd.DataFrame):
+            return pd.DataFrame(values, index=data.index, columns=data.columns)
+        if isinstance(data, pd.Series):
+            return pd.Series(values, index=data.index, name=data.name)
+        return values
+
+    def inverse(self, forecast):
+        """
+        Map values continuing the transformed data (horizon first, then series, then any
+        extra axes such as simulated paths) back to the original scale. Quantiles and
+        interval bounds map through the monotone steps exactly; with differencing, invert
+        sample paths and take their quantiles afterwards.
+        """
+        values = np.asarray(forecast, dtype=float)
+        for (name, lag), state in zip(reversed(self.steps), reversed(self.state)):
+            if name == 'log':
+                values = np.exp(values)
+            elif name == 'log1p':
+                values = np.expm1(values)
+            elif name == 'boxcox':
+                values = inverse_boxcox(values, state.reshape(state.shape + (1,) * (values.ndim - 2)) if values.ndim > 1 else state[0])
+            else:
+                values = integrate(values, state, lag)
+        if isinstance(forecast, pd.DataFrame):
+            return pd.DataFrame(values, index=forecast.index, columns=forecast.columns)
+        if isinstance(forecast, pd.Series):
+            return pd.Series(values, index=forecast.index, name=forecast.name)
+        return values
@@ -0,0 +1,66 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# The analysis folders are plain script directories, so their modules are imported by path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('1. data-cleaning-python', '2. stats-analysis-python', os.path.join('2. stats-analysis-python', 'forecasting sales')):
+    sys.path.append(os.path.join(ROOT, folder))
+
+# Dimension values of the synthetic order table
+SUB_CATEGORY_PARENTS = {'Chairs': 'Furniture', 'Tables': 'Furniture', 'Paper': 'Office Supplies',
+                        'Binders': 'Office Supplies', 'Phones': 'Technology'}
+STATE_REGIONS = {'California': 'West', 'Washington': 'West', 'New York': 'East', 'Texas': 'Central'}
+SEGMENTS = ['Consumer', 'Corporate', 'Home Office']
+SHIP_MODES = ['Standard Class', 'Second Class', 'First Class', 'Same Day']
+
+# Function to build a seeded order table with the Superstore export's columns
+def synthetic_orders(n_rows=1200, start='2015-01-01', end='2018-12-31', seed=0):
+    """Return order lines with day-first date strings spread over every month from start to end."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start, end, freq='D')
+    order_dates = days[rng.integers(0, len(days), n_rows)]
+    sub_categories = rng.choice(list(SUB_CATEGORY_PARENTS), n_rows)
+    states = rng.choice(list(STATE_REGIONS), n_rows)
+    return pd.DataFrame({
+        'Row ID': np.arange(1, n_rows + 1),
+        'Order ID': [f'CA-{date.year}-1{number:05d}' for date, number in zip(order_dates, rng.integers(0, 99999, n_rows))],
+        'Order Date': order_dates.strftime('%d/%m/%Y'),
+        'Ship Date': (order_dates + pd.to_timedelta(rng.integers(0, 7, n_rows), unit='D')).strftime('%d/%m/%Y'),
+        'Ship Mode': rng.choice(SHIP_MODES, n_rows),
+        'Customer ID': [f'CU-{number}' for number in rng.integers(10000, 10200, n_rows)],
+        'Segment': rng.choice(SEGMENTS, n_rows),
+        'State': states,
+        'Region': [STATE_REGIONS[state] for state in states],
+        'Product ID': [f'PR-{number}' for number in rng.integers(100, 160, n_rows)],
+        'Category': [SUB_CATEGORY_PARENTS[name] for name in sub_categories],
+        'Sub-Category': sub_categories,
+        'Sales': np.round(rng.gamma(2.0, 150.0, n_rows), 4)
+    })
+
+# Function to build seeded monthly series with trend, seasonality and noise
+def synthetic_sales(n_series=6, n_months=48, seed=0):
+    """Return a month x series frame of strictly positive seasonal sales."""
+    rng = np.random.default_rng(seed)
+    months = np.arange(n_months)
+    season = 50 * np.sin(2 * np.pi * months / 12)
+    values = 500 + 3 * months + season + rng.normal(0, 20, size=(n_series, n_months))
+    index = pd.date_range('2015-01-31', periods=n_months, freq='ME')
+    return pd.DataFrame(values.T, index=index, columns=[f'series_{i}' for i in range(n_series)])
+
+@pytest.fixture
+def make_orders():
+    return synthetic_orders
+
+@pytest.fixture
+def make_sales():
+    return synthetic_sales
+
+@pytest.fixture
+def orders_csv(tmp_path):
+    """Write the default synthetic order table as a CSV export and return its path."""
+    path = str(tmp_path / 'orders.csv')
+    synthetic_orders().to_csv(path, index=False)
+    return path
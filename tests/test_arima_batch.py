@@ -0,0 +1,52 @@
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+import arima_batch
+from arima_batch import fit_arima_batch, fit_series
+
+# Function standing in for fit_series that kills its worker on one series
+def fit_or_crash(name, values, order, steps):
+    """Exit the worker process without a result for the series named 'crash'."""
+    if name == 'crash':
+        os._exit(1)
+    return fit_series(name, values, order, steps)
+
+@pytest.fixture
+def series(make_sales):
+    return make_sales(n_series=4, n_months=36)
+
+def test_batch_matches_one_fit_per_series(series):
+    table = fit_arima_batch(series, order=(1, 0, 0), steps=6, workers=2).set_index('series')
+    for name in series.columns:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            model = sm.tsa.ARIMA(series[name].to_numpy(), order=(1, 0, 0)).fit()
+        assert table.loc[name, 'aic'] == pytest.approx(model.aic, rel=1e-10)
+        np.testing.assert_allclose(table.loc[name, [f'h{step}' for step in range(1, 7)]].to_numpy(dtype=float), model.forecast(6), rtol=1e-10)
+
+def test_pool_and_in_process_fits_agree(series):
+    orders = {name: (1, 0, 0) if position % 2 else ((1, 0, 0), (1, 0, 0, 12)) for position, name in enumerate(series.columns)}
+    pooled = fit_arima_batch(series, order=orders, steps=3, workers=2).drop(columns='fit_seconds')
+    local = fit_arima_batch(series, order=orders, steps=3, workers=1).drop(columns='fit_seconds')
+    pd.testing.assert_frame_equal(pooled, local)
+    assert pooled['series'].tolist() == list(series.columns)
+
+def test_a_failing_series_is_isolated(series):
+    data = dict(series.items())
+    data['empty'] = pd.Series(np.nan, index=series.index)
+    table = fit_arima_batch(data, steps=3, workers=2).set_index('series')
+    assert table.loc['empty', 'error'] is not None and np.isnan(table.loc['empty', 'aic'])
+    assert table.drop(index='empty')['error'].isna().all()
+    assert np.isfinite(table.drop(index='empty')['aic']).all()
+
+def test_a_series_that_kills_its_worker_is_isolated(series, monkeypatch):
+    monkeypatch.setattr(arima_batch, 'fit_series', fit_or_crash)
+    data = dict(series.items())
+    data['crash'] = series.iloc[:, 0]
+    table = fit_arima_batch(data, steps=3, workers=2).set_index('series')
+    assert table.loc['crash', 'error'].startswith('BrokenProcessPool')
+    assert table.drop(index='crash')['error'].isna().all()
+    assert list(table.index) == list(data)
@@ -0,0 +1,58 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from backtest import rolling_origins, mase_scale, backtest
+
+# Function to fit one ARIMA without its convergence and index warnings
+def arima(values, order, params=None):
+    """Fit (or, given params, filter) an ARIMA on values and return the results."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = sm.tsa.ARIMA(values, order=order)
+        return model.filter(params) if params is not None else model.fit()
+
+@pytest.fixture
+def sales(make_sales):
+    return make_sales(n_series=3, n_months=40)
+
+def test_rolling_origins():
+    assert rolling_origins(48, folds=6, horizon=6, min_train=24) == [37, 38, 39, 40, 41, 42]
+    assert rolling_origins(32, folds=6, horizon=6, min_train=24) == [24, 25, 26]
+    assert rolling_origins(28, folds=6, horizon=6, min_train=24) == []
+
+def test_mase_scale_is_the_in_sample_naive_error(sales):
+    values = sales['series_0'].to_numpy()
+    scale = mase_scale(values, [24, 30], season=12)
+    assert scale == pytest.approx([np.abs(values[12:origin] - values[:origin - 12]).mean() for origin in (24, 30)])
+
+def test_full_refit_metrics_match_a_manual_loop(sales):
+    accuracy, folds = backtest(sales, order=(1, 0, 0), folds=3, horizon=4, refit='full', workers=1)
+    assert accuracy['series'].tolist() == [name for name in sales.columns for _ in range(4)]
+    values = sales['series_2'].to_numpy()
+    actual, forecast = [], []
+    for origin in (34, 35, 36):
+        actual.append(values[origin:origin + 4])
+        forecast.append(arima(values[:origin], (1, 0, 0)).forecast(4))
+    actual, forecast = np.array(actual), np.array(forecast)
+    scale = np.array([np.abs(np.diff(values[:origin])).mean() for origin in (34, 35, 36)])
+    row = accuracy[accuracy['series'] == 'series_2']
+    np.testing.assert_allclose(row['mape'], 100 * (np.abs(actual - forecast) / actual).mean(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(row['smape'], 100 * (2 * np.abs(actual - forecast) / (actual + forecast)).mean(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(row['mase'], (np.abs(actual - forecast) / scale[:, np.newaxis]).mean(axis=0), rtol=1e-6)
+    assert (row['folds'] == 3).all() and folds['error'].isna().all()
+
+def test_append_mode_keeps_the_first_fold_parameters(sales):
+    _, folds = backtest(sales[['series_0']], order=(1, 0, 0), folds=3, horizon=2, refit='append', workers=1)
+    values = sales['series_0'].to_numpy()
+    params = arima(values[:36], (1, 0, 0)).params
+    np.testing.assert_allclose(folds.loc[2, 'forecast'], arima(values[:38], (1, 0, 0), params).forecast(2), rtol=1e-8)
+
+def test_parallel_matches_serial_and_writes_the_table(sales, tmp_path):
+    serial, _ = backtest(sales, order=(1, 0, 0), folds=2, horizon=3, refit='full', workers=1)
+    parallel, folds = backtest(sales, order=(1, 0, 0), folds=2, horizon=3, refit='full', workers=2, output_path=str(tmp_path / 'accuracy.csv'))
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert folds[['series', 'origin']].values.tolist() == [[name, origin] for name in sales.columns for origin in (36, 37)]
+    written = pd.read_csv(tmp_path / 'accuracy.csv')
+    np.testing.assert_allclose(written[['mape', 'smape', 'mase']], serial[['mape', 'smape', 'mase']], atol=5e-5)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.seasonal import seasonal_decompose as sm_seasonal_decompose
+from batch_decompose import decompose_batch, seasonal_decompose
+
+@pytest.mark.parametrize('model', ['additive', 'multiplicative'])
+def test_decomposition_matches_statsmodels(make_sales, model):
+    data = make_sales()
+    result = seasonal_decompose(data, model=model, period=12)
+    for name in data.columns:
+        expected = sm_seasonal_decompose(data[name], model=model, period=12)
+        for component in ('trend', 'seasonal', 'resid'):
+            np.testing.assert_allclose(getattr(result, component)[name], getattr(expected, component), rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize('model', ['additive', 'multiplicative'])
+def test_series_input_matches_statsmodels(make_sales, model):
+    series = make_sales(n_series=1, n_months=30)['series_0']
+    result, expected = seasonal_decompose(series, model=model), sm_seasonal_decompose(series, model=model, period=12)
+    for component in ('trend', 'seasonal', 'resid'):
+        np.testing.assert_allclose(getattr(result, component), getattr(expected, component), rtol=0, atol=1e-12)
+        assert getattr(result, component).index.equals(series.index)
+
+@pytest.mark.parametrize('values, model, message', [
+    ([np.nan] + [1.0] * 29, 'additive', 'missing values'),
+    ([0.0] + [1.0] * 29, 'multiplicative', 'zero and negative'),
+    ([1.0] * 23, 'additive', '2 complete cycles'),
+])
+def test_rejects_the_input_statsmodels_rejects(values, model, message):
+    with pytest.raises(ValueError, match=message):
+        sm_seasonal_decompose(np.array(values), model=model, period=12)
+    with pytest.raises(ValueError, match=message):
+        decompose_batch(np.array(values), model=model)
@@ -0,0 +1,67 @@
+import warnings
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller, kpss
+from batch_stationarity import adf_matrix, kpss_matrix, stationarity_table
+
+# Function to run the statsmodels tests on one series without their warnings
+def reference_tests(values, **adf_options):
+    """Return the adfuller and kpss (regression 'c', nlags 'auto') results of one series."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return adfuller(values, **adf_options), kpss(values, regression='c', nlags='auto')
+
+@pytest.fixture
+def differenced(make_sales):
+    return make_sales(n_months=60).diff().dropna()
+
+def test_stationarity_table_matches_adfuller_and_kpss(differenced):
+    table = stationarity_table(differenced)
+    for name in differenced.columns:
+        (statistic, pvalue, lags, nobs, critical, _), (kpss_statistic, kpss_pvalue, kpss_lags, _) = reference_tests(differenced[name], autolag='AIC')
+        row = table.loc[name]
+        assert (row['adf_lags'], row['nobs'], row['kpss_lags']) == (lags, nobs, kpss_lags)
+        np.testing.assert_allclose([row['adf_statistic'], row['adf_pvalue'], row['adf_5%']], [statistic, pvalue, critical['5%']], rtol=1e-8)
+        np.testing.assert_allclose([row['kpss_statistic'], row['kpss_pvalue']], [kpss_statistic, kpss_pvalue], rtol=1e-8)
+        assert row['stationary'] == (pvalue < 0.05 and kpss_pvalue > 0.05)
+
+@pytest.mark.parametrize('regression', ['c', 'ct', 'n'])
+@pytest.mark.parametrize('autolag', ['AIC', 'BIC', 't-stat'])
+def test_adf_matrix_matches_adfuller(make_sales, regression, autolag):
+    values = make_sales(n_months=48).to_numpy().T
+    result = adf_matrix(values, regression=regression, autolag=autolag)
+    for row in range(values.shape[0]):
+        statistic, pvalue, lags, nobs = reference_tests(values[row], regression=regression, autolag=autolag)[0][:4]
+        assert (result['adf_lags'][row], result['nobs'][row]) == (lags, nobs)
+        np.testing.assert_allclose([result['adf_statistic'][row], result['adf_pvalue'][row]], [statistic, pvalue], rtol=1e-8)
+
+def test_fixed_lag_mode_matches_adfuller_without_autolag(differenced):
+    result = adf_matrix(differenced.to_numpy().T, maxlag=3, autolag=None)
+    for row, name in enumerate(differenced.columns):
+        statistic, pvalue, lags, nobs = reference_tests(differenced[name], maxlag=3, autolag=None)[0][:4]
+        assert (result['adf_lags'][row], result['nobs'][row]) == (lags, nobs) == (3, len(differenced) - 4)
+        np.testing.assert_allclose(result['adf_statistic'][row], statistic, rtol=1e-8)
+
+@pytest.mark.parametrize('regression', ['c', 'ct'])
+@pytest.mark.parametrize('nlags', ['auto', 'legacy', 4])
+def test_kpss_matrix_matches_kpss(differenced, regression, nlags):
+    result = kpss_matrix(differenced.to_numpy().T, regression, nlags)
+    for row, name in enumerate(differenced.columns):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            statistic, pvalue, lags, _ = kpss(differenced[name], regression=regression, nlags=nlags)
+        assert result['kpss_lags'][row] == lags
+        np.testing.assert_allclose([result['kpss_statistic'][row], result['kpss_pvalue'][row]], [statistic, pvalue], rtol=1e-8)
+
+def test_series_with_gaps_or_too_short_are_tested_alone(differenced):
+    data = differenced.copy()
+    data.iloc[:5, 1] = np.nan
+    data.iloc[:-3, 2] = np.nan
+    table = stationarity_table(data)
+    statistic = reference_tests(data.iloc[:, 1].dropna(), autolag='AIC')[0][0]
+    np.testing.assert_allclose(table.iloc[1]['adf_statistic'], statistic, rtol=1e-8)
+    # adfuller rejects three observations; the table keeps the series with NaN results
+    with pytest.raises(ValueError):
+        adfuller(data.iloc[:, 2].dropna())
+    assert table.iloc[2]['nobs'] == 3 and np.isnan(table.iloc[2]['adf_statistic']) and not table.iloc[2]['stationary']
+    assert list(table.index) == list(data.columns)
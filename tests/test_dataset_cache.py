@@ -0,0 +1,78 @@
+import os
+import pandas as pd
+import pytest
+import dataset_cache
+from dataset_cache import load_dataset, load_derived_frame, cache_paths, read_manifest
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count how often the source file is parsed."""
+    calls = []
+    read_source = dataset_cache.read_source
+    monkeypatch.setattr(dataset_cache, 'read_source', lambda file_path: calls.append(file_path) or read_source(file_path))
+    return calls
+
+def test_unchanged_file_is_served_from_the_cache(orders_csv, tmp_path, parses):
+    first = load_dataset(orders_csv, cache_dir=str(tmp_path / 'cache'))
+    second = load_dataset(orders_csv, cache_dir=str(tmp_path / 'cache'))
+    assert len(parses) == 1
+    pd.testing.assert_frame_equal(second, first)
+    pd.testing.assert_frame_equal(first, pd.read_csv(orders_csv))
+
+def test_touched_file_with_same_contents_is_rehashed_not_reparsed(orders_csv, tmp_path, parses):
+    cache_dir = str(tmp_path / 'cache')
+    load_dataset(orders_csv, cache_dir=cache_dir)
+    stat = os.stat(orders_csv)
+    os.utime(orders_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    load_dataset(orders_csv, cache_dir=cache_dir)
+    assert len(parses) == 1
+    assert read_manifest(cache_paths(orders_csv, cache_dir)[1])['mtime_ns'] == stat.st_mtime_ns + 10 ** 9
+
+def test_changed_contents_of_the_same_size_are_reparsed(orders_csv, tmp_path, parses):
+    cache_dir = str(tmp_path / 'cache')
+    load_dataset(orders_csv, cache_dir=cache_dir)
+    with open(orders_csv, 'r+b') as handle:
+        handle.seek(-2, os.SEEK_END)
+        last = handle.read(1)
+        handle.seek(-2, os.SEEK_END)
+        handle.write(b'9' if last != b'9' else b'8')
+    stat = os.stat(orders_csv)
+    os.utime(orders_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    data = load_dataset(orders_csv, cache_dir=cache_dir)
+    assert len(parses) == 2
+    pd.testing.assert_frame_equal(data, pd.read_csv(orders_csv))
+
+def test_changed_size_is_reparsed(orders_csv, tmp_path, parses):
+    cache_dir = str(tmp_path / 'cache')
+    load_dataset(orders_csv, cache_dir=cache_dir)
+    pd.read_csv(orders_csv).iloc[:-5].to_csv(orders_csv, index=False)
+    assert len(load_dataset(orders_csv, cache_dir=cache_dir)) == len(pd.read_csv(orders_csv))
+    assert len(parses) == 2
+
+@pytest.mark.parametrize('damage', ['delete', 'truncate'])
+def test_missing_or_corrupt_cache_file_is_rebuilt(orders_csv, tmp_path, parses, damage):
+    cache_dir = str(tmp_path / 'cache')
+    load_dataset(orders_csv, cache_dir=cache_dir)
+    stem, manifest_path = cache_paths(orders_csv, cache_dir)
+    cached = f"{stem}.{read_manifest(manifest_path)['format']}"
+    if damage == 'delete':
+        os.remove(cached)
+    else:
+        with open(cached, 'wb') as handle:
+            handle.write(b'not a frame')
+    pd.testing.assert_frame_equal(load_dataset(orders_csv, cache_dir=cache_dir), pd.read_csv(orders_csv))
+    assert len(parses) == 2
+
+def test_derived_frame_is_rebuilt_when_source_or_params_change(orders_csv, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    builds = []
+    def build(data):
+        builds.append(len(data))
+        return data.groupby('Region', as_index=False)['Sales'].sum()
+
+    first = load_derived_frame(orders_csv, 'totals', build, params={'by': 'Region'}, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(load_derived_frame(orders_csv, 'totals', build, params={'by': 'Region'}, cache_dir=cache_dir), first)
+    load_derived_frame(orders_csv, 'totals', build, params={'by': 'Region', 'version': 2}, cache_dir=cache_dir)
+    pd.read_csv(orders_csv).iloc[:-5].to_csv(orders_csv, index=False)
+    load_derived_frame(orders_csv, 'totals', build, params={'by': 'Region', 'version': 2}, cache_dir=cache_dir)
+    assert builds == [1200, 1200, 1195]
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+import dataset_cache
+import dataset_repair
+from dataset_cache import load_dataset, load_repaired_dataset, write_repaired_dataset
+from dataset_repair import repair_frame, parse_dates
+
+@pytest.fixture
+def repairs(monkeypatch):
+    """Count how often the repair runs inside the cache."""
+    calls = []
+    monkeypatch.setattr(dataset_cache, 'repair_frame', lambda data: calls.append(len(data)) or repair_frame(data))
+    return calls
+
+@pytest.fixture
+def messy():
+    return pd.DataFrame({
+        'Order Date': ['08/11/2016', ' 2016-11-08', '12/06/2016', 'someday', None],
+        'Sales': ['$1,234.50', '261.96', ' 14.62 ', 'n/a', None],
+        'Segment': ['Consumer', ' Consumer', 'Home  Office', 'Corporate', None],
+        'Region': ['West', 'West', 'East', 'East', 'West'],
+        'Quantity': [2, 3, 1, 5, 4]
+    })
+
+def test_parse_dates_tries_the_formats_in_order():
+    parsed, used = parse_dates(['08/11/2016', '2016-11-08', '31-12-2016', 'someday'])
+    assert pd.DatetimeIndex(parsed[:3]).strftime('%Y-%m-%d').tolist() == ['2016-11-08', '2016-11-08', '2016-12-31']
+    assert used.tolist() == [0, 1, 2, -1] and np.isnat(parsed[3])
+
+def test_repair_frame_types_and_log(messy):
+    repaired, log = repair_frame(messy)
+    assert repaired['Order Date'].dtype == 'datetime64[ns]'
+    assert repaired['Order Date'].dt.strftime('%Y-%m-%d').tolist()[:3] == ['2016-11-08', '2016-11-08', '2016-06-12']
+    np.testing.assert_allclose(repaired['Sales'], [1234.5, 261.96, 14.62, np.nan, np.nan])
+    assert repaired['Segment'].tolist()[:4] == ['Consumer', 'Consumer', 'Home Office', 'Corporate'] and repaired['Segment'].isna().iloc[4]
+    assert repaired['Quantity'].tolist() == [2, 3, 1, 5, 4]
+    counts = log.set_index(['column', 'repair'])['rows']
+    assert (counts['Order Date', 'whitespace'], counts['Order Date', 'date_format'], counts['Order Date', 'unparsed_date']) == (1, 1, 1)
+    assert (counts['Sales', 'whitespace'], counts['Sales', 'unparsed_number'], counts['Segment', 'whitespace']) == (1, 1, 2)
+
+def test_low_cardinality_text_stays_str(make_orders):
+    data = make_orders()
+    repaired, log = repair_frame(data)
+    for column in ('Segment', 'Region', 'Category', 'Sub-Category', 'Ship Mode'):
+        assert pd.api.types.is_string_dtype(repaired[column]) and not isinstance(repaired[column].dtype, pd.CategoricalDtype)
+    # Grouping over two repaired columns gives only the observed combinations
+    grouped = repaired.groupby(['Region', 'Sub-Category'])['Sales'].sum()
+    pd.testing.assert_series_equal(grouped, data.groupby(['Region', 'Sub-Category'])['Sales'].sum().astype(float))
+    assert 'category_codes' not in set(log['repair'])
+
+def test_repaired_dataset_is_cached_and_rebuilt_on_settings(orders_csv, tmp_path, repairs, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    repaired = load_repaired_dataset(orders_csv, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(repaired, repair_frame(pd.read_csv(orders_csv))[0])
+    sales = load_repaired_dataset(orders_csv, cache_dir=cache_dir, columns=['Order Date', 'Sales'])
+    pd.testing.assert_frame_equal(sales, repaired[['Order Date', 'Sales']])
+    assert len(repairs) == 1
+
+    monkeypatch.setattr(dataset_repair, 'REPAIR_VERSION', dataset_repair.REPAIR_VERSION + 1)
+    load_repaired_dataset(orders_csv, cache_dir=cache_dir)
+    assert len(repairs) == 2
+
+def test_written_repair_is_served_without_repairing_again(orders_csv, tmp_path, repairs):
+    cache_dir = str(tmp_path / 'cache')
+    repaired, log = write_repaired_dataset(load_dataset(orders_csv, cache_dir), orders_csv, cache_dir)
+    assert list(log.columns) == ['column', 'repair', 'rows']
+    pd.testing.assert_frame_equal(load_repaired_dataset(orders_csv, cache_dir=cache_dir), repaired)
+    assert repairs == [len(repaired)]
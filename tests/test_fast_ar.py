@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.regression.linear_model import yule_walker
+from statsmodels.tsa.ar_model import AutoReg
+from arima_batch import fit_arima_batch
+from fast_ar import ar_ols, ar_yule_walker, fit_ar_matrix, fit_ar_batch
+
+@pytest.fixture
+def values(make_sales):
+    return make_sales().to_numpy().T
+
+@pytest.mark.parametrize('p', [1, 3])
+def test_ar_ols_matches_autoreg(values, p):
+    intercept, coefficients, sigma2 = ar_ols(values, p)
+    for row in range(values.shape[0]):
+        fitted = AutoReg(values[row], lags=p, trend='c').fit()
+        np.testing.assert_allclose(np.r_[intercept[row], coefficients[row]], fitted.params, rtol=1e-8)
+        np.testing.assert_allclose(sigma2[row], fitted.sigma2, rtol=1e-8)
+
+@pytest.mark.filterwarnings('ignore:yule_walker currently returns:FutureWarning')
+@pytest.mark.parametrize('p', [1, 2])
+def test_ar_yule_walker_matches_statsmodels(values, p):
+    intercept, coefficients, sigma2 = ar_yule_walker(values, p)
+    for row in range(values.shape[0]):
+        rho, sigma = yule_walker(values[row], order=p, method='mle', demean=True)
+        np.testing.assert_allclose(coefficients[row], rho, rtol=1e-10)
+        np.testing.assert_allclose(sigma2[row], sigma ** 2, rtol=1e-10)
+        np.testing.assert_allclose(intercept[row], values[row].mean() * (1 - rho.sum()), rtol=1e-10)
+
+@pytest.mark.parametrize('order', [(1, 0, 0), (2, 1, 0), (1, 2, 0)])
+def test_forecasts_match_autoreg_on_the_differenced_series(values, order):
+    p, d, _ = order
+    fitted = fit_ar_matrix(values, order, steps=6)
+    for row in range(values.shape[0]):
+        differenced = np.diff(values[row], n=d)
+        forecast = AutoReg(differenced, lags=p, trend='c' if d == 0 else 'n').fit().forecast(6)
+        for level in range(d, 0, -1):
+            forecast = np.diff(values[row], n=level - 1)[-1] + np.cumsum(forecast)
+        np.testing.assert_allclose(fitted['forecast'][row], forecast, rtol=1e-8)
+
+def test_ma_orders_are_refused(values):
+    with pytest.raises(ValueError, match='pure AR'):
+        fit_ar_matrix(values, (1, 0, 1))
+
+def test_batch_routes_orders_and_keeps_the_series_order(make_sales):
+    series = make_sales(n_months=36)
+    series.iloc[:4, 2] = np.nan
+    orders = {name: (1, 0, 1) if position == 1 else (position % 2 + 1, 0, 0) for position, name in enumerate(series.columns)}
+    table = fit_ar_batch(series, order=orders, steps=3, workers=1)
+    assert table['series'].tolist() == list(series.columns)
+    assert table['order'].tolist() == [orders[name] for name in series.columns]
+    assert table['nobs'].tolist() == [36, 36, 32, 36, 36, 36]
+    exact = fit_arima_batch(series[['series_1']], order=(1, 0, 1), steps=3, workers=1)
+    np.testing.assert_allclose(table.loc[1, ['h1', 'h2', 'h3']].to_numpy(dtype=float), exact.loc[0, ['h1', 'h2', 'h3']].to_numpy(dtype=float))
+    fast = fit_ar_matrix(series[['series_0']].to_numpy().T, (1, 0, 0), steps=3)
+    np.testing.assert_allclose(table.loc[0, ['h1', 'h2', 'h3']].to_numpy(dtype=float), fast['forecast'][0])
+
+def test_exact_mode_matches_fit_arima_batch(make_sales):
+    series = make_sales(n_series=3, n_months=36)
+    fast = fit_ar_batch(series, order=(1, 0, 0), steps=3, exact=True, workers=1).drop(columns='fit_seconds')
+    exact = fit_arima_batch(series, order=(1, 0, 0), steps=3, workers=1).drop(columns='fit_seconds')
+    pd.testing.assert_frame_equal(fast, exact)
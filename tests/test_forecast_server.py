@@ -0,0 +1,96 @@
+import asyncio
+import json
+import threading
+import time
+import numpy as np
+import pytest
+import forecast_server
+from forecast_server import ForecastService
+from model_registry import fit_arima
+from sales_cube import build_monthly_cube
+
+@pytest.fixture
+def fits(monkeypatch):
+    """Count the model fits, each slowed down so concurrent requests overlap."""
+    calls = []
+    lock = threading.Lock()
+    def slow_fit(values, order):
+        with lock:
+            calls.append(order)
+        time.sleep(0.2)
+        return fit_arima(values, order)
+    monkeypatch.setattr(forecast_server, 'fit_arima', slow_fit)
+    return calls
+
+@pytest.fixture
+def service(make_orders, monkeypatch):
+    """A service over the synthetic orders, without touching the dataset cache."""
+    cube = build_monthly_cube(make_orders())
+    monkeypatch.setattr(forecast_server, 'load_monthly_cube', lambda file_path: cube)
+    return lambda **options: ForecastService('orders.csv', **options)
+
+def test_concurrent_requests_share_one_fit(service, fits):
+    server = service()
+    async def requests():
+        return await asyncio.gather(*[server.forecast('Sub-Category', 'Chairs', 6, (1, 0, 0)) for _ in range(5)])
+
+    payloads = asyncio.run(requests())
+    assert len(fits) == 1
+    assert sorted(payload['cache'] for payload in payloads) == ['miss'] + ['shared'] * 4
+    assert all(payload['forecast'] == payloads[0]['forecast'] for payload in payloads)
+    assert (server.counters['fits'], server.counters['shared_fits']) == (1, 4)
+
+def test_forecast_matches_a_direct_fit(service, fits):
+    server = service()
+    payload = asyncio.run(server.forecast('Region', 'West', 4, (1, 0, 0)))
+    expected = fit_arima(server.monthly_sales('Region', 'West').to_numpy(dtype=float), (1, 0, 0)).forecast(4)
+    np.testing.assert_allclose(payload['forecast'], expected, rtol=1e-10)
+    assert payload['months'] == ['2019-01-31', '2019-02-28', '2019-03-31', '2019-04-30']
+    assert asyncio.run(server.forecast('Region', 'West', 4, (1, 0, 0)))['cache'] == 'hit'
+
+def test_least_recently_used_models_are_evicted(service, fits):
+    server = service(max_models=2)
+    async def requests():
+        for name in ('Chairs', 'Paper', 'Chairs', 'Phones', 'Chairs', 'Paper'):
+            await server.forecast('Sub-Category', name, 3, (1, 0, 0))
+
+    asyncio.run(requests())
+    assert len(fits) == 4 and server.counters['evictions'] == 2 and server.counters['hits'] == 2
+    assert list(server.models) == [('Sub-Category', 'Chairs', (1, 0, 0)), ('Sub-Category', 'Paper', (1, 0, 0))]
+
+@pytest.mark.parametrize('method, target, status', [
+    ('GET', '/forecast?series=Chairs&horizon=3', 200),
+    ('GET', '/forecast?series=Chairs&order=2,1,1&horizon=3', 200),
+    ('GET', '/forecast?horizon=3', 400),
+    ('GET', '/forecast?series=Chairs&horizon=0', 400),
+    ('GET', '/forecast?series=Chairs&horizon=x', 400),
+    ('GET', '/forecast?series=Chairs&order=9,0,0', 400),
+    ('GET', '/forecast?series=Chairs&order=1,-1,0', 400),
+    ('GET', '/forecast?series=Chairs&order=1,0', 400),
+    ('GET', '/forecast?series=Sofas', 404),
+    ('GET', '/forecast?series=Chairs&dimension=Colour', 404),
+    ('GET', '/elsewhere', 404),
+    ('POST', '/forecast?series=Chairs', 405),
+])
+def test_routes_answer_with_the_right_status(service, fits, method, target, status):
+    assert asyncio.run(service().route(method, target))[0] == status
+
+def test_serves_http_over_a_socket(service, fits):
+    server = service()
+    async def exchange():
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            responses = []
+            for target in ('/forecast?series=Chairs&horizon=2', '/stats'):
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('latin-1'))
+                await writer.drain()
+                responses.append(await reader.read())
+                writer.close()
+            return responses
+
+    forecast, stats = asyncio.run(exchange())
+    assert forecast.startswith(b'HTTP/1.1 200 OK')
+    assert len(json.loads(forecast.split(b'\r\n\r\n', 1)[1])['forecast']) == 2
+    assert json.loads(stats.split(b'\r\n\r\n', 1)[1])['requests'] == 2
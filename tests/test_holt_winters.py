@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.exponential_smoothing.initialization import _initialization_heuristic
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from holt_winters import initial_states, smooth, forecast_states, fit_holt_winters_matrix, fit_holt_winters
+
+# Statsmodels names of the two seasonal models
+SEASONAL = {'additive': 'add', 'multiplicative': 'mul'}
+
+@pytest.fixture
+def values(make_sales):
+    return make_sales(n_series=3).to_numpy().T
+
+@pytest.mark.parametrize('model', ['additive', 'multiplicative'])
+def test_initial_states_match_the_statsmodels_heuristic(values, model):
+    level, trend, seasonal = initial_states(values, 12, model)
+    for row in range(values.shape[0]):
+        expected = _initialization_heuristic(values[row], trend='add', seasonal=SEASONAL[model], seasonal_periods=12)
+        np.testing.assert_allclose([level[row], trend[row]], expected[:2], rtol=1e-10)
+        np.testing.assert_allclose(seasonal[row], expected[2], rtol=1e-10, atol=1e-10)
+
+@pytest.mark.parametrize('model', ['additive', 'multiplicative'])
+def test_recursions_match_exponential_smoothing(values, model):
+    states = initial_states(values, 12, model)
+    alpha, beta, gamma = np.array([0.3, 0.5, 0.1]), np.array([0.1, 0.05, 0.2]), np.array([0.2, 0.4, 0.3])
+    sse, level, trend, seasonal = smooth(values, alpha, beta, gamma, states, 12, model)
+    forecast = forecast_states(level, trend, seasonal, values.shape[1], 6, 12, model)
+    for row in range(values.shape[0]):
+        fitted = ExponentialSmoothing(values[row], trend='add', seasonal=SEASONAL[model], seasonal_periods=12, initialization_method='known',
+                                      initial_level=states[0][row], initial_trend=states[1][row], initial_seasonal=states[2][row])
+        fitted = fitted.fit(smoothing_level=alpha[row], smoothing_trend=beta[row], smoothing_seasonal=gamma[row], optimized=False)
+        np.testing.assert_allclose(sse[row], fitted.sse, rtol=1e-12)
+        np.testing.assert_allclose(forecast[row], fitted.forecast(6), rtol=1e-12)
+
+def test_fitted_sse_is_close_to_statsmodels(values):
+    fitted = fit_holt_winters_matrix(values, 12, 'additive', steps=6)
+    reference = np.array([ExponentialSmoothing(row, trend='add', seasonal='add', seasonal_periods=12, initialization_method='estimated').fit().sse for row in values])
+    # The grid and pattern search stop short of the optimiser on some series, never far
+    assert (fitted['sse'] <= 1.1 * reference).all() and fitted['sse'].sum() <= 1.05 * reference.sum()
+    assert fitted['forecast'].shape == (3, 6)
+    assert ((fitted['alpha'] >= 0) & (fitted['alpha'] <= 1)).all()
+
+def test_invalid_models_and_short_series_are_refused(values):
+    with pytest.raises(ValueError, match='additive'):
+        fit_holt_winters_matrix(values, model='damped')
+    with pytest.raises(ValueError, match='2 complete cycles'):
+        fit_holt_winters_matrix(values[:, :20])
+
+def test_batch_keeps_error_rows_and_the_series_order(make_sales):
+    series = make_sales(n_months=36)
+    series['series_1'] -= series['series_1'].max()
+    series.iloc[:20, 3] = np.nan
+    table = fit_holt_winters(series, model='multiplicative', steps=3)
+    assert table['series'].tolist() == list(series.columns)
+    assert table.loc[1, 'error'] == 'multiplicative model needs positive values'
+    assert '2 complete cycles' in table.loc[3, 'error'] and table.loc[3, 'nobs'] == 16
+    assert table['error'].isna().sum() == 4 and table.loc[table['error'].isna(), ['h1', 'h2', 'h3']].notna().all().all()
+    assert table.loc[[1, 3], ['sse', 'h1']].isna().all().all()
+    alone = fit_holt_winters_matrix(series[['series_0']].to_numpy().T, 12, 'multiplicative', steps=3)
+    np.testing.assert_allclose(table.loc[0, ['h1', 'h2', 'h3']].to_numpy(dtype=float), alone['forecast'][0])
@@ -0,0 +1,61 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from batch_decompose import decompose_batch
+from incremental_update import initial_state, append_months, update_series, state_forecasts, load_state, save_state, state_components
+from performance_classifier import performance_report
+
+@pytest.fixture
+def sales(make_sales):
+    return make_sales(n_series=2)
+
+def test_appended_trend_matches_full_decomposition(sales):
+    series = sales['series_0']
+    state = initial_state(series.iloc[:36])
+    changed = append_months(state, series)
+    trend = decompose_batch(series.to_numpy()[np.newaxis, :])[0][0]
+    np.testing.assert_allclose(state['trend'], trend, rtol=0, atol=1e-12)
+    assert changed.tolist() == list(range(30, 42))
+
+def test_appended_arima_keeps_its_parameters(sales):
+    series = sales['series_0']
+    state = initial_state(series.iloc[:36])
+    params = np.asarray(state['arima'].params)
+    append_months(state, series)
+    np.testing.assert_array_equal(np.asarray(state['arima'].params), params)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        filtered = sm.tsa.ARIMA(series.to_numpy(), order=(1, 0, 0)).filter(params)
+    np.testing.assert_allclose(state['arima'].forecast(6), filtered.forecast(6), rtol=1e-10)
+
+def test_update_refits_only_new_or_restated_series(sales, tmp_path):
+    states = {}
+    first = update_series({name: sales[name].iloc[:36] for name in sales}, states, output_dir=str(tmp_path))
+    assert first['action'].tolist() == ['refit', 'refit'] and first['report_written'].all()
+
+    unchanged = update_series({name: sales[name].iloc[:36] for name in sales}, states, output_dir=str(tmp_path))
+    assert unchanged['action'].tolist() == ['unchanged', 'unchanged'] and not unchanged['report_written'].any()
+
+    restated = sales['series_1'].copy()
+    restated.iloc[3] += 100.0
+    update = update_series({'series_0': sales['series_0'].iloc[:40], 'series_1': restated.iloc[:40]}, states, output_dir=str(tmp_path))
+    assert update['action'].tolist() == ['append', 'refit']
+    assert update['new_months'].tolist() == [4, 40]
+    assert update.loc[0, 'changed_cells'] == 4 and update['report_written'].all()
+
+    # The rewritten report classifies the appended months against the stored seasonal indices
+    expected = performance_report(*state_components(states['series_0']))
+    expected['Date'] = expected['Date'].astype(str)
+    written = pd.read_csv(tmp_path / 'series_0_Sales_Performance.csv', dtype={'Date': str}, keep_default_na=False)
+    pd.testing.assert_frame_equal(written[['Date', 'Expectation Type', 'Status']], expected[['Date', 'Expectation Type', 'Status']])
+    np.testing.assert_allclose(written['Value Difference'], expected['Value Difference'], rtol=1e-12)
+
+def test_saved_state_forecasts_like_the_live_one(sales, tmp_path):
+    states = {}
+    update_series({name: sales[name].iloc[:36] for name in sales}, states)
+    update_series({name: sales[name] for name in sales}, states)
+    save_state(states, str(tmp_path / 'state.pkl'))
+    pd.testing.assert_frame_equal(state_forecasts(load_state(str(tmp_path / 'state.pkl'))), state_forecasts(states))
+    assert load_state(str(tmp_path / 'missing.pkl')) == {}
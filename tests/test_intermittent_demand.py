@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fast_ar import fit_ar_batch
+from intermittent_demand import ALPHA_GRID, classify_demand, smooth_demand, fit_intermittent, forecast_demand
+
+# Function to run Croston, SBA or TSB on one series the textbook way
+def smooth_loop(values, alpha, method):
+    """Return the one-step forecasts before each period and the final forecast of one series."""
+    size, interval, probability, since, forecasts = None, None, None, 1, []
+    for t, value in enumerate(values):
+        if size is None:
+            forecasts.append(np.nan)
+            if value > 0:
+                size, interval, probability = value, t + 1.0, 1.0 / (t + 1)
+            continue
+        forecasts.append(forecast_of(size, interval, probability, alpha, method))
+        if value > 0:
+            size += alpha * (value - size)
+            interval += alpha * (since - interval)
+            since = 1
+        else:
+            since += 1
+        probability += alpha * ((value > 0) - probability)
+    return forecasts, forecast_of(size, interval, probability, alpha, method)
+
+# Function to combine the smoothed states into a forecast
+def forecast_of(size, interval, probability, alpha, method):
+    """Return z / p for Croston, scaled by (1 - alpha / 2) for SBA, or probability * z for TSB."""
+    if method == 'tsb':
+        return probability * size
+    return size / interval * ((1 - alpha / 2) if method == 'sba' else 1.0)
+
+@pytest.fixture
+def demand():
+    """Rows that are smooth, erratic, intermittent, lumpy and without demand."""
+    rng = np.random.default_rng(0)
+    smooth = rng.normal(50, 5, 36)
+    erratic = rng.choice([5.0, 200.0], 36)
+    intermittent = np.where(np.arange(36) % 3 == 0, rng.normal(20, 2, 36), 0.0)
+    lumpy = np.where(np.arange(36) % 4 == 1, rng.choice([1.0, 90.0], 36), 0.0)
+    return np.vstack([smooth, erratic, intermittent, lumpy, np.zeros(36)])
+
+def test_classify_demand(demand):
+    adi, cv2, classes = classify_demand(demand)
+    assert classes.tolist() == ['smooth', 'erratic', 'intermittent', 'lumpy', 'no demand']
+    np.testing.assert_allclose(adi[:4], [1.0, 1.0, 3.0, 4.0])
+    sizes = demand[3][demand[3] > 0]
+    np.testing.assert_allclose(cv2[3], sizes.var() / sizes.mean() ** 2)
+    assert np.isinf(adi[4])
+
+@pytest.mark.parametrize('method', ['croston', 'sba', 'tsb'])
+def test_smoothing_matches_a_loop(demand, method):
+    rows = demand[1:4]
+    alpha = np.array([0.1, 0.2, 0.3])
+    forecasts, final = smooth_demand(rows, alpha, method)
+    for row in range(3):
+        expected, expected_final = smooth_loop(rows[row], alpha[row], method)
+        np.testing.assert_allclose(forecasts[row], expected, rtol=1e-12)
+        np.testing.assert_allclose(final[row], expected_final, rtol=1e-12)
+
+def test_fit_picks_the_lowest_in_sample_error(demand):
+    alpha, final, mse = fit_intermittent(demand[2:4], 'croston')
+    for row in range(2):
+        errors = [np.nanmean((demand[2 + row] - np.array(smooth_loop(demand[2 + row], value, 'croston')[0])) ** 2) for value in ALPHA_GRID]
+        assert alpha[row] == ALPHA_GRID[np.argmin(errors)] and mse[row] == pytest.approx(min(errors))
+        assert final[row] == pytest.approx(smooth_loop(demand[2 + row], alpha[row], 'croston')[1])
+
+def test_forecast_routes_each_class(demand):
+    series = pd.DataFrame(demand.T, index=pd.date_range('2015-01-31', periods=36, freq='ME'), columns=list('abcde'))
+    table = forecast_demand(series, steps=3, method='tsb', workers=1)
+    assert table['method'].tolist() == ['arima', 'tsb', 'tsb', 'tsb', 'zero']
+    arima = fit_ar_batch(series[['a']], order=(1, 0, 0), steps=3, workers=1)
+    np.testing.assert_allclose(table.loc[0, ['h1', 'h2', 'h3']].to_numpy(dtype=float), arima.loc[0, ['h1', 'h2', 'h3']].to_numpy(dtype=float))
+    _, final, _ = fit_intermittent(demand[1:4], 'tsb')
+    np.testing.assert_allclose(table.loc[1:3, ['h1', 'h2', 'h3']].to_numpy(dtype=float), np.repeat(final[:, np.newaxis], 3, axis=1))
+    assert (table.loc[4, ['h1', 'h2', 'h3']] == 0).all() and np.isnan(table.loc[4, 'alpha'])
@@ -0,0 +1,72 @@
+import importlib.util
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tools.sm_exceptions import ValueWarning
+from model_registry import ModelRegistry, fit_arima, training_data_hash
+
+# Repository root, where the analysis folders live
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def series(make_sales):
+    return make_sales(n_series=1, n_months=36)['series_0']
+
+def test_hits_disk_loads_and_misses(series, tmp_path):
+    registry = ModelRegistry(store_dir=str(tmp_path))
+    fitted = registry.fit_or_load(series, (1, 0, 0))
+    assert registry.fit_or_load(series, (1, 0, 0)) is fitted
+    assert (registry.hits, registry.disk_loads, registry.misses) == (1, 0, 1)
+
+    reopened = ModelRegistry(store_dir=str(tmp_path))
+    loaded = reopened.fit_or_load(series, (1, 0, 0))
+    np.testing.assert_allclose(loaded.forecast(6), fitted.forecast(6), rtol=1e-12)
+    assert (reopened.hits, reopened.disk_loads, reopened.misses) == (0, 1, 0)
+
+    reopened.fit_or_load(series, (2, 0, 0))
+    changed = series.copy()
+    changed.iloc[-1] += 1.0
+    reopened.fit_or_load(changed, (1, 0, 0))
+    assert reopened.misses == 2 and reopened.stats()['hit_rate'] == pytest.approx(1 / 3)
+
+def test_training_data_hash_covers_values_and_index(series):
+    assert training_data_hash(series) == training_data_hash(series.copy())
+    assert training_data_hash(series) != training_data_hash(series.set_axis(series.index + pd.offsets.MonthEnd(1)))
+    assert training_data_hash(series.to_numpy()) != training_data_hash(series.to_numpy()[:-1])
+
+def test_metadata_records_the_fit(series, tmp_path):
+    registry = ModelRegistry(store_dir=str(tmp_path))
+    model = registry.fit_or_load(series, (1, 0, 0))
+    entry = registry.entries().iloc[0]
+    assert entry['order'] == [1, 0, 0] and entry['training_data_hash'] == training_data_hash(series)
+    assert entry['nobs'] == 36 and entry['aic'] == pytest.approx(model.aic)
+    assert entry['converged'] == model.mle_retvals['converged']
+
+def test_loaded_models_are_bounded(series, tmp_path):
+    registry = ModelRegistry(store_dir=str(tmp_path), maxsize=2)
+    for shift in range(3):
+        registry.fit_or_load(series + shift, (1, 0, 0))
+    assert registry.stats()['loaded'] == 2
+    registry.fit_or_load(series, (1, 0, 0))
+    assert registry.disk_loads == 1
+
+def test_only_index_notices_are_silenced(series):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        fit_arima(series.set_axis(series.index.to_series().reset_index(drop=True).to_numpy()), (1, 0, 0))
+    assert not [warning for warning in caught if issubclass(warning.category, ValueWarning)]
+
+def test_arima_script_opens_its_caches_on_first_use(monkeypatch):
+    created = []
+    monkeypatch.setattr(os, 'makedirs', lambda path, *args, **kwargs: created.append(path))
+    path = os.path.join(ROOT, '2. stats-analysis-python', 'forecasting sales', '1. ARIMA.py')
+    spec = importlib.util.spec_from_file_location('arima_script', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert created == []
+
+    registry = object()
+    monkeypatch.setattr(module, 'ModelRegistry', lambda: registry)
+    assert module.model_registry() is registry and module.model_registry() is registry
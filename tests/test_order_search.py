@@ -0,0 +1,60 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+import order_search
+from order_search import search_orders, search_series_orders, selected_orders, candidate_orders, differencing_orders
+
+# Small candidate grid that keeps the searches quick
+GRID = {'p': range(0, 3), 'q': range(0, 2), 'P': range(0, 1), 'Q': range(0, 1)}
+
+@pytest.fixture
+def series(make_sales):
+    return make_sales(n_series=2, n_months=48)
+
+def test_candidates_run_from_simplest_upwards():
+    candidates = candidate_orders(GRID)
+    assert candidates[0] == (0, 0, 0, 0)
+    assert [sum(candidate) for candidate in candidates] == sorted(sum(candidate) for candidate in candidates)
+    assert len(candidates) == 6
+
+def test_selected_order_is_the_best_full_fit(series):
+    row = search_series_orders('series_0', series['series_0'], grid=GRID, patience=10, prune_margin=np.inf, wave_size=2)
+    assert not row['failed'] and row['models_fitted'] == row['candidates'] == 6
+    d, seasonal_d, differenced = differencing_orders(series['series_0'].to_numpy())
+    assert (row['order'][1], row['seasonal_order'][1]) == (d, seasonal_d)
+    aics = {}
+    for p, q, _, _ in candidate_orders(GRID):
+        model = SARIMAX(differenced, order=(p, 0, q), trend='c' if d + seasonal_d == 0 else 'n')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            aics[(p, q)] = model.fit(disp=False).aic
+    assert (row['order'][0], row['order'][2]) == min(aics, key=aics.get)
+    assert row['aic'] == pytest.approx(min(aics.values()), rel=1e-4)
+
+def test_search_stops_after_stalled_waves(series):
+    # The first wave always improves on no fit, so the second one is the first that can stall
+    row = search_series_orders('series_0', series['series_0'], grid=GRID, patience=1, min_improvement=np.inf, wave_size=2)
+    assert row['models_fitted'] == 4 < row['candidates']
+
+def test_failed_search_is_reported_and_skipped(series, monkeypatch):
+    def fail(differenced, candidate, *arguments):
+        return {'candidate': candidate, 'aic': np.inf, 'pruned': False, 'seconds': 0.0, 'error': 'LinAlgError: singular'}
+
+    monkeypatch.setattr(order_search, 'fit_candidate', fail)
+    failed = search_series_orders('series_0', series['series_0'], grid=GRID)
+    assert failed['failed'] and failed['order'] is None and failed['seasonal_order'] is None
+    assert np.isnan(failed['aic']) and failed['errors'] == failed['models_fitted']
+
+    monkeypatch.undo()
+    fitted = search_series_orders('series_1', series['series_1'], grid=GRID)
+    table = pd.DataFrame([failed, fitted])
+    assert selected_orders(table) == {'series_1': (fitted['order'], fitted['seasonal_order'])}
+
+def test_pool_and_in_process_searches_agree(series):
+    pooled = search_orders(series, workers=2, grid=GRID, wave_size=2)
+    local = search_orders(series, workers=1, grid=GRID, wave_size=2)
+    columns = ['series', 'order', 'seasonal_order', 'failed', 'models_fitted', 'models_pruned']
+    pd.testing.assert_frame_equal(pooled[columns], local[columns])
+    np.testing.assert_allclose(pooled['aic'], local['aic'], rtol=1e-10)
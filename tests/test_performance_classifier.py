@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from performance_classifier import classify_performance, performance_totals, performance_report, TOTAL_COLUMNS, TOTAL_LABELS
+
+# Function to classify one series month by month, as the scripts' loops did
+def classified_by_loop(seasonal, residual):
+    """Return (date, type, expected, recorded, status, difference) tuples, increases before drops."""
+    rows = {'Expected Increase': [], 'Expected Drop': []}
+    for date, expected in seasonal.items():
+        recorded = residual.get(date)
+        if pd.isna(expected) or recorded is None or pd.isna(recorded) or expected == 0 or recorded == expected:
+            continue
+        kind = 'Expected Increase' if expected > 0 else 'Expected Drop'
+        rows[kind].append((date, kind, expected, recorded, 'Failed' if recorded < expected else 'Exceeded', abs(expected - recorded)))
+    return rows['Expected Increase'] + rows['Expected Drop']
+
+@pytest.fixture
+def components():
+    """Seasonal and residual month x series frames with gaps, zeros and ties."""
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2015-01-31', periods=36, freq='ME')
+    seasonal = pd.DataFrame(rng.normal(0, 50, (36, 3)), index=index, columns=['Chairs', 'Paper', 'Phones'])
+    residual = pd.DataFrame(rng.normal(0, 50, (36, 3)), index=index, columns=seasonal.columns)
+    seasonal.iloc[:6] = np.nan
+    residual.iloc[-6:] = np.nan
+    seasonal.iloc[10, 0] = 0.0
+    residual.iloc[11, 1] = seasonal.iloc[11, 1]
+    return seasonal, residual
+
+def test_labels_match_the_per_date_loop(components):
+    seasonal, residual = components
+    table = classify_performance(seasonal, residual)
+    for name in seasonal.columns:
+        expected = classified_by_loop(seasonal[name], residual[name])
+        rows = table[table['Series'] == name].drop(columns='Series')
+        assert list(rows.itertuples(index=False, name=None)) == expected
+
+def test_series_input_is_labelled_with_its_name(components):
+    seasonal, residual = components
+    table = classify_performance(seasonal['Paper'], residual['Paper'])
+    pd.testing.assert_frame_equal(table, classify_performance(seasonal, residual).query("Series == 'Paper'").reset_index(drop=True))
+
+def test_totals_sum_the_differences_of_each_label(components):
+    seasonal, residual = components
+    table = classify_performance(seasonal, residual)
+    totals = performance_totals(seasonal, residual)
+    labels = {'failed_increases': ('Expected Increase', 'Failed'), 'exceeded_increases': ('Expected Increase', 'Exceeded'),
+              'failed_drops': ('Expected Drop', 'Failed'), 'exceeded_drops': ('Expected Drop', 'Exceeded')}
+    for name in seasonal.columns:
+        for column in TOTAL_COLUMNS:
+            kind, status = labels[column]
+            rows = table[(table['Series'] == name) & (table['Expectation Type'] == kind) & (table['Status'] == status)]
+            assert totals.loc[name, column] == pytest.approx(rows['Value Difference'].sum(), rel=1e-12)
+
+def test_report_ends_with_the_four_total_rows(components):
+    seasonal, residual = components
+    report = performance_report(seasonal['Chairs'], residual['Chairs'])
+    totals = performance_totals(seasonal['Chairs'], residual['Chairs']).iloc[0]
+    assert report['Status'].tail(4).tolist() == list(TOTAL_LABELS.values())
+    assert report['Value Difference'].tail(4).tolist() == pytest.approx(totals[list(TOTAL_LABELS)].tolist())
+    assert len(report) == len(classify_performance(seasonal['Chairs'], residual['Chairs'])) + 4
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.ar_model import AutoReg
+from fast_ar import ar_ols, fit_ar_matrix
+from prediction_intervals import StreamingQuantiles, ar_residuals, simulate_paths, simulate_quantiles
+
+@pytest.fixture
+def chunks():
+    """Three (horizon x series x paths) chunks, the later ones reaching well past the first one's range."""
+    rng = np.random.default_rng(0)
+    return [rng.normal(0, 1, (2, 3, 500)), rng.normal(3, 2, (2, 3, 500)), rng.standard_t(2, (2, 3, 500)) - 5]
+
+def test_streaming_quantiles_stay_within_a_bin(chunks):
+    streaming = StreamingQuantiles(bins=64)
+    for chunk in chunks:
+        streaming.update(chunk)
+    values = np.concatenate(chunks, axis=2)
+    assert streaming.total == 1500 and (streaming.counts.sum(axis=2) == 1500).all()
+    np.testing.assert_allclose(streaming.mean(), values.mean(axis=2), rtol=1e-12)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        assert (np.abs(streaming.quantile(q) - np.quantile(values, q, axis=2, method='inverted_cdf')) <= streaming.width).all()
+
+def test_widening_keeps_every_value_in_its_bin(chunks):
+    streaming = StreamingQuantiles(bins=64)
+    for chunk in chunks:
+        streaming.update(chunk)
+    values = np.concatenate(chunks, axis=2)
+    assert (streaming.low <= values.min(axis=2)).all() and (streaming.low + 64 * streaming.width > values.max(axis=2)).all()
+    scaled = (values - streaming.low[:, :, np.newaxis]) / streaming.width[:, :, np.newaxis]
+    expected = np.stack([np.bincount(cell, minlength=64) for cell in np.floor(scaled).astype(int).reshape(-1, 1500)]).reshape(streaming.counts.shape)
+    # Rounding may move a value lying on a bin edge to the neighbouring bin, nothing else
+    on_edge = np.abs(scaled - np.round(scaled)) < 1e-9
+    assert np.abs(streaming.counts - expected).sum() <= 2 * on_edge.sum()
+
+def test_ar_residuals_match_autoreg(make_sales):
+    values = make_sales(n_series=2).to_numpy().T
+    intercept, coefficients, _ = ar_ols(values, 2)
+    residuals = ar_residuals(values, intercept, coefficients)
+    for row in range(2):
+        np.testing.assert_allclose(residuals[row], AutoReg(values[row], lags=2, trend='c').fit().resid, rtol=1e-8)
+
+def test_paths_without_noise_follow_the_point_forecast(make_sales):
+    values = make_sales(n_series=2).to_numpy().T
+    differenced = np.diff(values, axis=1)
+    intercept, coefficients, _ = ar_ols(differenced, 2, constant=False)
+    paths = simulate_paths(values, differenced, intercept, coefficients, np.zeros((2, 5)), 1, 6, 3, np.random.default_rng(0))
+    assert paths.shape == (6, 2, 3)
+    np.testing.assert_allclose(paths[:, :, 0].T, fit_ar_matrix(values, (2, 1, 0), steps=6)['forecast'], rtol=1e-10)
+
+def test_simulated_quantiles_are_ordered_and_seeded(make_sales):
+    sales = make_sales(n_series=3)
+    table = simulate_quantiles(sales, order=(1, 1, 0), steps=4, n_paths=2000, chunk=300, transform=('log',))
+    assert table[['series', 'horizon']].values.tolist() == [[name, step] for name in sales.columns for step in range(1, 5)]
+    assert (table['p10'] <= table['p50']).all() and (table['p50'] <= table['p90']).all() and (table['p10'] > 0).all()
+    # Intervals widen with the horizon
+    spread = (table['p90'] - table['p10']).to_numpy().reshape(3, 4)
+    assert (spread[:, -1] > spread[:, 0]).all()
+    again = simulate_quantiles(sales, order=(1, 1, 0), steps=4, n_paths=2000, chunk=300, transform=('log',))
+    assert table.equals(again)
+    with pytest.raises(ValueError, match='AR'):
+        simulate_quantiles(sales, order=(1, 0, 1))
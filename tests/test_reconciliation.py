@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from reconciliation import RECONCILE_METHODS, summing_matrix, project, reconcile, hierarchical_forecast, coherence_error
+from sales_cube import build_monthly_cube
+
+@pytest.fixture
+def hierarchy():
+    leaves = pd.DataFrame({'Category': ['Furniture', 'Furniture', 'Office', 'Office', 'Office'],
+                           'Sub-Category': ['Chairs', 'Tables', 'Paper', 'Binders', 'Labels']})
+    return summing_matrix(leaves, ['Category', 'Sub-Category'])
+
+@pytest.fixture
+def base(hierarchy):
+    return np.random.default_rng(0).normal(100, 20, (hierarchy[0].shape[0], 3))
+
+def test_summing_matrix_lists_every_node(hierarchy):
+    S, nodes = hierarchy
+    assert nodes['node'].tolist() == ['Total', 'Furniture', 'Office', 'Furniture / Chairs', 'Furniture / Tables',
+                                      'Office / Paper', 'Office / Binders', 'Office / Labels']
+    assert nodes['level'].tolist() == ['Total', 'Category', 'Category'] + ['Sub-Category'] * 5
+    np.testing.assert_array_equal(S.toarray(), np.vstack([np.ones(5), [1, 1, 0, 0, 0], [0, 0, 1, 1, 1], np.eye(5)]))
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_projection_matches_the_dense_formula(hierarchy, base, weighted):
+    S = hierarchy[0].toarray()
+    weights = np.linspace(1, 4, S.shape[0]) if weighted else np.ones(S.shape[0])
+    W = np.diag(1 / weights)
+    expected = S @ np.linalg.solve(S.T @ W @ S, S.T @ W @ base)
+    np.testing.assert_allclose(project(hierarchy[0], base, weights if weighted else None), expected, rtol=1e-10)
+
+def test_methods_add_up(hierarchy, base):
+    S = hierarchy[0]
+    proportions = np.array([0.1, 0.2, 0.3, 0.25, 0.15])
+    variances = np.r_[np.nan, np.linspace(1, 3, S.shape[0] - 1)]
+    for method in RECONCILE_METHODS[1:]:
+        assert coherence_error(S, reconcile(S, base, method, proportions, variances)) < 1e-9
+    assert coherence_error(S, reconcile(S, base, 'base')) > 1
+    np.testing.assert_array_equal(reconcile(S, base, 'bottom_up')[-5:], base[-5:])
+    np.testing.assert_allclose(reconcile(S, base, 'top_down', proportions)[0], base[0])
+
+def test_missing_inputs_are_refused(hierarchy, base):
+    for method in ('top_down', 'mint_diagonal', 'median'):
+        with pytest.raises(ValueError):
+            reconcile(hierarchy[0], base, method)
+
+def test_hierarchical_forecast_is_coherent(make_orders):
+    table = hierarchical_forecast(build_monthly_cube(make_orders()), steps=3, workers=1)
+    assert table['method'].unique().tolist() == RECONCILE_METHODS
+    nodes = table[table['method'] == 'base']['node'].tolist()
+    assert nodes[0] == 'Total' and len(nodes) == 1 + 3 + 5
+    for method, group in table.groupby('method'):
+        forecast = group[['h1', 'h2', 'h3']].to_numpy()
+        gap = np.abs(forecast[0] - forecast[4:].sum(axis=0)).max()
+        assert gap < 1e-6 or method == 'base'
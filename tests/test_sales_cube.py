@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sales_cube import CUBE_DIMENSIONS, build_monthly_cube, load_monthly_cube, cube_matrix, trim_to_orders
+
+# Function to compute one series the way the scripts did before the cube
+def resampled(data, dimension, name, how):
+    """Filter the order table to one series and resample its Sales to month ends."""
+    rows = data[data[dimension] == name]
+    sales = pd.Series(rows['Sales'].to_numpy(), index=pd.to_datetime(rows['Order Date'], format='%d/%m/%Y'))
+    return getattr(sales.resample('ME'), how)()
+
+@pytest.fixture
+def orders_with_gaps(make_orders):
+    """Order table with missing values in every cube dimension but the one being rolled up."""
+    data = make_orders()
+    rng = np.random.default_rng(1)
+    for dimension in CUBE_DIMENSIONS:
+        data.loc[rng.choice(len(data), 25, replace=False), dimension] = np.nan
+    return data
+
+def test_missing_dimension_values_keep_the_row_in_other_totals():
+    data = pd.DataFrame({'Order Date': ['05/01/2017', '06/01/2017', '07/01/2017'], 'Sales': [10.0, 10.0, 10.0],
+                         'Sub-Category': ['Chairs'] * 3, 'Category': ['Furniture'] * 3, 'Segment': ['Consumer'] * 3,
+                         'Region': ['West'] * 3, 'State': ['California', np.nan, 'Washington'], 'Ship Mode': ['Same Day'] * 3})
+    assert cube_matrix(build_monthly_cube(data))['Chairs'].tolist() == [30.0]
+
+@pytest.mark.parametrize('dimension', ['Sub-Category', 'State', 'Segment'])
+@pytest.mark.parametrize('measure', ['sum', 'count', 'mean'])
+def test_cube_matrix_matches_resample(orders_with_gaps, dimension, measure):
+    cube = build_monthly_cube(orders_with_gaps)
+    matrix = cube_matrix(cube, dimension, measure)
+    counts = cube_matrix(cube, dimension, 'count')
+    for name in orders_with_gaps[dimension].dropna().unique():
+        expected = resampled(orders_with_gaps, dimension, name, measure)
+        actual = trim_to_orders(matrix[name], counts[name])
+        np.testing.assert_allclose(actual.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-12)
+        assert actual.index.equals(expected.index)
+
+def test_unparseable_dates_are_dropped(make_orders):
+    data = make_orders()
+    data.loc[:9, 'Order Date'] = 'not a date'
+    cube = build_monthly_cube(data)
+    assert cube['count'].sum() == len(data) - 10
+    assert cube['Month'].notna().all()
+
+def test_persisted_cube_matches_a_fresh_build(orders_with_gaps, tmp_path):
+    path = str(tmp_path / 'orders.csv')
+    orders_with_gaps.to_csv(path, index=False)
+    cached = load_monthly_cube(path, cache_dir=str(tmp_path / 'cache'))
+    reloaded = load_monthly_cube(path, cache_dir=str(tmp_path / 'cache'))
+    for cube in (cached, reloaded):
+        pd.testing.assert_frame_equal(cube_matrix(cube, 'Sub-Category'), cube_matrix(build_monthly_cube(orders_with_gaps), 'Sub-Category'))
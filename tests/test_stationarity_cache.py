@@ -0,0 +1,67 @@
+import importlib.util
+import os
+import warnings
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller, kpss, acf, pacf
+import stationarity_cache
+from stationarity_cache import StationarityTests
+
+# Repository root, where the analysis folders live
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# statsmodels announces a change of adfuller's return type that does not affect these checks
+pytestmark = pytest.mark.filterwarnings('ignore:adfuller currently returns:FutureWarning')
+
+@pytest.fixture
+def values(make_sales):
+    return make_sales(n_series=1)['series_0'].to_numpy()
+
+def test_results_match_statsmodels(values, tmp_path):
+    tests = StationarityTests(cache_dir=str(tmp_path))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        assert tests.adf(values)[:4] == adfuller(values)[:4]
+        assert tests.kpss(values, regression='ct')[:3] == kpss(values, regression='ct')[:3]
+    np.testing.assert_array_equal(tests.acf(values, nlags=10), acf(values, nlags=10))
+    np.testing.assert_array_equal(tests.pacf(values, nlags=10), pacf(values, nlags=10))
+
+def test_memory_then_disk_then_compute(values, tmp_path):
+    tests = StationarityTests(cache_dir=str(tmp_path))
+    first = tests.adf(values)
+    assert tests.adf(values) == first and (tests.hits, tests.misses) == (1, 1)
+    tests.adf(values, maxlag=2)
+    assert tests.misses == 2
+
+    reopened = StationarityTests(cache_dir=str(tmp_path))
+    assert reopened.adf(values) == first
+    assert (reopened.disk_hits, reopened.misses) == (1, 0)
+    reopened.adf(values + 1.0)
+    assert reopened.misses == 1
+
+def test_callers_get_copies(values):
+    tests = StationarityTests()
+    tests.adf(values)[4]['5%'] = 0.0
+    tests.acf(values)[:] = 0.0
+    assert tests.adf(values)[4]['5%'] != 0.0
+    assert tests.acf(values)[0] == 1.0
+
+def test_disk_store_keeps_the_most_recent_files(values, tmp_path):
+    tests = StationarityTests(cache_dir=str(tmp_path), max_files=3)
+    for shift in range(5):
+        tests.acf(values + shift)
+        path = sorted(tmp_path.iterdir(), key=os.path.getmtime)[-1]
+        os.utime(path, (shift, shift))
+    assert len(list(tmp_path.glob('*.pkl'))) == 3
+    assert StationarityTests(cache_dir=str(tmp_path)).acf(values + 4) is not None
+
+def test_decomposition_script_opens_the_cache_on_first_use(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'stationarity'
+    monkeypatch.setattr(stationarity_cache, 'STATIONARITY_CACHE_DIR', str(cache_dir))
+    path = os.path.join(ROOT, '2. stats-analysis-python', 'seasonal-decomposition', '4.6 testing-stationarity-seasonal-decomp-assumption.py')
+    spec = importlib.util.spec_from_file_location('stationarity_assumption', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert not cache_dir.exists()
+    assert module.stationarity_tests() is module.stationarity_tests()
+    assert cache_dir.is_dir()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from time_aggregation import period_ends, aggregate_sales
+
+# Resample rules matching the aggregation levels
+RULES = {'daily': 'D', 'weekly': 'W-SUN', 'monthly': 'ME'}
+
+@pytest.fixture
+def orders(make_orders):
+    return make_orders(n_rows=400)
+
+@pytest.fixture
+def indexed(orders):
+    return orders.set_index(pd.DatetimeIndex(pd.to_datetime(orders['Order Date'], format='%d/%m/%Y')))
+
+@pytest.mark.parametrize('freq', ['daily', 'weekly', 'monthly'])
+def test_totals_match_resample(orders, indexed, freq):
+    expected = indexed['Sales'].resample(RULES[freq]).sum()
+    result = aggregate_sales(orders, freq)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+    assert (result.index == expected.index).all() and result.index.name == 'Order Date'
+
+def test_period_ends_match_resample_labels(indexed):
+    dates = indexed.index
+    for freq, rule in RULES.items():
+        labels = pd.Series(1, index=dates).resample(rule).sum()
+        assert set(period_ends(dates, freq)) == set(labels[labels > 0].index)
+    with pytest.raises(ValueError, match='unknown frequency'):
+        period_ends(dates, 'hourly')
+
+def test_grouped_totals_match_a_pivot_table(orders, indexed):
+    expected = indexed.groupby('Region')['Sales'].resample('ME').sum().unstack('Region').fillna(0)
+    result = aggregate_sales(orders, 'monthly', by='Region')
+    pd.testing.assert_frame_equal(result.reindex(columns=expected.columns), expected, check_names=False, check_freq=False)
+
+def test_empty_periods_and_bad_rows(orders, indexed):
+    orders = orders.astype({'Sales': object})
+    orders.loc[0, 'Order Date'] = 'not a date'
+    orders.loc[1, 'Sales'] = 'n/a'
+    means = aggregate_sales(orders, 'daily', how='mean', fill_value=None)
+    expected = indexed['Sales'].iloc[2:].resample('D').mean()
+    pd.testing.assert_series_equal(means, expected.reindex(means.index), check_names=False, check_freq=False)
+    assert means.isna().any() and not aggregate_sales(orders, 'daily').isna().any()
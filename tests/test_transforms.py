@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from transforms import log_transform, boxcox, inverse_boxcox, boxcox_lambdas, integrate, TransformPipeline
+
+@pytest.fixture
+def values(make_sales):
+    return make_sales(n_months=60).to_numpy()
+
+def test_log_transform_keeps_the_container():
+    series = pd.Series([np.e, 0.0, -1.0, 1.0], name='Sales')
+    logged = log_transform(series)
+    assert isinstance(logged, pd.Series) and logged.name == 'Sales'
+    np.testing.assert_allclose(logged, [1.0, np.nan, np.nan, 0.0])
+    assert isinstance(log_transform(series.to_frame()), pd.DataFrame)
+
+def test_boxcox_lambdas_match_scipy(values):
+    lambdas = boxcox_lambdas(values)
+    expected = [stats.boxcox_normmax(values[:, column], method='mle') for column in range(values.shape[1])]
+    np.testing.assert_allclose(lambdas, expected, atol=1e-5)
+    np.testing.assert_allclose(boxcox(values, lambdas)[:, 0], stats.boxcox(values[:, 0], lambdas[0]), rtol=1e-10)
+    np.testing.assert_allclose(inverse_boxcox(boxcox(values, lambdas), lambdas), values, rtol=1e-10)
+
+def test_boxcox_lambdas_skip_non_positive_series(values):
+    values = values.copy()
+    values[5, 1] = 0.0
+    values[:3, 2] = np.nan
+    lambdas = boxcox_lambdas(values)
+    assert np.isnan(lambdas[1]) and np.isfinite(lambdas[2])
+    np.testing.assert_allclose(lambdas[2], stats.boxcox_normmax(values[3:, 2], method='mle'), atol=1e-5)
+
+@pytest.mark.parametrize('lag', [1, 12])
+def test_integrate_matches_a_loop(values, lag):
+    differences, tail = values[:30], values[-lag:]
+    expected = np.vstack([tail, np.empty_like(differences)])
+    for step in range(len(differences)):
+        expected[lag + step] = differences[step] + expected[step]
+    np.testing.assert_allclose(integrate(differences, tail, lag), expected[lag:], rtol=1e-12)
+
+@pytest.mark.parametrize('steps', [('log', 'diff'), ('log1p', 'seasonal_diff'), ('log', 'diff', 'seasonal_diff')])
+def test_pipeline_inverts_forecasts_that_continue_the_data(values, steps):
+    transformed = TransformPipeline(steps).fit_transform(values)
+    pipeline = TransformPipeline(steps)
+    pipeline.fit_transform(values[:48])
+    np.testing.assert_allclose(pipeline.inverse(transformed[48:]), values[48:], rtol=1e-10)
+
+def test_pipeline_keeps_frames_and_refuses_unknown_steps(make_sales):
+    sales = make_sales()
+    pipeline = TransformPipeline(['boxcox', ('diff', 2)])
+    transformed = pipeline.fit_transform(sales)
+    assert isinstance(transformed, pd.DataFrame) and transformed.iloc[:2].isna().all().all()
+    # A zero lag-2 change repeats the value two months before the end
+    np.testing.assert_allclose(pipeline.inverse(np.zeros((1, sales.shape[1]))), sales.to_numpy()[-2:-1], rtol=1e-10)
+    with pytest.raises(ValueError, match='unknown transform'):
+        TransformPipeline(['sqrt']).fit_transform(sales)
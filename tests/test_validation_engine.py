@@ -0,0 +1,155 @@
+import importlib.util
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from validation_engine import SUPERSTORE_SCHEMA, compile_schema, column_checks, validate_frame, validate_csv_stream, validate_parallel, validate_incremental, check_integrity
+
+# Repository root, where the analysis folders live
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Function to build cleaner-column data with every kind of violation
+def messy_orders(n_rows=2000, seed=0):
+    """Return Order ID, Order Date and Segment columns with padded IDs, day-first dates, spacing and gaps."""
+    rng = np.random.default_rng(seed)
+    order_ids = pd.Series([f'CA-2017-1{number:05d}' for number in rng.integers(0, 99999, n_rows)])
+    order_ids[rng.choice(n_rows, 20, replace=False)] = ' US-2017-1000 '
+    segments = pd.Series(rng.choice(['Consumer', 'Corporate', 'Home Office', 'Home  Office', None], n_rows))
+    dates = pd.Series(pd.date_range('2017-01-01', periods=n_rows, freq='h').strftime('%Y-%m-%d'))
+    dates[rng.choice(n_rows, 15, replace=False)] = '17/01/2017'
+    return pd.DataFrame({'Order ID': order_ids, 'Order Date': dates, 'Segment': segments})
+
+@pytest.fixture
+def cleaners():
+    """The cleaner classes of the data cleaning script."""
+    path = os.path.join(ROOT, '1. data-cleaning-python', 'data-cleaning-formatting.py')
+    spec = importlib.util.spec_from_file_location('data_cleaning_formatting', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_rules_match_a_per_row_reference():
+    data = messy_orders()
+    report = validate_frame(data).set_index(['column', 'rule'])['violations']
+    cleaned = {column: data[column].astype(str).str.strip().str.replace(r'\s+', ' ', regex=True) for column in data}
+    assert report['Order ID', 'pattern'] == (~cleaned['Order ID'].str.match(SUPERSTORE_SCHEMA['Order ID']['pattern'])).sum() == 20
+    assert report['Order Date', 'pattern'] == (~cleaned['Order Date'].str.match(SUPERSTORE_SCHEMA['Order Date']['pattern'])).sum() == 15
+    assert report['Segment', 'enum'] == (data['Segment'].notna() & ~cleaned['Segment'].isin(SUPERSTORE_SCHEMA['Segment']['enum'])).sum() == 0
+    assert report['Segment', 'missing'] == data['Segment'].isna().sum()
+    for column in data:
+        assert report[column, 'extra_spaces'] == data[column].fillna('').str.contains(r'^\s+|\s{2,}|\s+$').sum()
+
+def test_column_checks_share_one_factorization():
+    values = pd.Series(['Consumer', ' Consumer', 'Consumer', 'Retail', None])
+    codes, cleaned, masks = column_checks(values, compile_schema({'Segment': SUPERSTORE_SCHEMA['Segment']})['Segment'])
+    assert codes.tolist() == [0, 1, 0, 2, -1] and cleaned.tolist() == ['Consumer', 'Consumer', 'Retail']
+    assert masks['enum'].tolist() == [False, False, False, True, False]
+    assert masks['missing'].tolist() == [False, False, False, False, True]
+
+def test_missing_columns_and_optional_rules():
+    report = validate_frame(pd.DataFrame({'Segment': ['Consumer', None]}), {'Segment': {'enum': ['Consumer'], 'required': False}, 'Region': {}})
+    assert report[['column', 'rule', 'violations']].values.tolist() == [['Segment', 'missing', 0], ['Segment', 'extra_spaces', 0],
+                                                                          ['Segment', 'enum', 0], ['Region', 'column_missing', 2]]
+
+def test_cleaners_report_what_validate_frame_reports(cleaners):
+    data = messy_orders(n_rows=300)
+    with pytest.raises(TypeError, match='abstract'):
+        cleaners.DataCleaner(data['Segment'])
+    report = pd.concat([cleaner(data[cleaner.column]).report() for cleaner in (cleaners.OrderIDCleaner, cleaners.DateCleaner, cleaners.CategoryCleaner)],
+                       ignore_index=True)
+    pd.testing.assert_frame_equal(report, validate_frame(data))
+    cleaner = cleaners.CategoryCleaner(data['Segment'])
+    assert cleaner.cleaned_data.isna().tolist() == data['Segment'].isna().tolist()
+    assert set(cleaner.cleaned_data.dropna()) == {'Consumer', 'Corporate', 'Home Office'}
+
+def test_streaming_counts_match_the_whole_frame(tmp_path):
+    data = messy_orders()
+    data.to_csv(tmp_path / 'orders.csv', index=False)
+    report, stats = validate_csv_stream(str(tmp_path / 'orders.csv'), chunksize=300)
+    expected = validate_frame(data)
+    assert (stats['rows'], stats['chunks']) == (2000, 7)
+    pd.testing.assert_frame_equal(report[['column', 'rule', 'violations', 'rows_checked']], expected[['column', 'rule', 'violations', 'rows_checked']])
+    for row in report.itertuples():
+        assert len(row.sample_rows) == min(5, row.violations) and row.sample_rows == sorted(row.sample_rows)
+        offending = column_checks(data[row.column], compile_schema(SUPERSTORE_SCHEMA)[row.column])[2][row.rule]
+        assert offending[row.sample_rows].all()
+        assert [value for value in row.sample_values if value == value] == [value for value in data[row.column].iloc[row.sample_rows] if value == value]
+
+def test_streaming_samples_reach_past_the_first_chunk(tmp_path):
+    data = messy_orders()
+    data.to_csv(tmp_path / 'orders.csv', index=False)
+    samples = [validate_csv_stream(str(tmp_path / 'orders.csv'), chunksize=300, seed=seed)[0].set_index(['column', 'rule']).loc[('Order ID', 'pattern'), 'sample_rows']
+               for seed in range(5)]
+    assert max(max(sample) for sample in samples) >= 300 and len({tuple(sample) for sample in samples}) > 1
+    everything = validate_csv_stream(str(tmp_path / 'orders.csv'), chunksize=300, sample_size=50)[0].set_index(['column', 'rule'])
+    assert everything.loc[('Order ID', 'pattern'), 'sample_rows'] == np.flatnonzero(data['Order ID'] == ' US-2017-1000 ').tolist()
+
+def test_parallel_validation_matches_serial():
+    data = messy_orders()
+    serial = validate_frame(data)
+    parallel = validate_parallel(data, workers=2, shard_rows=300)
+    pd.testing.assert_frame_equal(parallel.reset_index(drop=True), serial.reset_index(drop=True))
+
+def test_parallel_validation_keeps_row_labels_and_missing_columns():
+    data = messy_orders(n_rows=500).set_axis(np.arange(500) + 1000)
+    schema = dict(SUPERSTORE_SCHEMA, Region={'enum': ['West']})
+    pd.testing.assert_frame_equal(validate_parallel(data, schema, workers=2, shard_rows=120), validate_frame(data, schema))
+
+def test_incremental_validation_checks_only_new_and_changed_rows(tmp_path):
+    data = messy_orders(n_rows=600)
+    data.insert(0, 'Row ID', np.arange(1, 601))
+    index_dir = str(tmp_path / 'validation')
+    _, cumulative, summary = validate_incremental(data, index_dir=index_dir)
+    assert (summary['validated'], summary['new']) == (600, 600)
+    pd.testing.assert_frame_equal(cumulative, validate_frame(data))
+
+    delta, cumulative, summary = validate_incremental(data, index_dir=index_dir)
+    assert (summary['validated'], summary['unchanged']) == (0, 600) and (delta['rows_checked'] == 0).all()
+    pd.testing.assert_frame_equal(cumulative, validate_frame(data))
+
+    updated = data.iloc[3:].copy()
+    updated.iloc[:10, updated.columns.get_loc('Order ID')] = 'XX-2017-100000'
+    updated = pd.concat([updated, data.iloc[:5].assign(**{'Row ID': np.arange(601, 606)})], ignore_index=True)
+    delta, cumulative, summary = validate_incremental(updated, index_dir=index_dir)
+    assert {name: summary[name] for name in ('new', 'changed', 'unchanged', 'removed', 'validated')} == \
+        {'new': 5, 'changed': 10, 'unchanged': 587, 'removed': 3, 'validated': 15}
+    pd.testing.assert_frame_equal(cumulative, validate_frame(updated))
+    order_ids = delta.set_index(['column', 'rule']).loc[('Order ID', 'pattern')]
+    assert order_ids['rows_checked'] == 15 and order_ids['violations'] >= 10
+
+def test_incremental_validation_restarts_when_the_schema_changes(tmp_path):
+    data = messy_orders(n_rows=200)
+    validate_incremental(data, index_dir=str(tmp_path))
+    schema = dict(SUPERSTORE_SCHEMA, Segment={'enum': ['Consumer']})
+    _, cumulative, summary = validate_incremental(data, schema, index_dir=str(tmp_path))
+    assert summary['validated'] == 200
+    pd.testing.assert_frame_equal(cumulative, validate_frame(data, schema))
+
+# Function to normalise the whitespace of a key column the way the checker does
+def normalised(values):
+    """Strip and collapse whitespace, keeping missing values missing."""
+    return values.str.strip().str.replace(r'\s+', ' ', regex=True)
+
+def test_integrity_matches_a_pandas_reference(make_orders):
+    rng = np.random.default_rng(1)
+    data = make_orders(n_rows=400)
+    data['Order ID'] = [f'CA-2017-1{number:05d}' for number in rng.integers(0, 150, 400)]
+    data = pd.concat([data, data.iloc[:6].assign(**{'Row ID': np.arange(401, 407)})], ignore_index=True)
+    # A padded copy of another order's ID is the same order
+    data.loc[10, 'Order ID'] = f" {data.loc[11, 'Order ID']}  "
+    data.loc[[20, 21], 'Customer ID'] = None
+    data.loc[30, 'Product ID'] = None
+    report = check_integrity(data).set_index('rule')
+
+    keys = data.assign(**{column: normalised(data[column]) for column in ('Order ID', 'Customer ID', 'Product ID')})
+    expected = {
+        'duplicate_line': data.drop(columns='Row ID').duplicated(keep=False),
+        'repeated_product': keys.duplicated(['Order ID', 'Product ID'], keep=False) & keys['Product ID'].notna(),
+        'order_date_conflict': keys.groupby('Order ID')['Order Date'].transform('nunique') > 1,
+        'order_customer_conflict': keys.groupby('Order ID')['Customer ID'].transform(lambda values: values.nunique(dropna=False)) > 1,
+        'customer_segment_conflict': (keys.groupby('Customer ID')['Segment'].transform('nunique') > 1) & keys['Customer ID'].notna()
+    }
+    for rule, mask in expected.items():
+        assert report.loc[rule, 'violations'] == mask.sum() > 0
+        assert report.loc[rule, 'sample_rows'] == data.index[mask.to_numpy()][:5].tolist()
+    assert check_integrity(data.drop(columns='Product ID'))['rule'].tolist() == ['column_missing']